@@ -8,6 +8,8 @@ operations like clamping and swapping inverted coordinates.
 
 from typing import List, Dict, Any, Tuple
 
+import numpy as np
+
 
 def clamp_bbox_to_image(bbox: List[float], image_w: int, image_h: int) -> List[float]:
     """
@@ -30,6 +32,27 @@ def clamp_bbox_to_image(bbox: List[float], image_w: int, image_h: int) -> List[f
     return [xmin, ymin, xmax, ymax]
 
 
+def clamp_bboxes_to_image(bboxes: np.ndarray, image_w: int, image_h: int) -> np.ndarray:
+    """
+    Clamp a batch of bboxes to image boundaries in a single vectorized pass.
+
+    Parameters
+    bboxes numpy array shape (N 4)
+        Each row xmin ymin xmax ymax
+    image_w int image width in pixels
+    image_h int image height in pixels
+
+    Returns
+    A new float64 array with the same values clamp_bbox_to_image gives per
+    row, including NaN coordinates which become 0.0.
+    """
+    arr = np.asarray(bboxes, dtype=np.float64)
+    upper = np.array([image_w, image_h, image_w, image_h], dtype=np.float64)
+    # written as the scalar max(0.0, min(x, upper)) so NaN handling matches
+    low = np.where(upper < arr, upper, arr)
+    return np.where(low > 0.0, low, 0.0)
+
+
 def is_bbox_inverted(bbox: List[float]) -> bool:
     """
     Check whether the bbox has inverted coordinates.
@@ -50,14 +73,26 @@ def swap_inverted_bbox(bbox: List[float]) -> List[float]:
     - If xmin > xmax swap them
     - If ymin > ymax swap them
 
+    The swap is written as unconditional min and max so there is no branch
+    on whether the box is actually inverted.
+
     Returns corrected bbox
     """
-    xmin, ymin, xmax, ymax = bbox
-    if xmin > xmax:
-        xmin, xmax = xmax, xmin
-    if ymin > ymax:
-        ymin, ymax = ymax, ymin
-    return [xmin, ymin, xmax, ymax]
+    a, b, c, d = bbox
+    return [min(a, c), min(b, d), max(a, c), max(b, d)]
+
+
+def swap_inverted_bboxes(bboxes: np.ndarray) -> np.ndarray:
+    """
+    Batched swap_inverted_bbox over an (N 4) array.
+
+    Returns a new array where every row satisfies xmin <= xmax and ymin <= ymax.
+    """
+    arr = np.asarray(bboxes)
+    out = np.empty_like(arr)
+    np.minimum(arr[:, 0:2], arr[:, 2:4], out=out[:, 0:2])
+    np.maximum(arr[:, 0:2], arr[:, 2:4], out=out[:, 2:4])
+    return out
 
 
 def bbox_area(bbox: List[float]) -> float:
@@ -70,3 +105,34 @@ def bbox_area(bbox: List[float]) -> float:
     w = max(0.0, xmax - xmin)
     h = max(0.0, ymax - ymin)
     return w * h
+
+
+_INVALID_ROW = (np.nan, np.nan, np.nan, np.nan)
+
+
+def record_boxes(rec: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Boxes of a record's annotations as an (N 4) float64 array, one row per
+    annotation in order, and a boolean mask of the rows that parsed.
+
+    The loader's preparsed rec["_boxes"] is returned as is when it covers
+    every annotation. Otherwise each bbox (default [0 0 0 0]) must be four
+    values float accepts, rows that are not become NaN and are False in the
+    mask. A bbox that parses to NaN is kept and stays True.
+    """
+    anns = rec.get("annotations", []) or []
+    pre = rec.get("_boxes")
+    if pre is not None and pre.shape[0] == len(anns):
+        return pre, np.ones(len(anns), dtype=bool)
+    rows = []
+    valid = []
+    for ann in anns:
+        try:
+            x0, y0, x1, y1 = map(float, ann.get("bbox", [0, 0, 0, 0]))
+        except Exception:
+            rows.append(_INVALID_ROW)
+            valid.append(False)
+            continue
+        rows.append((x0, y0, x1, y1))
+        valid.append(True)
+    return np.array(rows, dtype=np.float64).reshape(-1, 4), np.array(valid, dtype=bool)
@@ -16,19 +16,25 @@ Key runtime features
 
 from __future__ import annotations
 
-from typing import Optional, Dict, Any, Callable, Tuple
+from typing import Optional, Dict, Any, Callable, Iterable, Tuple, List
 import logging
 import importlib
 import pkgutil
 import json
 import hashlib
 import pickle
-from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError
-from multiprocessing import cpu_count
+import mmap
+import struct
+import threading
+import time
+import atexit
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import cpu_count, shared_memory
 from pathlib import Path
 from collections import OrderedDict
+from itertools import islice
 
-from .data_io import ImageCollectionLoader, discover_splits, build_index_for_split
+from .data_io import ImageCollectionLoader, discover_splits, build_index_for_split, public_index
 
 # core checks and distribution modules. If any import fails we will capture the error during runtime
 try:
@@ -61,8 +67,105 @@ try:
 except Exception:  # pragma: no cover
     generate_pdf_report = None
 
+try:
+    import numpy as _np  # type: ignore
+except Exception:  # pragma: no cover
+    _np = None
+
+# optional C accelerated JSON encoder for internal canonical serialization
+try:
+    import orjson as _orjson  # type: ignore
+
+    def _dumps_sorted(obj: Any) -> bytes:
+        return _orjson.dumps(obj, default=str, option=_orjson.OPT_SORT_KEYS | _orjson.OPT_NON_STR_KEYS)
+except Exception:
+    _orjson = None
+
+    def _dumps_sorted(obj: Any) -> bytes:
+        return json.dumps(obj, sort_keys=True, default=str).encode("utf-8")
+
 logger = logging.getLogger(__name__)
 
+# persistent feature worker pool shared by all audits in this process
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+# indices with at least this many records are shipped to workers through shared memory
+_SHARED_INDEX_MIN_ITEMS = 256
+# per worker process memo of the index decoded from shared memory
+_INDEX_MEMO: Dict[str, Any] = {}
+# per worker process memo of "module:attribute" -> resolved feature runner
+_RUNNER_CACHE: Dict[str, Callable] = {}
+
+
+def _worker_init():
+    """
+    Pool initializer. Preload the heavy imports once per worker process so
+    individual feature tasks do not pay for them.
+    """
+    try:
+        import numpy  # noqa: F401
+        import PIL.Image  # noqa: F401
+        import cveda.features  # noqa: F401
+    except Exception:
+        logger.debug("Worker warmup import failed", exc_info=True)
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Return the module level process pool, creating it on first use or when
+    the requested worker count changed or the previous pool broke.
+    """
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is not None and (_POOL_WORKERS != max_workers or getattr(_POOL, "_broken", False)):
+            _POOL.shutdown(wait=False)
+            _POOL = None
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=max_workers, initializer=_worker_init)
+            _POOL_WORKERS = max_workers
+        return _POOL
+
+
+def _shutdown_pool(wait: bool = True) -> None:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=wait)
+            _POOL = None
+            _POOL_WORKERS = 0
+
+
+def _discard_pool(futures: Iterable[Future] = ()) -> None:
+    """
+    Drop the shared pool after a feature timed out. cancel() cannot stop a
+    task a worker already runs, so the pool would lose that worker for the
+    rest of the process, its processes are terminated and the next audit
+    starts fresh workers.
+
+    futures are cancelled first, by hand since shutdown(cancel_futures=True)
+    needs Python 3.9.
+    """
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None:
+            return
+        procs = list((getattr(_POOL, "_processes", None) or {}).values())
+        for fut in futures:
+            fut.cancel()
+        _POOL.shutdown(wait=False)
+        for p in procs:
+            try:
+                p.terminate()
+            except Exception:
+                logger.debug("Failed to terminate feature worker", exc_info=True)
+        _POOL = None
+        _POOL_WORKERS = 0
+
+
+atexit.register(_shutdown_pool)
+
 
 def _discover_feature_modules() -> Dict[str, Any]:
     """
@@ -93,31 +196,90 @@ def _index_fingerprint(index: Dict[str, Any], keep_keys: Tuple[str, ...] = ("fil
     """
     Compute a small deterministic fingerprint for the index to use for caching.
 
-    The fingerprint uses a stable JSON serialization of a limited number of
-    index entries and then SHA256 hashes the result.
+    The first max_items index entries are streamed straight into a SHA256
+    hasher, one update per field, without building an intermediate list or
+    JSON string.
+
+    It is recomputed on every call. At most max_items records are hashed so
+    it is cheap, and a memo keyed by the index object would go stale when
+    records are edited in place.
     """
     try:
-        items = []
-        i = 0
-        for fname, rec in (index or {}).items():
-            if i >= max_items:
-                break
-            small = {k: rec.get(k) for k in keep_keys}
-            items.append((fname, small))
-            i += 1
-        s = json.dumps(items, sort_keys=True, default=str)
-        return hashlib.sha256(s.encode("utf-8")).hexdigest()
+        h = hashlib.sha256()
+        for fname, rec in islice((index or {}).items(), max_items):
+            h.update(str(fname).encode("utf-8"))
+            for k in keep_keys:
+                v = rec.get(k)
+                if type(v) is int and -(1 << 63) <= v < (1 << 63):
+                    h.update(b"\x00i")
+                    h.update(struct.pack("<q", v))
+                else:
+                    h.update(b"\x00s")
+                    h.update(str(v).encode("utf-8"))
+            h.update(b"\x01")
+        return h.hexdigest()
     except Exception:
         return hashlib.sha256(repr(index).encode("utf-8")).hexdigest()
 
 
+def _canonical_cfg(obj: Any) -> Any:
+    """
+    Convert a feature config into nested tuples with sorted dict keys so that
+    its pickle is identical across runs and dict insertion orders. Keys keep
+    their type name so {1: x} and {"1": x} stay distinct.
+    """
+    if isinstance(obj, dict):
+        items = (((type(k).__name__, k), _canonical_cfg(v)) for k, v in obj.items())
+        return tuple(sorted(items, key=lambda kv: kv[0]))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_canonical_cfg(v) for v in obj)
+    if isinstance(obj, (set, frozenset)):
+        return tuple(sorted(repr(v) for v in obj))
+    return obj
+
+
+def _feature_cache_key(feat_name: str, index_fp: str, feat_cfg: Optional[Dict[str, Any]]) -> str:
+    """
+    Cache key for one feature run. The config is hashed through pickle of its
+    canonical form, JSON is only used for configs that cannot be pickled.
+    """
+    h = hashlib.sha256(f"{feat_name}:{index_fp}:".encode("utf-8"))
+    try:
+        h.update(pickle.dumps(_canonical_cfg(feat_cfg or {}), protocol=5))
+    except Exception:
+        h.update(_dumps_sorted(feat_cfg or {}))
+    return h.hexdigest()
+
+
 def _cache_load(cache_dir: Path, key: str):
+    """
+    Load a cached payload written by _cache_save.
+
+    The .pkl file holds the list of out of band buffer lengths followed by the
+    protocol 5 pickle stream. Buffers are memory mapped from the .bin sidecar
+    so numpy arrays are restored without copying through the pickle stream.
+    """
     path = cache_dir / f"{key}.pkl"
     if not path.exists():
         return None
     try:
         with open(path, "rb") as f:
-            return pickle.load(f)
+            lengths = pickle.load(f)
+            buffers = []
+            if lengths:
+                if sum(lengths) > 0:
+                    with open(cache_dir / f"{key}.bin", "rb") as bf:
+                        # copy on write mapping keeps restored arrays writable
+                        mm = mmap.mmap(bf.fileno(), 0, access=mmap.ACCESS_COPY)
+                    view = memoryview(mm)
+                else:
+                    # only zero length arrays, their .bin is empty and cannot be mapped
+                    view = memoryview(bytearray())
+                offset = 0
+                for n in lengths:
+                    buffers.append(view[offset:offset + n])
+                    offset += n
+            return pickle.load(f, buffers=buffers)
     except Exception:
         logger.debug("Cache load failed for %s", str(path), exc_info=True)
         return None
@@ -127,69 +289,303 @@ def _cache_save(cache_dir: Path, key: str, payload):
     try:
         cache_dir.mkdir(parents=True, exist_ok=True)
         path = cache_dir / f"{key}.pkl"
+        bin_path = cache_dir / f"{key}.bin"
+        buffers: List[pickle.PickleBuffer] = []
+        data = pickle.dumps(payload, protocol=5, buffer_callback=buffers.append)
+        lengths = []
+        if buffers:
+            with open(bin_path, "wb") as bf:
+                for buf in buffers:
+                    raw = buf.raw()
+                    bf.write(raw)
+                    lengths.append(raw.nbytes)
+        elif bin_path.exists():
+            bin_path.unlink()
         with open(path, "wb") as f:
-            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(lengths, f, protocol=5)
+            f.write(data)
     except Exception:
         logger.debug("Failed to save cache for %s", key, exc_info=True)
 
 
+def _san_identity(obj):
+    return obj
+
+
+def _san_dict(obj):
+    return {k: _sanitize_for_json(v) for k, v in obj.items()}
+
+
+def _san_list(obj):
+    return [_sanitize_for_json(v) for v in obj]
+
+
+def _san_path(obj):
+    return str(obj)
+
+
+def _san_ndarray(obj):
+    try:
+        return _sanitize_for_json(obj.tolist())
+    except Exception:
+        return str(obj)
+
+
+def _san_np_generic(obj):
+    try:
+        return obj.item()
+    except Exception:
+        return float(obj)
+
+
+# exact type -> handler, numpy scalar and Path subclasses are added on first sight
+_DISPATCH: Dict[type, Callable[[Any], Any]] = {
+    dict: _san_dict,
+    list: _san_list,
+    tuple: _san_list,
+    str: _san_identity,
+    int: _san_identity,
+    float: _san_identity,
+    bool: _san_identity,
+    type(None): _san_identity,
+}
+if _np is not None:
+    _DISPATCH[_np.ndarray] = _san_ndarray
+
+
+def _sanitize_fallback(obj):
+    """
+    isinstance based resolution for types missing from the dispatch table.
+    The resolved handler is cached for the exact type so the next lookup is direct.
+    """
+    handler = None
+    if isinstance(obj, dict):
+        handler = _san_dict
+    elif isinstance(obj, (list, tuple)):
+        handler = _san_list
+    elif _np is not None and isinstance(obj, _np.ndarray):
+        handler = _san_ndarray
+    elif _np is not None and isinstance(obj, _np.generic):
+        handler = _san_np_generic
+    elif isinstance(obj, Path):
+        handler = _san_path
+    if handler is not None:
+        _DISPATCH[type(obj)] = handler
+        return handler(obj)
+    # fallback: for leaves the json encoder accepts exactly the str int and float
+    # subclasses, so test for them directly instead of serializing to probe
+    if isinstance(obj, (str, int, float)):
+        return obj
+    return str(obj)
+
+
 def _sanitize_for_json(obj):
     """
     Recursively convert numpy scalars and nd arrays and pathlib Paths to native
     Python types. This keeps the final audit result JSON serializable.
     """
+    handler = _DISPATCH.get(type(obj))
+    if handler is not None:
+        return handler(obj)
+    return _sanitize_fallback(obj)
+
+
+_PRIMS = frozenset((int, float, str, bool, type(None)))
+
+
+def _maybe_sanitize(obj):
+    """
+    Sanitize a feature output only when it may need it.
+
+    Flat dicts of primitives are returned as is. A runner whose nested output
+    is already JSON clean can opt out of the recursive walk by setting the
+    top level key "_already_json" to True, the marker is dropped here.
+    """
+    if type(obj) is dict:
+        if obj.get("_already_json") is True:
+            return {k: v for k, v in obj.items() if k != "_already_json"}
+        if all(type(v) in _PRIMS for v in obj.values()):
+            return obj
+    return _sanitize_for_json(obj)
+
+
+def _share_index(index: Dict[str, Any]) -> Tuple[Optional[shared_memory.SharedMemory], Any]:
+    """
+    Pickle the index once into a shared memory block.
+
+    Returns the block, which the caller must release, and the argument to pass
+    to workers. Small indices and platforms without shared memory keep the
+    inline path and return (None, index).
+    """
+    if len(index) < _SHARED_INDEX_MIN_ITEMS:
+        return None, index
     try:
-        import numpy as _np  # type: ignore
+        payload = pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(payload)))
+        shm.buf[:len(payload)] = payload
+        return shm, ("shm", shm.name, len(payload))
     except Exception:
-        _np = None
+        logger.debug("Shared memory index unavailable, shipping index inline", exc_info=True)
+        return None, index
 
-    if isinstance(obj, dict):
-        return {k: _sanitize_for_json(v) for k, v in obj.items()}
-    if isinstance(obj, (list, tuple)):
-        return [_sanitize_for_json(v) for v in obj]
-    if _np is not None:
-        if hasattr(_np, "ndarray") and isinstance(obj, _np.ndarray):
-            try:
-                return _sanitize_for_json(obj.tolist())
-            except Exception:
-                return str(obj)
-        if hasattr(_np, "generic") and isinstance(obj, _np.generic):
-            try:
-                return obj.item()
-            except Exception:
-                return float(obj)
-    if isinstance(obj, Path):
-        return str(obj)
-    # fallback
+
+def _release_shared_index(shm: Optional[shared_memory.SharedMemory]) -> None:
+    if shm is None:
+        return
     try:
-        json.dumps(obj)
-        return obj
+        shm.close()
+        shm.unlink()
     except Exception:
-        return str(obj)
+        logger.debug("Failed to release shared index %s", shm.name, exc_info=True)
+
+
+def _resolve_index(index: Any) -> Dict[str, Any]:
+    """
+    Return the index for a worker argument that is either the index itself or a
+    shared memory handle. Decoded indices are memoized per process so every
+    feature in a worker reuses the same copy.
+    """
+    if not (isinstance(index, tuple) and len(index) == 3 and index[0] == "shm"):
+        return index
+    _, name, size = index
+    cached = _INDEX_MEMO.get(name)
+    if cached is None:
+        shm = shared_memory.SharedMemory(name=name)
+        view = shm.buf[:size]
+        try:
+            cached = pickle.loads(view)
+        finally:
+            view.release()
+            shm.close()
+        # keep only the index of the current audit
+        _INDEX_MEMO.clear()
+        _INDEX_MEMO[name] = cached
+    return cached
+
+
+def _resolve_runner(target: str) -> Callable:
+    """
+    Resolve a "module:attribute" runner path, memoized per process so repeated
+    tasks in a long lived worker skip the import and attribute lookups.
+    """
+    runner = _RUNNER_CACHE.get(target)
+    if runner is None:
+        module_name, _, attr = target.partition(":")
+        runner = getattr(importlib.import_module(module_name), attr)
+        _RUNNER_CACHE[target] = runner
+    return runner
 
 
-def _feature_worker(module_name: str, runner_name: str, index: Dict[str, Any], cfg_slice: Dict[str, Any]):
+def _feature_worker(target: str, index: Any, cfg_slice: Dict[str, Any]):
     """
-    This function runs inside a worker process. It imports the requested module
-    by name, resolves the runner callable then executes it.
+    This function runs inside a worker process. It resolves the runner callable
+    from its "module:attribute" path, pre-resolved in the main process, then
+    executes it. index is either the index dict or a shared memory handle
+    produced by _share_index.
 
     The returned value is a JSON friendly dict or an error dict on failure.
     """
     try:
-        mod = importlib.import_module(module_name)
-        runner = getattr(mod, runner_name, None)
-        if not callable(runner):
-            runner = getattr(mod, "run", None)
-        if not callable(runner):
-            return {"status": "no-runner", "note": f"No runner {runner_name} or run callable found in {module_name}"}
-        out = runner(index, cfg_slice or {})
-        return _sanitize_for_json(out)
+        runner = _resolve_runner(target)
+        out = runner(_resolve_index(index), cfg_slice or {})
+        return _maybe_sanitize(out)
     except Exception as e:
         import traceback
-        logger.debug("Feature worker exception for %s", module_name, exc_info=True)
+        logger.debug("Feature worker exception for %s", target, exc_info=True)
         return {"status": "error", "error": str(e), "traceback": traceback.format_exc()}
 
 
+def _is_error(res: Any) -> bool:
+    # error results are reported but never cached, a rerun should retry the feature
+    return isinstance(res, dict) and res.get("status") == "error"
+
+
+def _run_with_deadlines(submit: Callable[[int], Future], n_jobs: int, max_workers: int, timeout: float) -> Tuple[Dict[int, Future], set]:
+    """
+    Submit jobs 0 .. n_jobs - 1 through submit with at most max_workers of
+    them in flight, each allowed timeout seconds from its submission.
+
+    A process pool reports a future as running once it sits in the call
+    queue, one ahead of the free workers, so a job is only handed over when
+    a worker is free and its clock starts when it actually starts. A job
+    that overran keeps its worker busy, when every worker is held that way
+    the jobs not yet submitted are reported as timed out as well.
+
+    Returns (future of every submitted job, ids of the jobs that timed out),
+    every future not timed out is done on return.
+    """
+    futures: Dict[int, Future] = {}
+    job_of: Dict[Future, int] = {}
+    # submitted futures that are neither done nor past their deadline
+    deadlines: Dict[Future, float] = {}
+    # futures past their deadline that still hold a worker
+    stuck: set = set()
+    timed_out: set = set()
+    next_job = 0
+    while True:
+        stuck = {fut for fut in stuck if not fut.done()}
+        for fut in [fut for fut in deadlines if fut.done()]:
+            del deadlines[fut]
+        while next_job < n_jobs and len(deadlines) + len(stuck) < max_workers:
+            fut = submit(next_job)
+            futures[next_job] = fut
+            job_of[fut] = next_job
+            deadlines[fut] = time.monotonic() + timeout
+            next_job += 1
+        now = time.monotonic()
+        for fut in [fut for fut, deadline in deadlines.items() if deadline <= now]:
+            del deadlines[fut]
+            stuck.add(fut)
+            timed_out.add(job_of[fut])
+        if not deadlines:
+            if next_job >= n_jobs:
+                break
+            if len(stuck) >= max_workers:
+                timed_out.update(range(next_job, n_jobs))
+                break
+            continue
+        wait(set(deadlines) | stuck, timeout=max(0.0, min(deadlines.values()) - now), return_when=FIRST_COMPLETED)
+    return futures, timed_out
+
+
+def _build_split_indices(splits: Dict[str, Path], max_workers: int, executor: str = "process", keep_raw: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the canonical index of every split.
+
+    With more than one split the builds run concurrently, on the persistent
+    process pool by default or on a thread pool when executor is "thread".
+    A split that fails to build maps to an empty index. keep_raw is passed to
+    the split loaders so split records match the main index.
+    """
+    names = list(splits.keys())
+    indices_by_split: Dict[str, Dict[str, Any]] = {}
+    if len(names) <= 1:
+        for name in names:
+            try:
+                indices_by_split[name] = build_index_for_split(str(splits[name]), recursive=True, keep_raw=keep_raw)
+            except Exception:
+                logger.exception("Failed building index for split %s", name)
+                indices_by_split[name] = {}
+        return indices_by_split
+
+    if executor == "thread":
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, len(names)))
+    else:
+        pool = _get_pool(max_workers)
+    try:
+        futures = [pool.submit(build_index_for_split, str(splits[name]), True, keep_raw) for name in names]
+        for name, fut in zip(names, futures):
+            try:
+                indices_by_split[name] = fut.result()
+            except Exception:
+                logger.exception("Failed building index for split %s", name)
+                indices_by_split[name] = {}
+    finally:
+        if executor == "thread":
+            pool.shutdown(wait=True)
+    return indices_by_split
+
+
 class CVEDA:
     """
     High level dataset auditor.
@@ -208,7 +604,7 @@ class CVEDA:
         Mapping of discovered feature short name to module object
     """
 
-    def __init__(self, loader_or_root: Any):
+    def __init__(self, loader_or_root: Any, keep_raw: bool = False):
         """
         Accept either:
         - an ImageCollectionLoader instance
@@ -216,15 +612,29 @@ class CVEDA:
         - a string path to dataset root
 
         This allows tests to pass fake loader objects.
+
+        keep_raw is used when a root path is given, it keeps the original COCO
+        annotation dicts under annotation["raw"]. Features that read raw fields
+        (annotator ids, timestamps, segmentation, annotation ids) need it and
+        report no data without it. A loader passed in keeps its own setting.
         """
         # If object already looks like a loader (duck typing)
         if hasattr(loader_or_root, "build_index") and callable(getattr(loader_or_root, "build_index")):
             self.loader = loader_or_root
         else:
             # treat string or path-like as dataset root
-            self.loader = ImageCollectionLoader(str(loader_or_root), recursive=True)
+            self.loader = ImageCollectionLoader(str(loader_or_root), recursive=True, keep_raw=keep_raw)
         self._feature_modules = _discover_feature_modules()
 
+    def close(self) -> None:
+        """
+        Shut down the shared feature worker pool.
+
+        The pool is kept alive between audits to avoid re-spawning workers,
+        call this when no further audits will run in this process.
+        """
+        _shutdown_pool()
+
     def run_audit(self, out_pdf: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Run the full audit pipeline and return a structured dictionary with results.
@@ -238,6 +648,8 @@ class CVEDA:
             Optional configuration dictionary. Supported keys:
             - features_parallel : bool default True
             - max_workers : int default number of CPUs
+            - split_index_executor : "process" or "thread" default "process", used to
+              build per split indices concurrently when more than one split exists
             - feature_timeout : int seconds default 300
             - feature_cache : bool default True
             - cache_dir : str default ".cveda_cache"
@@ -267,7 +679,8 @@ class CVEDA:
             logger.exception("Index build failed")
             raise
 
-        result["index"] = index
+        # the loader's preparsed arrays stay on the working index only
+        result["index"] = public_index(index)
 
         # 2) Run core checks and distribution modules with per step protection
         checks: Dict[str, Any] = {}
@@ -328,13 +741,10 @@ class CVEDA:
         try:
             splits = discover_splits(self.loader.root)
             if splits:
-                indices_by_split = {}
-                for name, path in splits.items():
-                    try:
-                        indices_by_split[name] = build_index_for_split(str(path), recursive=True)
-                    except Exception:
-                        logger.exception("Failed building index for split %s", name)
-                        indices_by_split[name] = {}
+                split_workers = max(1, int(cfg.get("max_workers", cpu_count())))
+                # split indices follow the raw retention of the main loader
+                keep_raw = bool(getattr(self.loader, "keep_raw", False))
+                indices_by_split = _build_split_indices(splits, split_workers, str(cfg.get("split_index_executor", "process")), keep_raw)
                 result["splits"] = {"found": True, "names": list(indices_by_split.keys()), "counts": {k: len(v) for k, v in indices_by_split.items()}}
             else:
                 result["splits"] = {"found": False}
@@ -373,41 +783,64 @@ class CVEDA:
             for name, mod in feature_items:
                 module_name = getattr(mod, "__name__", f"cveda.features.{name}")
                 runner_name = f"run_{name}"
-                tasks.append((name, module_name, runner_name, features_cfg.get(name, {})))
+                # resolve the runner here so workers get a single "module:attribute" path
+                if not callable(getattr(mod, runner_name, None)):
+                    runner_name = "run"
+                if not callable(getattr(mod, runner_name, None)):
+                    features_out[name] = {"status": "no-runner", "note": f"No runner run_{name} or run callable found in {module_name}"}
+                    continue
+                tasks.append((name, f"{module_name}:{runner_name}", features_cfg.get(name, {})))
+
+            # resolve cache hits up front so only pending work is shipped to the pool
+            pending = []
+            for feat_name, target, feat_cfg in tasks:
+                cache_key = None
+                if cache_enabled:
+                    cache_key = _feature_cache_key(feat_name, index_fp, feat_cfg)
+                    cached = _cache_load(cache_dir, f"{feat_name}_{cache_key}")
+                    if cached is not None and not _is_error(cached):
+                        features_out[feat_name] = _maybe_sanitize(cached)
+                        continue
+                pending.append((feat_name, cache_key, target, feat_cfg))
 
-            # submit tasks into process pool
-            with ProcessPoolExecutor(max_workers=max_workers) as exec_:
-                future_to_meta = {}
-                for feat_name, module_name, runner_name, feat_cfg in tasks:
-                    cache_key = None
-                    if cache_enabled:
-                        cfg_ser = json.dumps(feat_cfg or {}, sort_keys=True, default=str)
-                        raw_key = f"{feat_name}:{index_fp}:{cfg_ser}"
-                        cache_key = hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
-                        cached = _cache_load(cache_dir, f"{feat_name}_{cache_key}")
-                        if cached is not None:
-                            features_out[feat_name] = cached
-                            continue
-                    fut = exec_.submit(_feature_worker, module_name, runner_name, index, feat_cfg)
-                    future_to_meta[fut] = (feat_name, cache_key)
-
-                # collect results with timeouts
-                for fut in as_completed(list(future_to_meta.keys())):
-                    feat_name, cache_key = future_to_meta[fut]
-                    try:
-                        res = fut.result(timeout=feature_timeout)
-                    except TimeoutError:
-                        logger.exception("Feature %s timed out after %s seconds", feat_name, feature_timeout)
+            # serialize the index once, workers receive a shared memory handle instead of a copy per task
+            shm, index_arg = _share_index(index) if pending else (None, index)
+
+            try:
+                # features go to the persistent process pool, it stays alive between audits
+                exec_ = _get_pool(max_workers)
+
+                def submit(k: int) -> Future:
+                    _, _, target, feat_cfg = pending[k]
+                    return exec_.submit(_feature_worker, target, index_arg, feat_cfg)
+
+                # a slow feature only times out itself, finished features keep their results
+                futures, timed_out = _run_with_deadlines(submit, len(pending), max_workers, feature_timeout)
+                for k, (feat_name, cache_key, _, _) in enumerate(pending):
+                    fut = futures.get(k)
+                    if k in timed_out:
+                        if fut is not None:
+                            fut.cancel()
+                            logger.error("Feature %s timed out after %s seconds", feat_name, feature_timeout)
+                        else:
+                            logger.error("Feature %s not started, every worker is held by a timed out feature", feat_name)
                         res = {"status": "error", "error": "timeout"}
-                    except Exception:
-                        logger.exception("Feature %s failed during execution", feat_name)
-                        res = {"status": "error", "error": "execution failed"}
+                    else:
+                        try:
+                            res = fut.result()
+                        except Exception:
+                            logger.exception("Feature %s failed during execution", feat_name)
+                            res = {"status": "error", "error": "execution failed"}
                     features_out[feat_name] = res
-                    if cache_enabled and cache_key:
+                    if cache_enabled and cache_key and not _is_error(res):
                         try:
                             _cache_save(cache_dir, f"{feat_name}_{cache_key}", res)
                         except Exception:
                             logger.debug("Cache save failed for feature %s", feat_name, exc_info=True)
+                if timed_out:
+                    _discard_pool(futures.values())
+            finally:
+                _release_shared_index(shm)
         else:
             # sequential execution fallback
             for name, mod in feature_items:
@@ -416,21 +849,19 @@ class CVEDA:
                     feat_cfg = features_cfg.get(name, {})
                     cache_key = None
                     if cache_enabled:
-                        cfg_ser = json.dumps(feat_cfg or {}, sort_keys=True, default=str)
-                        raw_key = f"{name}:{index_fp}:{cfg_ser}"
-                        cache_key = hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+                        cache_key = _feature_cache_key(name, index_fp, feat_cfg)
                         cached = _cache_load(cache_dir, f"{name}_{cache_key}")
-                        if cached is not None:
-                            features_out[name] = cached
+                        if cached is not None and not _is_error(cached):
+                            features_out[name] = _maybe_sanitize(cached)
                             continue
                     runner = getattr(mod, f"run_{name}", None) or getattr(mod, "run", None)
                     if not callable(runner):
                         features_out[name] = {"status": "no-runner", "note": f"No run_{name} or run callable found in module {name}"}
                         continue
                     out = runner(index, feat_cfg)
-                    out = _sanitize_for_json(out)
-                    features_out[name] = out
-                    if cache_enabled and cache_key:
+                    # the cache keeps raw arrays for out of band pickling, only the result is sanitized
+                    features_out[name] = _maybe_sanitize(out)
+                    if cache_enabled and cache_key and not _is_error(out):
                         _cache_save(cache_dir, f"{name}_{cache_key}", out)
                 except Exception:
                     logger.exception("Feature %s execution failed", name)
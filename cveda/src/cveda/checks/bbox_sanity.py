@@ -17,8 +17,15 @@ Design choices
 from typing import List, Dict, Any, Optional, Tuple
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# shared empty sentinel, avoids allocating a fresh list for records without annotations
+_EMPTY: Tuple[Any, ...] = ()
+# bbox keys probed only when the canonical "bbox" key is missing or empty
+_BBOX_FALLBACK_KEYS = ("box", "bbox_xyxy")
+
 
 def _as_floats(bbox: List[Any]) -> Optional[Tuple[float, float, float, float]]:
     """
@@ -39,6 +46,45 @@ def _as_floats(bbox: List[Any]) -> Optional[Tuple[float, float, float, float]]:
         return None
 
 
+def _extract_bbox_soa(index: Dict[str, Any]) -> Tuple[np.ndarray, List[Tuple[str, int, Any]]]:
+    """
+    Walk the index once and collect every bbox into a contiguous (N, 4) float64 array.
+
+    Returns
+    - coords: array with columns x_min, y_min, x_max, y_max. Rows whose bbox
+      could not be converted to four floats are filled with NaN so that every
+      comparison on them evaluates to False.
+    - meta: list parallel to coords rows holding (file_name, ann_index, original_bbox)
+    """
+    meta: List[Tuple[str, int, Any]] = []
+    rows: List[Tuple[float, float, float, float]] = []
+    invalid = (np.nan, np.nan, np.nan, np.nan)
+    meta_append = meta.append
+    rows_append = rows.append
+    for fname, rec in index.items():
+        anns = rec.get("annotations") or _EMPTY
+        for i, ann in enumerate(anns):
+            bbox = ann.get("bbox")
+            if not bbox:
+                # loaders canonicalize to "bbox", alternate keys only appear in hand built indices
+                for key in _BBOX_FALLBACK_KEYS:
+                    bbox = ann.get(key)
+                    if bbox:
+                        break
+                else:
+                    continue
+            vals = _as_floats(bbox)
+            meta_append((fname, i, bbox))
+            rows_append(vals if vals is not None else invalid)
+    if not rows:
+        return np.empty((0, 4), dtype=np.float64), meta
+    return np.asarray(rows, dtype=np.float64), meta
+
+
+def _gather(mask: np.ndarray, meta: List[Tuple[str, int, Any]]) -> List[Dict[str, Any]]:
+    return [{"file_name": meta[k][0], "ann_index": meta[k][1], "bbox": meta[k][2]} for k in np.flatnonzero(mask)]
+
+
 def find_zero_area_boxes(index: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Find boxes with zero area.
@@ -49,23 +95,11 @@ def find_zero_area_boxes(index: Dict[str, Any]) -> List[Dict[str, Any]]:
     Returns
     - list of dicts with keys: file_name, ann_index, bbox
     """
-    results: List[Dict[str, Any]] = []
-    for fname, rec in index.items():
-        anns = rec.get("annotations") or []
-        for i, ann in enumerate(anns):
-            bbox = ann.get("bbox") or ann.get("box") or ann.get("bbox_xyxy")
-            if not bbox:
-                continue
-            vals = _as_floats(bbox)
-            if vals is None:
-                continue
-            x_min, y_min, x_max, y_max = vals
-            width = x_max - x_min
-            height = y_max - y_min
-            # zero area when width == 0 or height == 0
-            if width == 0.0 or height == 0.0:
-                results.append({"file_name": fname, "ann_index": i, "bbox": bbox})
-    return results
+    coords, meta = _extract_bbox_soa(index)
+    width = coords[:, 2] - coords[:, 0]
+    height = coords[:, 3] - coords[:, 1]
+    # zero area when width == 0 or height == 0
+    return _gather((width == 0.0) | (height == 0.0), meta)
 
 
 def find_inverted_boxes(index: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -75,18 +109,8 @@ def find_inverted_boxes(index: Dict[str, Any]) -> List[Dict[str, Any]]:
     An inverted box is one where, after interpreting the four numbers
     as xyxy, either x_max < x_min or y_max < y_min.
     """
-    results: List[Dict[str, Any]] = []
-    for fname, rec in index.items():
-        anns = rec.get("annotations") or []
-        for i, ann in enumerate(anns):
-            bbox = ann.get("bbox") or ann.get("box") or ann.get("bbox_xyxy")
-            if not bbox:
-                continue
-            vals = _as_floats(bbox)
-            if vals is None:
-                continue
-            x_min, y_min, x_max, y_max = vals
-            # inverted when either difference is negative
-            if (x_max - x_min) < 0.0 or (y_max - y_min) < 0.0:
-                results.append({"file_name": fname, "ann_index": i, "bbox": bbox})
-    return results
+    coords, meta = _extract_bbox_soa(index)
+    width = coords[:, 2] - coords[:, 0]
+    height = coords[:, 3] - coords[:, 1]
+    # inverted when either difference is negative
+    return _gather((width < 0.0) | (height < 0.0), meta)
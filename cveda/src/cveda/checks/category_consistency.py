@@ -23,25 +23,24 @@ def run_category_consistency(index: Dict[str, Any], cfg: Dict[str, Any] = None)
     - suggestions dict with possible next steps
     """
     declared: Set[str] = set()
-    used: Set[str] = set()
+    seen_category_maps: Set[int] = set()
 
-    # find declared classes from index meta if present
-    for fname, rec in index.items():
-        meta = rec.get("meta", {})
+    # find declared classes from index meta if present.
+    # records of a COCO dataset share one category map, so each map object is read once
+    for rec in index.values():
+        meta = rec.get("meta") or {}
         categories = meta.get("categories") or meta.get("category_map")
-        if categories and isinstance(categories, dict):
-            for v in categories.values():
-                declared.add(str(v))
-
-        for ann in rec.get("annotations", []):
-            cls = ann.get("class")
-            if cls is not None:
-                used.add(str(cls))
-
-    declared_list = sorted(list(declared))
-    used_list = sorted(list(used))
-    declared_but_unused = [c for c in declared_list if c not in used]
-    used_but_undeclared = [c for c in used_list if c not in declared]
+        if categories and isinstance(categories, dict) and id(categories) not in seen_category_maps:
+            seen_category_maps.add(id(categories))
+            declared.update(map(str, categories.values()))
+
+    used_cls = [ann.get("class") for rec in index.values() for ann in rec.get("annotations", ())]
+    used: Set[str] = {str(c) for c in used_cls if c is not None}
+
+    declared_list = sorted(declared)
+    used_list = sorted(used)
+    declared_but_unused = sorted(declared - used)
+    used_but_undeclared = sorted(used - declared)
     suggestions = {
         "provide_class_map": bool(used and not declared),
         "auto_reindex_option": True
@@ -7,6 +7,11 @@ and parse failures. This module aims to be robust and return a list of issues.
 
 from typing import Dict, Any, List
 
+import numpy as np
+
+# shared read only fallback for records without meta
+_EMPTY_META: Dict[str, Any] = {}
+
 
 def run_completeness_audit(index: Dict[str, Any], cfg: Dict[str, Any] = None) -> Dict[str, Any]:
     """
@@ -24,20 +29,19 @@ def run_completeness_audit(index: Dict[str, Any], cfg: Dict[str, Any] = None) ->
     cfg = cfg or {}
     treat_empty_as_error = cfg.get("treat_empty_as_error", False)
 
-    images_without_annotations = []
-    parse_failures = []
     # For orphan annotations we rely on the loader to include them in index if they reference files
     # Since our canonical index is image keyed this auditor focuses on image side issues.
-    for fname, rec in index.items():
-        anns = rec.get("annotations", [])
-        meta = rec.get("meta", {})
-        if meta and meta.get("error"):
-            parse_failures.append({"file_name": fname, "error": meta.get("error")})
-        if not anns:
-            if treat_empty_as_error:
-                images_without_annotations.append({"file_name": fname, "reason": "empty"})
-            else:
-                images_without_annotations.append({"file_name": fname, "reason": "no_annotations"})
+    # Both conditions are evaluated into boolean masks in one pass, then only the hits are materialized.
+    fnames = list(index.keys())
+    recs = list(index.values())
+    n = len(fnames)
+    _get = dict.get
+    has_err = np.fromiter((bool(_get(_get(rec, "meta") or _EMPTY_META, "error")) for rec in recs), dtype=bool, count=n)
+    no_ann = np.fromiter((not _get(rec, "annotations") for rec in recs), dtype=bool, count=n)
+
+    parse_failures = [{"file_name": fnames[i], "error": recs[i]["meta"]["error"]} for i in np.flatnonzero(has_err)]
+    reason = "empty" if treat_empty_as_error else "no_annotations"
+    images_without_annotations = [{"file_name": fnames[i], "reason": reason} for i in np.flatnonzero(no_ann)]
     return {
         "images_without_annotations": images_without_annotations,
         "parse_failures": parse_failures,
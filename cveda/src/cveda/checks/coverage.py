@@ -2,10 +2,53 @@
 Annotation coverage audit.
 
 Compute fraction of image area covered by annotations and flag images with very low coverage.
+
+The per image area accumulation runs over contiguous coordinate arrays. When numba
+is installed a compiled serial kernel is used, otherwise a numpy bincount fallback.
 """
 
-from typing import Dict, Any, List
-from ..annotations import bbox_area
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+# shared empty sentinel, avoids allocating a fresh list for records without annotations
+_EMPTY: Tuple[Any, ...] = ()
+
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except Exception:
+    _NUMBA_AVAILABLE = False
+
+
+if _NUMBA_AVAILABLE:
+    # serial on purpose: parallel=True starts numba's threading layer, and a process
+    # pool forked after that hangs the parent at interpreter exit
+    @njit(cache=True)
+    def _coverage_totals_nb(coords, offsets):  # pragma: no cover - requires numba
+        n = offsets.shape[0] - 1
+        out = np.zeros(n, dtype=np.float64)
+        for i in range(n):
+            total = 0.0
+            for k in range(offsets[i], offsets[i + 1]):
+                w = coords[k, 2] - coords[k, 0]
+                h = coords[k, 3] - coords[k, 1]
+                w = w if w > 0.0 else 0.0
+                h = h if h > 0.0 else 0.0
+                total += w * h
+            out[i] = total
+        return out
+
+
+def _coverage_totals_np(coords: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    n = offsets.shape[0] - 1
+    if coords.shape[0] == 0:
+        return np.zeros(n, dtype=np.float64)
+    # fmax clamps NaN widths to 0 like max(0.0, x), np.maximum would propagate them
+    w = np.fmax(coords[:, 2] - coords[:, 0], 0.0)
+    h = np.fmax(coords[:, 3] - coords[:, 1], 0.0)
+    owner = np.repeat(np.arange(n), np.diff(offsets))
+    return np.bincount(owner, weights=w * h, minlength=n)
 
 
 def annotation_coverage(index: Dict[str, Any], low_threshold: float = 0.01) -> Dict[str, Any]:
@@ -18,18 +61,37 @@ def annotation_coverage(index: Dict[str, Any], low_threshold: float = 0.01) -> D
     per = {}
     low = []
     areas = []
+
+    # gather coordinates once, annotations of an image are contiguous rows in coords
+    rows: List[Any] = []
+    offsets = [0]
+    images = []
+    rows_append = rows.append
     for fname, rec in index.items():
-        w = rec.get("width")
-        h = rec.get("height")
+        rec_get = rec.get
+        w = rec_get("width")
+        h = rec_get("height")
         if not w or not h:
             per[fname] = {"coverage": None}
             continue
-        img_area = float(w) * float(h)
-        total = 0.0
-        for ann in rec.get("annotations", []):
-            total += bbox_area(ann["bbox"])
+        anns = rec_get("annotations", _EMPTY)
+        for ann in anns:
+            rows_append(ann["bbox"])
+        offsets.append(len(rows))
+        entry = {"coverage": None, "n_ann": len(anns)}
+        per[fname] = entry
+        images.append((fname, float(w) * float(h), entry))
+
+    coords = np.asarray(rows, dtype=np.float64).reshape(-1, 4)
+    offs = np.asarray(offsets, dtype=np.int64)
+    if _NUMBA_AVAILABLE:
+        totals = _coverage_totals_nb(coords, offs)
+    else:
+        totals = _coverage_totals_np(coords, offs)
+
+    for (fname, img_area, entry), total in zip(images, totals.tolist()):
         frac = total / img_area if img_area > 0 else 0.0
-        per[fname] = {"coverage": frac, "n_ann": len(rec.get("annotations", []))}
+        entry["coverage"] = frac
         areas.append(frac)
         if frac <= low_threshold:
             low.append({"file_name": fname, "coverage": frac})
@@ -8,7 +8,59 @@ This is a heuristic helper intended as guidance for building a hard negative min
 It is defensive and returns an empty list on error.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+
+def _bbox_array(anns: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Stack annotation bboxes into an (N 4) float64 array.
+
+    Annotations without a bbox count as an empty box. The whole list is
+    converted in one call, per box conversion with skipping of malformed
+    entries only runs when that fails.
+    """
+    boxes = [ann.get("bbox", (0.0, 0.0, 0.0, 0.0)) for ann in anns]
+    try:
+        arr = np.asarray(boxes, dtype=np.float64)
+        if arr.ndim == 2 and arr.shape[1] == 4:
+            return arr
+    except (TypeError, ValueError):
+        pass
+    rows = []
+    for bbox in boxes:
+        try:
+            x0, y0, x1, y1 = map(float, bbox)
+        except Exception:
+            continue
+        rows.append((x0, y0, x1, y1))
+    return np.asarray(rows, dtype=np.float64).reshape(-1, 4)
+
+
+def _hard_negative_entry(fname: str, n_boxes: int, arr: np.ndarray, img_area: float, small_box_relative: float) -> Optional[Dict[str, Any]]:
+    """
+    Candidate dict for one image or None when too few of its boxes are small.
+    """
+    # fmax turns a NaN area into 0 like max(0.0, area), so such boxes count as small
+    with np.errstate(invalid="ignore"):
+        areas = np.fmax((arr[:, 2] - arr[:, 0]) * (arr[:, 3] - arr[:, 1]), 0.0)
+    if img_area > 0:
+        mask = areas / img_area <= small_box_relative
+    else:
+        mask = np.zeros(areas.shape[0], dtype=bool)
+    small_count = int(mask.sum())
+    fraction = small_count / float(n_boxes) if n_boxes > 0 else 0.0
+    # require that a majority are small to flag it as a candidate
+    if fraction < 0.6:
+        return None
+    small_examples = [{"bbox": arr[k].tolist(), "area": float(areas[k])} for k in np.flatnonzero(mask)[:5]]
+    return {
+        "file_name": fname,
+        "n_boxes": n_boxes,
+        "small_fraction": fraction,
+        "example_small_boxes": small_examples
+    }
 
 
 def find_hard_negative_candidates(index: Dict[str, Any], min_boxes: int = 10, small_box_relative: float = 1e-4) -> List[Dict[str, Any]]:
@@ -52,31 +104,12 @@ def find_hard_negative_candidates(index: Dict[str, Any], min_boxes: int = 10, sm
             img_area = float(w) * float(h)
             if len(anns) < min_boxes:
                 continue
-            small_count = 0
-            small_examples = []
-            for ann in anns:
-                bbox = ann.get("bbox", [0.0, 0.0, 0.0, 0.0])
-                try:
-                    x0, y0, x1, y1 = map(float, bbox)
-                except Exception:
-                    continue
-                area = max(0.0, (x1 - x0) * (y1 - y0))
-                if img_area > 0 and (area / img_area) <= small_box_relative:
-                    small_count += 1
-                    if len(small_examples) < 5:
-                        small_examples.append({"bbox": [x0, y0, x1, y1], "area": area})
-            if len(anns) > 0:
-                fraction = small_count / float(len(anns))
-            else:
-                fraction = 0.0
-            # require that a majority are small to flag it as a candidate
-            if fraction >= 0.6:
-                out.append({
-                    "file_name": fname,
-                    "n_boxes": len(anns),
-                    "small_fraction": fraction,
-                    "example_small_boxes": small_examples
-                })
+            boxes = rec.get("_boxes")
+            if boxes is None or boxes.shape[0] != len(anns):
+                boxes = _bbox_array(anns)
+            entry = _hard_negative_entry(fname, len(anns), boxes, img_area, small_box_relative)
+            if entry is not None:
+                out.append(entry)
     except Exception:
         # fail safe, return what we gathered so far
         return out
@@ -6,9 +6,20 @@ The module implements a vectorized IoU calculation and a fallback grid
 based bounding box pre filter for performance on many boxes.
 """
 
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import os
+
 import numpy as np
 
+# above this many images run_overlap_checks spreads them over a thread pool
+_THREAD_MIN_IMAGES = 16
+# above this many boxes per image the sweep line pre filter replaces the all pairs enumeration
+_SWEEP_MIN_BOXES = 64
+# pairs examined per row block when scanning rows with an early exit
+_ROW_BLOCK_PAIRS = 1 << 16
+
 
 def iou_matrix(boxes: np.ndarray) -> np.ndarray:
     """
@@ -23,27 +34,54 @@ def iou_matrix(boxes: np.ndarray) -> np.ndarray:
     """
     if boxes.size == 0:
         return np.zeros((0, 0), dtype=float)
-    x1 = boxes[:, 0:1]
-    y1 = boxes[:, 1:2]
-    x2 = boxes[:, 2:3]
-    y2 = boxes[:, 3:4]
+    # structure of arrays, each coordinate is a contiguous vector
+    dtype = np.result_type(boxes.dtype, np.float32)
+    x1, y1, x2, y2 = np.ascontiguousarray(boxes.T, dtype=dtype)
 
-    area = np.clip((x2 - x1) * (y2 - y1), a_min=0.0, a_max=None).reshape(-1)
+    area = np.clip((x2 - x1) * (y2 - y1), a_min=0.0, a_max=None)
 
-    # broadcasted intersection coords
-    inter_x1 = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
-    inter_y1 = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
-    inter_x2 = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
-    inter_y2 = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+    # two NxN buffers are reused in place, inter ends up holding the IoU
+    inter = np.minimum(x2[:, None], x2[None, :])
+    inter -= np.maximum(x1[:, None], x1[None, :])
+    np.clip(inter, 0.0, None, out=inter)
+    buf = np.minimum(y2[:, None], y2[None, :])
+    buf -= np.maximum(y1[:, None], y1[None, :])
+    np.clip(buf, 0.0, None, out=buf)
+    inter *= buf
 
-    inter_w = np.clip(inter_x2 - inter_x1, a_min=0.0, a_max=None)
-    inter_h = np.clip(inter_y2 - inter_y1, a_min=0.0, a_max=None)
-    inter_area = inter_w * inter_h
+    # union, then divide in place where it is positive, zero elsewhere
+    np.add(area[:, None], area[None, :], out=buf)
+    buf -= inter
+    valid = buf > 0.0
+    np.divide(inter, buf, out=inter, where=valid)
+    inter[~valid] = 0.0
+    return inter
 
-    union = area[:, None] + area[None, :] - inter_area
-    # avoid division by zero
-    iou = np.where(union > 0.0, inter_area / union, 0.0)
-    return iou
+
+def pair_iou(boxes: np.ndarray, ii: np.ndarray, jj: np.ndarray) -> np.ndarray:
+    """
+    Compute IoU for selected box pairs only.
+
+    Parameters
+    boxes numpy array shape (N 4) each row xmin ymin xmax ymax
+    ii jj integer index arrays of equal length selecting the pairs
+
+    Returns
+    1D numpy array where entry k is IoU between boxes ii[k] and jj[k].
+    Works on gathered coordinates so no NxN temporaries are allocated, the
+    result has the dtype of boxes.
+    """
+    x1, y1, x2, y2 = np.ascontiguousarray(boxes.T)
+    area = np.clip((x2 - x1) * (y2 - y1), a_min=0.0, a_max=None)
+    inter_w = np.clip(np.minimum(x2[ii], x2[jj]) - np.maximum(x1[ii], x1[jj]), a_min=0.0, a_max=None)
+    inter_h = np.clip(np.minimum(y2[ii], y2[jj]) - np.maximum(y1[ii], y1[jj]), a_min=0.0, a_max=None)
+    inter_area = inter_w * inter_h
+    area_a = area[ii]
+    area_b = area[jj]
+    union = area_a + area_b - inter_area
+    out = np.zeros_like(inter_area)
+    np.divide(inter_area, union, out=out, where=union > 0.0)
+    return out
 
 
 def find_high_iou_pairs_for_image(boxes: List[List[float]], labels: List[Any], threshold: float = 0.9, max_pairs: int = 200) -> List[Dict[str, Any]]:
@@ -54,7 +92,8 @@ def find_high_iou_pairs_for_image(boxes: List[List[float]], labels: List[Any], t
     boxes list of [xmin ymin xmax ymax]
     labels list of class tokens parallel to boxes
     threshold float IoU threshold
-    max_pairs int maximum number of pairs to return to keep report small
+    max_pairs int maximum number of pairs to return to keep report small,
+    the highest IoU pairs are kept when more pass the threshold
 
     Returns
     list of dicts with keys:
@@ -64,45 +103,205 @@ def find_high_iou_pairs_for_image(boxes: List[List[float]], labels: List[Any], t
     """
     if not boxes:
         return []
-    arr = np.array(boxes, dtype=float)
-    iou_mat = iou_matrix(arr)
+    # pixel coordinates fit float32 comfortably, half the bandwidth of float64
+    arr = np.array(boxes, dtype=np.float32)
+    if arr.shape[0] > _SWEEP_MIN_BOXES and max_pairs > 0:
+        return _pairs_to_dicts(*_iou_pairs_rowwise(arr, threshold, max_pairs), labels, max_pairs)
+    return _pairs_to_dicts(*_iou_pairs_above(arr, threshold), labels, max_pairs)
+
+
+def _iou_pairs_rowwise(arr: np.ndarray, threshold: float, max_pairs: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scan rows in blocks of i and stop early once the report is settled.
+
+    Memory stays at one block of rows against all columns instead of every
+    pair. Once max_pairs pairs with IoU 1.0 are collected nothing later can
+    outrank them, ties go to the earlier pair, so the scan stops there. This
+    is the dense duplicate cluster case.
+    """
+    N = arr.shape[0]
+    x1, y1, x2, y2 = np.ascontiguousarray(arr.T)
+    cols = np.arange(N)
+    block = max(1, _ROW_BLOCK_PAIRS // N)
+    out_i: List[np.ndarray] = []
+    out_j: List[np.ndarray] = []
+    out_v: List[np.ndarray] = []
+    n_perfect = 0
+    for r0 in range(0, N, block):
+        r1 = min(N, r0 + block)
+        mask = cols[None, :] > np.arange(r0, r1)[:, None]
+        if threshold > 0.0:
+            # a positive IoU needs a positive intersection
+            mask &= (x1[None, :] < x2[r0:r1, None]) & (x2[None, :] > x1[r0:r1, None])
+            mask &= (y1[None, :] < y2[r0:r1, None]) & (y2[None, :] > y1[r0:r1, None])
+        bi, jj = np.nonzero(mask)
+        ii = bi + r0
+        vals = pair_iou(arr, ii, jj)
+        keep = np.flatnonzero(vals >= threshold)
+        out_i.append(ii[keep])
+        out_j.append(jj[keep])
+        out_v.append(vals[keep])
+        n_perfect += int(np.count_nonzero(vals[keep] >= 1.0))
+        if n_perfect >= max_pairs:
+            break
+    return np.concatenate(out_i), np.concatenate(out_j), np.concatenate(out_v)
+
+
+def _iou_pairs_above(arr: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return (i, j, iou) arrays for every pair i < j with IoU >= threshold,
+    ordered by i then j.
+    """
     N = arr.shape[0]
+    if N > _SWEEP_MIN_BOXES and threshold > 0.0:
+        # a positive IoU needs a positive intersection, so only overlapping boxes are candidates
+        iu, ju = _candidate_pairs(arr)
+    else:
+        # only the upper triangle i < j is needed, compute IoU for those pairs alone
+        iu, ju = np.triu_indices(N, k=1)
+    vals = pair_iou(arr, iu, ju)
+    keep = np.flatnonzero(vals >= threshold)
+    return iu[keep], ju[keep], vals[keep]
+
+
+def _candidate_pairs(boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sweep line pre filter returning the pairs i < j whose boxes overlap with
+    positive area, ordered by i then j.
+
+    Boxes are sorted by xmin. For each box the boxes starting before its xmax
+    form a contiguous run in sorted order, found with searchsorted, so the
+    x overlapping pairs are enumerated without a Python loop. The y intervals
+    are then checked on those pairs only.
+    """
+    order = np.argsort(boxes[:, 0], kind="stable")
+    s = boxes[order]
+    N = s.shape[0]
+    ends = np.searchsorted(s[:, 0], s[:, 2], side="left")
+    counts = np.maximum(ends - np.arange(N) - 1, 0)
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+    p = np.repeat(np.arange(N), counts)
+    starts = np.cumsum(counts) - counts
+    q = p + 1 + (np.arange(total) - np.repeat(starts, counts))
+    overlap = (np.minimum(s[p, 2], s[q, 2]) > np.maximum(s[p, 0], s[q, 0])) & (np.minimum(s[p, 3], s[q, 3]) > np.maximum(s[p, 1], s[q, 1]))
+    a = order[p[overlap]]
+    b = order[q[overlap]]
+    ii = np.minimum(a, b)
+    jj = np.maximum(a, b)
+    ordering = np.lexsort((jj, ii))
+    return ii[ordering], jj[ordering]
+
+
+def _pairs_to_dicts(iu: np.ndarray, ju: np.ndarray, vals: np.ndarray, labels: Sequence[Any], max_pairs: int) -> List[Dict[str, Any]]:
+    """
+    Build report dicts for the thresholded pairs. When there are more than
+    max_pairs the strongest overlaps are kept, ties going to the earlier
+    pair, still listed by i then j.
+    """
+    if max_pairs <= 0:
+        return []
+    if vals.shape[0] > max_pairs:
+        # stable so ties keep the earlier pair
+        top = np.sort(np.argsort(-vals, kind="stable")[:max_pairs])
+        iu, ju, vals = iu[top], ju[top], vals[top]
+    n_labels = len(labels)
     pairs = []
-    for i in range(N):
-        for j in range(i + 1, N):
-            val = float(iou_mat[i, j])
-            if val >= threshold:
-                pairs.append({"i": int(i), "j": int(j), "iou": val, "class_i": labels[i] if i < len(labels) else None, "class_j": labels[j] if j < len(labels) else None})
-                if len(pairs) >= max_pairs:
-                    return pairs
+    for i, j, val in zip(iu.tolist(), ju.tolist(), vals.tolist()):
+        pairs.append({"i": i, "j": j, "iou": val, "class_i": labels[i] if i < n_labels else None, "class_j": labels[j] if j < n_labels else None})
     return pairs
 
 
+def _overlap_for_image(arr: np.ndarray, labels: Sequence[Any], same_thr: float, cross_thr: float, max_pairs: int, label_ids: Optional[np.ndarray] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Same class and cross class pair reports for one image's boxes.
+
+    label_ids optional integer class ids parallel to labels, compared instead
+    of the label objects when given.
+    """
+    iu, ju, vals = _iou_pairs_above(arr, min(same_thr, cross_thr))
+    if iu.shape[0] == 0:
+        return [], []
+    if label_ids is not None:
+        same_cls = label_ids[iu] == label_ids[ju]
+    else:
+        lab = np.empty(len(labels), dtype=object)
+        lab[:] = labels
+        same_cls = lab[iu] == lab[ju]
+    same_mask = same_cls & (vals >= same_thr)
+    cross_mask = ~same_cls & (vals >= cross_thr)
+    same = _pairs_to_dicts(iu[same_mask], ju[same_mask], vals[same_mask], labels, max_pairs)
+    cross = _pairs_to_dicts(iu[cross_mask], ju[cross_mask], vals[cross_mask], labels, max_pairs)
+    return same, cross
+
+
 def run_overlap_checks(index: Dict[str, Any], cfg: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Run overlap checks across the dataset index.
 
+    IoU is computed once per image at the lower of the two thresholds, the
+    pairs are then split into same class and cross class results.
+
     cfg optional keys:
     - same_class_threshold default 0.9
     - cross_class_threshold default 0.8
     - max_pairs_to_report default 200
+    - max_workers threads used when there are more than 16 images, default cpu count
     """
     cfg = cfg or {}
     same_thr = cfg.get("same_class_threshold", 0.9)
     cross_thr = cfg.get("cross_class_threshold", 0.8)
     max_pairs = cfg.get("max_pairs_to_report", 200)
 
+    items = list(index.items())
+    work = partial(_process_one_image, same_thr=same_thr, cross_thr=cross_thr, max_pairs=max_pairs)
+    if len(items) > _THREAD_MIN_IMAGES:
+        # numpy releases the GIL inside its kernels so images overlap across threads
+        with ThreadPoolExecutor(max_workers=cfg.get("max_workers") or os.cpu_count()) as ex:
+            per_image = list(ex.map(work, items))
+    else:
+        per_image = [work(item) for item in items]
+
     results = {"same_class_pairs": [], "cross_class_pairs": []}
-    for fname, rec in index.items():
-        anns = rec.get("annotations", [])
-        boxes = [a["bbox"] for a in anns]
-        labels = [a.get("class") for a in anns]
-        same = find_high_iou_pairs_for_image(boxes, labels, threshold=same_thr, max_pairs=max_pairs)
-        cross = find_high_iou_pairs_for_image(boxes, labels, threshold=cross_thr, max_pairs=max_pairs)
-        # filter cross to only pairs where classes differ
-        cross = [p for p in cross if p["class_i"] != p["class_j"]]
+    for fname, same, cross in per_image:
         if same:
             results["same_class_pairs"].append({"file_name": fname, "pairs": same})
         if cross:
             results["cross_class_pairs"].append({"file_name": fname, "pairs": cross})
     return results
+
+
+def _process_one_image(item: Tuple[str, Dict[str, Any]], same_thr: float, cross_thr: float, max_pairs: int) -> Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    fname, rec = item
+    anns = rec.get("annotations", [])
+    if not anns:
+        return fname, [], []
+    boxes = rec.get("_boxes")
+    label_ids = rec.get("_labels")
+    if boxes is not None and label_ids is not None and boxes.shape[0] == len(anns):
+        # preparsed by the loader
+        same, cross = _overlap_for_image(boxes.astype(np.float32), _AnnotationClasses(anns), same_thr, cross_thr, max_pairs, label_ids)
+        return fname, same, cross
+    arr = np.array([a["bbox"] for a in anns], dtype=np.float32)
+    labels = [a.get("class") for a in anns]
+    same, cross = _overlap_for_image(arr, labels, same_thr, cross_thr, max_pairs)
+    return fname, same, cross
+
+
+class _AnnotationClasses:
+    """
+    Read only sequence of annotation classes, read on demand for reported pairs.
+    """
+
+    __slots__ = ("_anns",)
+
+    def __init__(self, anns: List[Dict[str, Any]]):
+        self._anns = anns
+
+    def __len__(self) -> int:
+        return len(self._anns)
+
+    def __getitem__(self, i: int) -> Any:
+        return self._anns[i].get("class")
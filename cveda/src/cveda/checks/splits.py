@@ -7,12 +7,14 @@ This module focuses on:
 - class distribution pairwise comparison
 """
 
-from typing import Dict, Any, List
-from collections import Counter
-from ..utils.hashing import phash_image
+from typing import Dict, Any, List, Optional, Tuple
+from ..utils.hashing import phash_images
+from ..utils.mih import hamming_pairs
 import os
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,73 +25,92 @@ def check_filename_leakage(indices_by_split: Dict[str, Dict[str, Any]]) -> Dict[
     Returns dict with overlaps list and per_pair counts.
     """
     splits = list(indices_by_split.keys())
+    # each split's key set is built once, not once per pair
+    sets = {s: set(idx.keys()) for s, idx in indices_by_split.items()}
     overlaps = []
     per_pair_counts = {}
     for i in range(len(splits)):
         for j in range(i + 1, len(splits)):
             a = splits[i]
             b = splits[j]
-            set_a = set(indices_by_split[a].keys())
-            set_b = set(indices_by_split[b].keys())
-            common = sorted(list(set_a.intersection(set_b)))
+            set_a, set_b = sets[a], sets[b]
+            # intersection iterates the smaller set and probes the larger
+            common = set_a & set_b if len(set_a) <= len(set_b) else set_b & set_a
             per_pair_counts[f"{a}|{b}"] = len(common)
             if common:
-                overlaps.append({"a": a, "b": b, "common_files": common[:50], "n_common": len(common)})
+                overlaps.append({"a": a, "b": b, "common_files": sorted(common)[:50], "n_common": len(common)})
     return {"overlaps": overlaps, "per_pair_counts": per_pair_counts}
 
 
-def check_phash_leakage(indices_by_split: Dict[str, Dict[str, Any]], threshold: int = 10, max_compare_pairs: int = 200000) -> Dict[str, Any]:
+def check_phash_leakage(indices_by_split: Dict[str, Dict[str, Any]], threshold: int = 10, max_compare_pairs: int = 200000, max_workers: Optional[int] = None, parallel_min_n: int = 64, use_cache: Optional[bool] = None, cache_path: Optional[str] = None) -> Dict[str, Any]:
     """
     Compute pHash for each image in each split and detect near duplicates across splits.
 
     threshold Hamming distance threshold for a match
-    max_compare_pairs to limit O n squared explosion
+    max_compare_pairs block size for dense comparisons, used only when the
+    threshold is too large for the multi index search
+    max_workers processes used to hash images
+    parallel_min_n below this many images hashing runs serially
+    use_cache reuse hashes from the on disk cache for unchanged files, None
+    follows the CVEDA_PHASH_CACHE environment variable
+    cache_path cache file, default from utils.hashing.default_cache_path
+
+    Every pair within threshold is found, comparisons in stats counts the
+    candidate pairs verified on the full hash.
     """
-    # compute hashes
+    # gather every existing image first so hashing can run in one parallel batch
     hash_map = {}
-    total_files = 0
+    jobs = []
     for s, idx in indices_by_split.items():
         hash_map[s] = {}
         for fname, rec in idx.items():
             p = rec.get("abs_path")
             if not p or not os.path.exists(p):
                 continue
-            h = phash_image(p)
-            if h:
-                hash_map[s][fname] = h
-            total_files += 1
+            jobs.append((s, fname, p))
+    total_files = len(jobs)
+    hashes = phash_images([p for _, _, p in jobs], max_workers=max_workers, min_n=parallel_min_n, use_cache=use_cache, cache_path=cache_path)
+    for (s, fname, _), h in zip(jobs, hashes):
+        if h:
+            hash_map[s][fname] = h
 
-    # create comparisons across split pairs with cap
+    # parse hashes once per split, then search each split pair with multi index hashing
+    parsed = {s: _hashes_to_uint64(list(items.items())) for s, items in hash_map.items()}
     matches = []
     splits = list(hash_map.keys())
     comparisons = 0
     for i in range(len(splits)):
         for j in range(i + 1, len(splits)):
             a, b = splits[i], splits[j]
-            items_a = list(hash_map[a].items())
-            items_b = list(hash_map[b].items())
-            # cap approximate
-            if len(items_a) * len(items_b) > max_compare_pairs:
-                # sample
-                import random
-                k = int(max_compare_pairs ** 0.5)
-                if k < 1:
-                    continue
-                items_a = random.sample(items_a, min(len(items_a), k))
-                items_b = random.sample(items_b, min(len(items_b), k))
-            for fa, ha in items_a:
-                for fb, hb in items_b:
-                    comparisons += 1
-                    try:
-                        d = hamming_distance_hex(ha, hb)
-                    except Exception:
-                        continue
-                    if d <= threshold:
-                        matches.append({"split_a": a, "split_b": b, "file_a": fa, "file_b": fb, "hamming": d})
+            names_a, arr_a = parsed[a]
+            names_b, arr_b = parsed[b]
+            ia, ib, dist, n_verified = hamming_pairs(arr_a, arr_b, threshold, block_pairs=max_compare_pairs)
+            comparisons += n_verified
+            for x, y, d in zip(ia.tolist(), ib.tolist(), dist.tolist()):
+                matches.append({"split_a": a, "split_b": b, "file_a": names_a[x], "file_b": names_b[y], "hamming": d})
     stats = {"comparisons": comparisons, "matches": len(matches), "total_files": total_files}
     return {"matches": matches, "stats": stats}
 
 
+def _hashes_to_uint64(items: List[Tuple[str, str]]) -> Tuple[List[str], np.ndarray]:
+    """
+    Parse hex hashes once into a uint64 array. Hashes that do not parse or do
+    not fit in 64 bits are dropped together with their file name.
+    """
+    names = []
+    values = []
+    for fname, h in items:
+        try:
+            v = int(h, 16)
+        except (TypeError, ValueError):
+            continue
+        if v >> 64:
+            continue
+        names.append(fname)
+        values.append(v)
+    return names, np.fromiter(values, dtype=np.uint64, count=len(values))
+
+
 def hamming_distance_hex(h1: str, h2: str) -> int:
     """
     Hamming distance between two hex string hashes.
@@ -102,31 +123,60 @@ def hamming_distance_hex(h1: str, h2: str) -> int:
     return x.bit_count()
 
 
+def _top_k_desc(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest values in descending order, ties keep index order.
+
+    argpartition finds the k-th largest value in linear time, only the values
+    at or above it are sorted.
+    """
+    n = values.shape[0]
+    if n <= k:
+        return np.argsort(-values, kind="stable")
+    kth = values[np.argpartition(-values, k - 1)[k - 1]]
+    cand = np.flatnonzero(values >= kth)
+    return cand[np.argsort(-values[cand], kind="stable")[:k]]
+
+
 def compare_class_distributions(indices_by_split: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
     """
     Compute simple class counts per split and return pairwise relative differences.
+
+    Classes are mapped to integer ids once so each split is counted with
+    np.bincount and the pairwise differences are computed on count vectors.
     """
-    counts = {}
+    class_to_id: Dict[str, int] = {}
+    ids_by_split = {}
     for s, idx in indices_by_split.items():
-        c = Counter()
-        for fname, rec in idx.items():
+        ids = []
+        ids_append = ids.append
+        for rec in idx.values():
             for ann in rec.get("annotations", []):
                 cls = str(ann.get("class"))
-                c[cls] += 1
-        counts[s] = dict(c)
+                cid = class_to_id.get(cls)
+                if cid is None:
+                    cid = class_to_id[cls] = len(class_to_id)
+                ids_append(cid)
+        ids_by_split[s] = np.asarray(ids, dtype=np.int64)
+    names = list(class_to_id)
+    K = len(names)
+    vectors = {s: np.bincount(ids, minlength=K) for s, ids in ids_by_split.items()}
+    counts = {}
+    for s, vec in vectors.items():
+        counts[s] = {names[k]: v for k, v in zip(np.flatnonzero(vec).tolist(), vec[vec > 0].tolist())}
     # pairwise differences
     splits = list(counts.keys())
     pairwise = {}
     for i in range(len(splits)):
         for j in range(i + 1, len(splits)):
             a, b = splits[i], splits[j]
-            classes = set(counts[a].keys()).union(set(counts[b].keys()))
-            diffs = []
-            for cls in classes:
-                va = counts[a].get(cls, 0)
-                vb = counts[b].get(cls, 0)
-                mean = (va + vb) / 2 if (va + vb) > 0 else 1
-                rel = abs(va - vb) / mean if mean > 0 else 0.0
-                diffs.append((cls, rel, va, vb))
-            pairwise[f"{a}|{b}"] = {"top_diffs": sorted(diffs, key=lambda x: x[1], reverse=True)[:20], "n_classes": len(diffs)}
+            va = vectors[a]
+            vb = vectors[b]
+            present = np.flatnonzero((va + vb) > 0)
+            pa = va[present]
+            pb = vb[present]
+            rel = np.abs(pa - pb) / ((pa + pb) / 2)
+            order = _top_k_desc(rel, 20)
+            top = [(names[k], r, x, y) for k, r, x, y in zip(present[order].tolist(), rel[order].tolist(), pa[order].tolist(), pb[order].tolist())]
+            pairwise[f"{a}|{b}"] = {"top_diffs": top, "n_classes": int(present.shape[0])}
     return {"counts": counts, "pairwise": pairwise}
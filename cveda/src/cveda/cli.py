@@ -7,6 +7,8 @@ This version includes a robust serializer to make the audit result JSON safe.
 
 import argparse
 import json
+import math
+import os
 from pathlib import Path
 import sys
 from typing import Any
@@ -19,6 +21,12 @@ try:
 except Exception:
     _np = None
 
+# optional fast JSON encoder, handles numpy arrays and scalars natively
+try:
+    import orjson as _orjson
+except Exception:
+    _orjson = None
+
 
 def parse_args():
     parser = argparse.ArgumentParser(prog="cveda_cli", description="Run CV dataset audit")
@@ -26,77 +34,187 @@ def parse_args():
     parser.add_argument("--pdf", help="Write a PDF report to this path", default=None)
     parser.add_argument("--recursive", action="store_true", help="Search recursively")
     parser.add_argument("--max-sample", type=int, default=None, help="Limit number of images scanned")
+    parser.add_argument("--keep-raw", action="store_true", help="Keep original COCO annotation dicts, needed by features that read annotation raw fields")
+    parser.add_argument("--no-phash-cache", action="store_true", help="Do not read or write the on disk pHash cache, same as CVEDA_PHASH_CACHE=0")
     return parser.parse_args()
 
 
+_JSON_PRIMS = frozenset((str, bool, int, float, type(None)))
+
+
+def _safe_dict(obj, parent, slot, stack):
+    new = {}
+    parent[slot] = new
+    for k, v in obj.items():
+        # ensure keys are strings
+        key = k if isinstance(k, str) else str(k)
+        new[key] = None
+        stack.append((new, key, v))
+
+
+def _safe_list(obj, parent, slot, stack):
+    new = [None] * len(obj)
+    parent[slot] = new
+    stack.extend((new, i, x) for i, x in enumerate(obj))
+
+
+def _safe_ndarray(obj, parent, slot, stack):
+    # convert to nested lists, cast to Python scalar types
+    try:
+        lst = obj.tolist()
+    except Exception:
+        # fallback to flattened list
+        try:
+            lst = obj.reshape(-1).tolist()
+        except Exception:
+            parent[slot] = str(obj)
+            return
+    stack.append((parent, slot, lst))
+
+
+def _safe_np_scalar(obj, parent, slot, stack):
+    # pushed back so a non finite float goes through the same check as Python floats
+    stack.append((parent, slot, obj.item()))
+
+
+def _safe_path(obj, parent, slot, stack):
+    parent[slot] = str(obj)
+
+
+def _safe_bytes(obj, parent, slot, stack):
+    try:
+        parent[slot] = obj.decode("utf-8")
+    except Exception:
+        parent[slot] = str(obj)
+
+
+def _safe_leaf(obj, parent, slot, stack):
+    # float subclasses land here, they get the same non finite check as floats
+    if isinstance(obj, float) and not math.isfinite(obj):
+        obj = None
+    parent[slot] = obj
+
+
+def _safe_other(obj, parent, slot, stack):
+    # fallback for other iterables
+    try:
+        items = list(obj)
+    except Exception:
+        parent[slot] = str(obj)
+        return
+    _safe_list(items, parent, slot, stack)
+
+
+_SAFE_DISPATCH = {dict: _safe_dict, list: _safe_list, tuple: _safe_list, bytes: _safe_bytes, bytearray: _safe_bytes}
+if _np is not None:
+    _SAFE_DISPATCH[_np.ndarray] = _safe_ndarray
+
+
+def _resolve_safe_handler(obj):
+    """
+    isinstance based handler lookup for types missing from the dispatch table,
+    cached per exact type.
+    """
+    if isinstance(obj, (str, bool, int, float)):
+        handler = _safe_leaf
+    elif _np is not None and isinstance(obj, _np.ndarray):
+        handler = _safe_ndarray
+    elif _np is not None and isinstance(obj, (_np.integer, _np.floating, _np.bool_)):
+        handler = _safe_np_scalar
+    elif isinstance(obj, Path):
+        handler = _safe_path
+    elif isinstance(obj, (bytes, bytearray)):
+        handler = _safe_bytes
+    elif isinstance(obj, dict):
+        handler = _safe_dict
+    elif isinstance(obj, (list, tuple)):
+        handler = _safe_list
+    else:
+        handler = _safe_other
+    _SAFE_DISPATCH[type(obj)] = handler
+    return handler
+
+
 def _make_json_safe(obj: Any) -> Any:
     """
-    Recursively convert objects into JSON serializable types.
+    Convert objects into JSON serializable types.
 
     Handles:
     - numpy arrays and scalars converted to lists and Python numbers
     - pathlib.Path converted to string
     - bytes decoded to utf-8 string when possible
-    - nested dicts and lists processed recursively
+    - nested dicts and lists
 
-    For unknown objects we fall back to str(obj)
+    For unknown objects we fall back to str(obj). NaN and infinities become
+    None, they have no JSON literal. The walk uses an explicit stack and exact
+    type dispatch so deep results do not hit the recursion limit.
     """
-    # primitives that json already supports
-    if obj is None or isinstance(obj, (str, bool, int, float)):
-        return obj
-
-    # numpy arrays and scalars
-    if _np is not None:
-        if isinstance(obj, _np.ndarray):
-            # convert to nested lists, cast to Python scalar types
-            try:
-                lst = obj.tolist()
-                return _make_json_safe(lst)
-            except Exception:
-                # fallback to flattened list
-                try:
-                    return _make_json_safe(obj.reshape(-1).tolist())
-                except Exception:
-                    return str(obj)
-        if isinstance(obj, (_np.integer, _np.floating, _np.bool_)):
-            return obj.item()
-
-    # pathlib Path
-    if isinstance(obj, Path):
-        return str(obj)
-
-    # bytes
-    if isinstance(obj, (bytes, bytearray)):
-        try:
-            return obj.decode("utf-8")
-        except Exception:
-            return str(obj)
-
-    # dict
-    if isinstance(obj, dict):
-        new = {}
-        for k, v in obj.items():
-            # ensure keys are strings
-            key = k if isinstance(k, str) else str(k)
-            new[key] = _make_json_safe(v)
-        return new
-
-    # list or tuple
-    if isinstance(obj, (list, tuple)):
-        return [_make_json_safe(x) for x in obj]
+    root = [None]
+    stack = [(root, 0, obj)]
+    pop = stack.pop
+    while stack:
+        parent, slot, o = pop()
+        t = type(o)
+        if t is float:
+            parent[slot] = o if math.isfinite(o) else None
+            continue
+        if t in _JSON_PRIMS:
+            parent[slot] = o
+            continue
+        handler = _SAFE_DISPATCH.get(t)
+        if handler is None:
+            handler = _resolve_safe_handler(o)
+        handler(o, parent, slot, stack)
+    return root[0]
+
+
+def _json_default(obj: Any) -> Any:
+    # called per object the encoder cannot handle, so only that subtree is converted
+    return _make_json_safe(obj)
+
+
+def _dump_json(result: Any) -> None:
+    """
+    Write the result as indented JSON to stdout without first building a JSON
+    safe copy of the whole tree. orjson serializes numpy data natively, the
+    stdlib encoder converts unsupported objects one at a time through default.
 
-    # fallback for other iterables
+    Both paths write NaN and infinities as null: orjson does so itself, the
+    stdlib encoder rejects them and the result then goes through
+    _make_json_safe.
+    """
+    if _orjson is not None:
+        try:
+            data = _orjson.dumps(result, default=_json_default, option=_orjson.OPT_INDENT_2 | _orjson.OPT_SERIALIZE_NUMPY | _orjson.OPT_NON_STR_KEYS)
+        except (TypeError, _orjson.JSONEncodeError):
+            data = None
+        if data is not None:
+            out = sys.stdout.buffer
+            out.write(data)
+            out.write(b"\n")
+            out.flush()
+            return
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False, allow_nan=False, default=_json_default)
     try:
-        iter(obj)
-        return [_make_json_safe(x) for x in obj]
-    except Exception:
-        return str(obj)
+        # chunks are collected before writing, a dict key or non finite float
+        # the encoder rejects raises mid stream and the fallback must start from clean output
+        chunks = list(encoder.iterencode(result))
+    except (TypeError, ValueError, RecursionError):
+        chunks = list(encoder.iterencode(_make_json_safe(result)))
+    write = sys.stdout.write
+    for chunk in chunks:
+        write(chunk)
+    write("\n")
+    sys.stdout.flush()
 
 
 def main():
     args = parse_args()
     root = args.root
-    loader = ImageCollectionLoader(root, recursive=args.recursive)
+    if args.no_phash_cache:
+        # through the environment so worker processes started later see it too
+        os.environ["CVEDA_PHASH_CACHE"] = "0"
+    loader = ImageCollectionLoader(root, recursive=args.recursive, keep_raw=args.keep_raw)
     cveda = CVEDA(loader)
     result = cveda.run_audit(out_pdf=args.pdf)
 
@@ -105,8 +223,7 @@ def main():
         idx_keys = list(result["index"].keys())[: args.max_sample]
         result["index"] = {k: result["index"][k] for k in idx_keys}
 
-    safe = _make_json_safe(result)
-    print(json.dumps(safe, indent=2, ensure_ascii=False))
+    _dump_json(result)
 
 
 if __name__ == "__main__":
@@ -17,6 +17,9 @@ Key classes and functions
 - build_index_for_split
     Convenience wrapper to build an index for a specific split path.
 
+- public_index
+    Copy of an index without the underscore keys below, used for output.
+
 Canonical per image record format returned by ImageCollectionLoader.build_index:
 
 {
@@ -25,10 +28,13 @@ Canonical per image record format returned by ImageCollectionLoader.build_index:
     "width": 1024,                             # or None when unavailable
     "height": 768,                             # or None when unavailable
     "annotations": [
-        {"class": "person", "bbox": [xmin, ymin, xmax, ymax], "raw": {...}},
+        {"class": "person", "bbox": [xmin, ymin, xmax, ymax], "raw": {...},
+         "_class_str": "person"},                # raw is None unless keep_raw, _class_str is str(class)
         ...
     ],
-    "meta": {...}                              # optional metadata such as parse errors
+    "meta": {...},                             # optional metadata such as parse errors
+    "_boxes": ndarray (M, 4) float64,          # bboxes of "annotations" preparsed for checks
+    "_labels": ndarray (M,) int32              # class ids, see ImageCollectionLoader.class_ids
 }
 
 Design goals and behaviors
@@ -41,19 +47,181 @@ Design goals and behaviors
   xmin ymin xmax ymax represented as floats.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 import json
 import xml.etree.ElementTree as ET
 import os
 import logging
 
+import numpy as np
 from PIL import Image, UnidentifiedImageError
 
 from .utils.io_helpers import get_image_size_safe
 
+try:
+    from lxml import etree as _XML
+    _XML_PARSE_ERRORS: Tuple[type, ...] = (_XML.XMLSyntaxError, ET.ParseError)
+except Exception:
+    _XML = ET
+    _XML_PARSE_ERRORS = (ET.ParseError,)
+
+try:
+    import orjson as _orjson
+except Exception:
+    _orjson = None
+
+try:
+    import ijson as _ijson
+except Exception:
+    _ijson = None
+
 logger = logging.getLogger(__name__)
 
+# COCO files at least this large are streamed with ijson when it is installed
+_COCO_STREAM_MIN_BYTES = 64 * 1024 * 1024
+
+# YOLO label files with at least this many rows use the numba kernel
+_YOLO_NUMBA_MIN_ROWS = 1024
+
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except Exception:
+    _NUMBA_AVAILABLE = False
+
+# below this many images the thread pool start up costs more than the overlapped reads save
+_SIZE_THREAD_MIN_FILES = 16
+
+
+def _load_json_file(path: Path) -> Any:
+    """
+    Load a JSON file, with orjson when installed. Files orjson rejects, for
+    example ones using NaN literals, are retried with the standard parser.
+    """
+    if _orjson is not None:
+        data = path.read_bytes()
+        try:
+            return _orjson.loads(data)
+        except _orjson.JSONDecodeError:
+            return json.loads(data.decode("utf8"))
+    with path.open("r", encoding="utf8") as f:
+        return json.load(f)
+
+
+if _NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _yolo_to_xyxy_nb(data, w, h):  # pragma: no cover - requires numba
+        n = data.shape[0]
+        out = np.empty((n, 4), dtype=np.float64)
+        for k in range(n):
+            cx = data[k, 0]
+            cy = data[k, 1]
+            hw = data[k, 2] * 0.5
+            hh = data[k, 3] * 0.5
+            out[k, 0] = (cx - hw) * w
+            out[k, 1] = (cy - hh) * h
+            out[k, 2] = (cx + hw) * w
+            out[k, 3] = (cy + hh) * h
+        return out
+
+
+def _yolo_to_xyxy(data: np.ndarray, w: float, h: float) -> np.ndarray:
+    """
+    Convert normalized (cx cy bw bh) rows to absolute (xmin ymin xmax ymax).
+    """
+    if _NUMBA_AVAILABLE and data.shape[0] >= _YOLO_NUMBA_MIN_ROWS:
+        return _yolo_to_xyxy_nb(data, w, h)
+    cx, cy = data[:, 0], data[:, 1]
+    hw = data[:, 2] * 0.5
+    hh = data[:, 3] * 0.5
+    return np.stack(((cx - hw) * w, (cy - hh) * h, (cx + hw) * w, (cy + hh) * h), axis=1)
+
+
+def _parse_yolo_lines(lines: List[str]) -> Tuple[List[str], np.ndarray]:
+    """
+    Class tokens and (N, 4) normalized (cx cy bw bh) values of the YOLO rows in
+    lines. Lines with fewer than five tokens or a non numeric value are dropped.
+    """
+    classes = [line.split(None, 1)[0] for line in lines if line.strip()]
+    if classes:
+        try:
+            # bulk C parser for the common file where every line is a full numeric row
+            data = np.loadtxt(lines, dtype=np.float64, ndmin=2, usecols=(1, 2, 3, 4), comments=None)
+            if data.shape[0] == len(classes):
+                return classes, data
+        except ValueError:
+            pass
+    # some line is short or malformed, drop those lines only
+    rows = [parts for parts in (line.split() for line in lines) if len(parts) >= 5]
+    try:
+        data = np.array([parts[1:5] for parts in rows], dtype=np.float64).reshape(-1, 4)
+        return [parts[0] for parts in rows], data
+    except ValueError:
+        classes, values = [], []
+        for parts in rows:
+            try:
+                values.append([float(v) for v in parts[1:5]])
+            except Exception:
+                continue
+            classes.append(parts[0])
+        return classes, np.array(values, dtype=np.float64).reshape(-1, 4)
+
+
+def _read_image_sizes(paths: List[str], max_workers: Optional[int] = None) -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+    """
+    Read (width height) for every path. Header reads are IO bound so they are
+    overlapped with a thread pool, PIL releases the GIL while reading files.
+    """
+    if len(paths) < _SIZE_THREAD_MIN_FILES:
+        return {p: get_image_size_safe(p) for p in paths}
+    workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        sizes = list(ex.map(get_image_size_safe, paths, chunksize=64))
+    return dict(zip(paths, sizes))
+
+
+def _iterparse_xml(path: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Start and end events of the XML file at path. lxml resolves entities by
+    default before 5.0, annotation files may be untrusted so entity
+    expansion and network access are turned off there, the stdlib parser
+    never fetches external entities.
+    """
+    if _XML is ET:
+        return ET.iterparse(path, events=("start", "end"))
+    return _XML.iterparse(path, events=("start", "end"), resolve_entities=False, no_network=True)
+
+
+def _ijson_items(path: Path, prefix: str) -> Iterator[Any]:
+    with path.open("rb") as f:
+        yield from _ijson.items(f, prefix, use_float=True)
+
+
+def _scandir_flat(path: str) -> Iterator[os.DirEntry]:
+    try:
+        with os.scandir(path) as it:
+            yield from it
+    except (PermissionError, FileNotFoundError, NotADirectoryError):
+        return
+
+
+def _scandir_recursive(path: str) -> Iterator[os.DirEntry]:
+    """
+    Yield every entry below path. Like Path.rglob symlinked directories are
+    not descended into and unreadable directories are skipped.
+    """
+    stack = [path]
+    while stack:
+        for entry in _scandir_flat(stack.pop()):
+            yield entry
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+            except OSError:
+                continue
+
 
 def discover_splits(root: str, split_names: Optional[List[str]] = None) -> Dict[str, Path]:
     """
@@ -80,7 +248,33 @@ def discover_splits(root: str, split_names: Optional[List[str]] = None) -> Dict[
     return found
 
 
-def build_index_for_split(split_path: str, recursive: bool = True) -> Dict[str, Any]:
+# keys the loader adds for the checks, they are not part of the canonical index
+_PRIVATE_RECORD_KEYS = ("_boxes", "_labels")
+_PRIVATE_ANNOTATION_KEYS = ("_class_str",)
+
+
+def public_index(index: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of index without the loader's private preparsed keys, for output.
+
+    Records and annotations are shallow copies so the index the checks work
+    on is left as is.
+    """
+    out: Dict[str, Any] = {}
+    for fname, rec in index.items():
+        if isinstance(rec, dict):
+            rec = {k: v for k, v in rec.items() if k not in _PRIVATE_RECORD_KEYS}
+            anns = rec.get("annotations")
+            if isinstance(anns, list):
+                rec["annotations"] = [
+                    {k: v for k, v in a.items() if k not in _PRIVATE_ANNOTATION_KEYS} if isinstance(a, dict) else a
+                    for a in anns
+                ]
+        out[fname] = rec
+    return out
+
+
+def build_index_for_split(split_path: str, recursive: bool = True, keep_raw: bool = False) -> Dict[str, Any]:
     """
     Convenience wrapper that builds a canonical index for a single split folder.
 
@@ -89,11 +283,13 @@ def build_index_for_split(split_path: str, recursive: bool = True) -> Dict[str,
         Path to the split folder, for example dataset/train
     recursive bool
         Whether to search recursively for images inside the split folder.
+    keep_raw bool
+        Keep the original COCO annotation dicts under annotation["raw"].
 
     Returns
     Dict[str, Any] canonical index as produced by ImageCollectionLoader.build_index
     """
-    loader = ImageCollectionLoader(str(split_path), recursive=recursive)
+    loader = ImageCollectionLoader(str(split_path), recursive=recursive, keep_raw=keep_raw)
     return loader.build_index()
 
 
@@ -117,17 +313,20 @@ class ImageCollectionLoader:
     - Supports COCO json with images and annotations arrays
     - Supports VOC xml single file per image
     - Supports YOLO txt single file per image or label folder with .txt files
-    - When multiple annotation sources are available they are merged in order
+    - When multiple annotation sources are available the first one in priority
+      order that yields annotations is used and the rest are not parsed,
       COCO global json first VOC xml next YOLO txt last
     - The loader records parsing problems inside record["meta"]["errors"]
       rather than raising, enabling robust batch processing
     """
 
     IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff"}
+    # same suffixes as a tuple so str.endswith can test them all in one call
+    _IMAGE_EXT_TUPLE = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
     COMMON_IMAGE_DIRS = ("images", "image", "imgs", "img", "JPEGImages", "Images")
     COMMON_ANNOT_DIRS = ("labels", "label", "annotations", "annotation", "ann", "xmls", "jsons")
 
-    def __init__(self, root: str, recursive: bool = True):
+    def __init__(self, root: str, recursive: bool = True, keep_raw: bool = False):
         """
         Initialize the loader.
 
@@ -137,9 +336,23 @@ class ImageCollectionLoader:
             subfolders or a single split folder containing images and labels.
         recursive bool
             When true the loader will search recursively in directories where appropriate.
+        keep_raw bool
+            When true COCO annotations keep their original dict under "raw". Off by
+            default since it holds the whole parsed json alive for the index lifetime.
         """
         self.root = Path(root)
         self.recursive = bool(recursive)
+        self.keep_raw = bool(keep_raw)
+        # class value to integer id used for the preparsed _labels arrays
+        self.class_ids: Dict[Any, int] = {}
+        # (type, class value) to str(class value), shared by all annotations
+        self._class_strs: Dict[Tuple[type, Any], str] = {}
+        # parsed COCO files keyed by resolved path, reset for every build_index call
+        self._coco_cache: Dict[str, Tuple[Dict[str, List[Dict[str, Any]]], Dict[int, str]]] = {}
+        # per directory discovery results, images in one folder share them, reset for every build_index call
+        self._dir_candidate_cache: Dict[Path, Tuple[List[Path], Optional[Path]]] = {}
+        self._annot_folder_cache: Dict[Path, Optional[Path]] = {}
+        self._dir_names_cache: Dict[Path, frozenset] = {}
         if not self.root.exists():
             raise FileNotFoundError(f"Root path not found: {root}")
 
@@ -165,29 +378,30 @@ class ImageCollectionLoader:
 
         # also search one level deeper: some datasets use split/<something>/images
         if not candidate_dirs:
-            for child in base.iterdir():
-                if child.is_dir():
+            for entry in _scandir_flat(str(base)):
+                if entry.is_dir():
+                    child = Path(entry.path)
                     for dname in self.COMMON_IMAGE_DIRS:
                         p = child / dname
                         if p.exists() and p.is_dir():
                             candidate_dirs.append(p)
 
-        files: List[Path] = []
+        found: List[str] = []
         if candidate_dirs:
             for d in candidate_dirs:
-                if self.recursive:
-                    files.extend([p for p in d.rglob("*") if p.is_file() and p.suffix.lower() in self.IMAGE_EXTS])
-                else:
-                    files.extend([p for p in d.iterdir() if p.is_file() and p.suffix.lower() in self.IMAGE_EXTS])
-            return sorted(files)
-
-        # fallback: treat base itself as containing images
-        if base.is_dir():
-            if self.recursive:
-                files = [p for p in base.rglob("*") if p.is_file() and p.suffix.lower() in self.IMAGE_EXTS]
-            else:
-                files = [p for p in base.iterdir() if p.is_file() and p.suffix.lower() in self.IMAGE_EXTS]
-        return sorted(files)
+                found.extend(self._scan_images(str(d)))
+        elif base.is_dir():
+            # fallback: treat base itself as containing images
+            found = self._scan_images(str(base))
+        # component wise order, the same order sorted() gives for Path objects
+        found.sort(key=lambda s: s.split(os.sep))
+        return [Path(s) for s in found]
+
+    def _scan_images(self, directory: str) -> List[str]:
+        entries = _scandir_recursive(directory) if self.recursive else _scandir_flat(directory)
+        exts = self._IMAGE_EXT_TUPLE
+        # DirEntry caches the type from the directory listing so no extra stat per file
+        return [e.path for e in entries if e.name.lower().endswith(exts) and e.is_file()]
 
     def _locate_annotation_folder(self, img_path: Path) -> Optional[Path]:
         """
@@ -196,8 +410,15 @@ class ImageCollectionLoader:
         Looks for labels label annotations annotation and similar folders in the
         parent and grandparent directories. Returns the first folder found or None.
         """
+        # the result depends only on the image folder
+        if img_path.parent in self._annot_folder_cache:
+            return self._annot_folder_cache[img_path.parent]
+        found = self._search_annotation_folder(img_path.parent)
+        self._annot_folder_cache[img_path.parent] = found
+        return found
+
+    def _search_annotation_folder(self, p: Path) -> Optional[Path]:
         # candidate search starts at the image's parent then climbs up
-        p = img_path.parent
         checked = set()
         depth = 0
         while p and p not in checked and depth < 5:
@@ -229,56 +450,69 @@ class ImageCollectionLoader:
         - annotation file next to the image with same stem (.txt .xml .json)
         - sibling annotation folder containing a matching stem.txt or many label files
         - returned candidate list is deduplicated and preserves order
+
+        Everything except the same stem files depends only on the image folder,
+        it is computed once per folder and the folder listings are reused for
+        the same stem lookups.
         """
-        candidates: List[Path] = []
+        parent = img_path.parent
+        shared = self._dir_candidate_cache.get(parent)
+        if shared is None:
+            shared = self._dir_candidate_cache[parent] = self._folder_candidates(img_path)
+        global_jsons, annot_folder = shared
+        stem = img_path.stem
+
+        # global json files first, then files next to the image, then the annotation folder
+        ordered: List[Path] = list(global_jsons)
+        names = self._dir_names(parent)
+        for ext in (".txt", ".xml", ".json"):
+            if stem + ext in names:
+                ordered.append(img_path.with_suffix(ext))
+        if annot_folder is not None:
+            ordered.append(annot_folder)
+            folder_names = self._dir_names(annot_folder)
+            for ext in (".txt", ".xml", ".json"):
+                if stem + ext in folder_names:
+                    ordered.append(annot_folder / f"{stem}{ext}")
+
+        # deduplicate preserving order, every candidate is built from the root
+        # or the image path so a normalized string identifies it without a syscall
+        unique: Dict[str, Path] = {}
+        for c in ordered:
+            unique.setdefault(os.path.normpath(os.fspath(c)), c)
+        return list(unique.values())
 
+    def _folder_candidates(self, img_path: Path) -> Tuple[List[Path], Optional[Path]]:
+        """
+        Candidates shared by every image in the folder of img_path: the global
+        json files and the annotation folder if any.
+        """
+        found: List[Path] = []
         # look for common global JSON files at loader.root
         for name in ("annotations.json", "instances.json", "coco.json"):
-            g = self.root / name
-            if g.exists():
-                candidates.append(g)
-
+            if name in self._dir_names(self.root):
+                found.append(self.root / name)
         # look for COCO style files in ancestor folders up to 3 levels
         cur = img_path.parent
         for _ in range(3):
+            names = self._dir_names(cur)
             for name in ("annotations.json", "instances.json", "coco.json"):
-                g = cur / name
-                if g.exists():
-                    candidates.append(g)
+                if name in names:
+                    found.append(cur / name)
             if cur == cur.parent:
                 break
             cur = cur.parent
-
-        # check for annotation file next to image
-        stem = img_path.stem
-        for ext in (".txt", ".xml", ".json"):
-            p = img_path.with_suffix(ext)
-            if p.exists():
-                candidates.append(p)
-
-        # look for sibling annotation folder
         annot_folder = self._locate_annotation_folder(img_path)
-        if annot_folder:
-            # include the whole folder as a candidate
-            candidates.append(annot_folder)
-            # include same stem file inside folder if present
-            for ext in (".txt", ".xml", ".json"):
-                p = annot_folder / f"{stem}{ext}"
-                if p.exists():
-                    candidates.append(p)
-
-        # deduplicate preserving order
-        seen = set()
-        out: List[Path] = []
-        for c in candidates:
-            try:
-                rp = str(c.resolve())
-            except Exception:
-                rp = str(c)
-            if rp not in seen:
-                seen.add(rp)
-                out.append(c)
-        return out
+        return found, annot_folder
+
+    def _dir_names(self, folder: Path) -> frozenset:
+        """
+        Names of the entries of folder, listed once per build_index call.
+        """
+        names = self._dir_names_cache.get(folder)
+        if names is None:
+            names = self._dir_names_cache[folder] = frozenset(e.name for e in _scandir_flat(str(folder)))
+        return names
 
     # ---------- annotation format parsers ----------
 
@@ -291,24 +525,48 @@ class ImageCollectionLoader:
           each annotation contains keys category_id bbox raw where bbox is COCO x y w h
         - category_map: mapping category id to category name when available
         """
-        labels_map: Dict[str, List[Dict[str, Any]]] = {}
-        category_map: Dict[int, str] = {}
         try:
-            with json_path.open("r", encoding="utf8") as f:
-                data = json.load(f)
+            stream = _ijson is not None and json_path.stat().st_size >= _COCO_STREAM_MIN_BYTES
+        except OSError:
+            stream = False
+        if stream:
+            # one streaming pass per section, the whole document is never held in memory
+            try:
+                return self._build_coco_maps(
+                    _ijson_items(json_path, "images.item"),
+                    _ijson_items(json_path, "categories.item"),
+                    _ijson_items(json_path, "annotations.item"),
+                )
+            except Exception as e:
+                logger.debug("Failed to stream COCO json %s error %s", json_path, e)
+                return {}, {}
+        try:
+            data = _load_json_file(json_path)
         except Exception as e:
             logger.debug("Failed to parse COCO json %s error %s", json_path, e)
-            return labels_map, category_map
-
-        images = {img.get("id"): img for img in data.get("images", []) if isinstance(img, dict)}
-        for c in data.get("categories", []) or []:
+            return {}, {}
+        return self._build_coco_maps(
+            data.get("images", []),
+            data.get("categories", []) or [],
+            data.get("annotations", []) or [],
+        )
+
+    def _build_coco_maps(self, images_iter: Any, categories_iter: Any, annotations_iter: Any) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[int, str]]:
+        """
+        Build the _load_coco_json maps from the images categories and annotations
+        sections, each given as an iterable of dicts consumed once.
+        """
+        labels_map: Dict[str, List[Dict[str, Any]]] = {}
+        category_map: Dict[int, str] = {}
+        images = {img.get("id"): img for img in images_iter if isinstance(img, dict)}
+        for c in categories_iter:
             if isinstance(c, dict):
                 cid = c.get("id")
                 name = c.get("name") or str(cid)
                 if cid is not None:
                     category_map[cid] = name
 
-        for ann in data.get("annotations", []) or []:
+        for ann in annotations_iter:
             if not isinstance(ann, dict):
                 continue
             img_id = ann.get("image_id")
@@ -321,10 +579,24 @@ class ImageCollectionLoader:
             labels_map.setdefault(fname, []).append({
                 "category_id": ann.get("category_id"),
                 "bbox": ann.get("bbox"),
-                "raw": ann
+                "raw": ann if self.keep_raw else None
             })
         return labels_map, category_map
 
+    def _load_coco_json_cached(self, json_path: Path) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[int, str]]:
+        """
+        _load_coco_json memoized per resolved path, a global COCO file shared by
+        every image is read and parsed once per build_index call.
+        """
+        try:
+            key = str(json_path.resolve())
+        except Exception:
+            key = str(json_path)
+        hit = self._coco_cache.get(key)
+        if hit is None:
+            hit = self._coco_cache[key] = self._load_coco_json(json_path)
+        return hit
+
     def _load_voc_xml_file(self, xml_path: Path) -> Optional[Dict[str, Any]]:
         """
         Parse a single VOC XML annotation file.
@@ -333,34 +605,54 @@ class ImageCollectionLoader:
         Each annotation is a dict with name bbox raw
         """
         try:
-            tree = ET.parse(str(xml_path))
-            root = tree.getroot()
-            filename = root.findtext("filename") or xml_path.stem
-            size = root.find("size")
-            width = int(size.findtext("width")) if size is not None and size.findtext("width") else None
-            height = int(size.findtext("height")) if size is not None and size.findtext("height") else None
+            filename = None
+            size = None
             objs: List[Dict[str, Any]] = []
-            for obj in root.findall("object"):
-                name = obj.findtext("name")
-                bnd = obj.find("bndbox")
-                if bnd is None:
+            depth = 0
+            # streaming parse, only direct children of the root are read and
+            # object elements are dropped once converted
+            for event, elem in _iterparse_xml(str(xml_path)):
+                if event == "start":
+                    depth += 1
                     continue
-                try:
-                    xmin = float(bnd.findtext("xmin"))
-                    ymin = float(bnd.findtext("ymin"))
-                    xmax = float(bnd.findtext("xmax"))
-                    ymax = float(bnd.findtext("ymax"))
-                except Exception:
+                depth -= 1
+                if depth != 1:
                     continue
-                objs.append({"name": name, "bbox": [xmin, ymin, xmax, ymax], "raw": None})
+                tag = elem.tag
+                if tag == "object":
+                    obj = self._voc_object(elem)
+                    if obj is not None:
+                        objs.append(obj)
+                    elem.clear()
+                elif tag == "filename" and filename is None:
+                    filename = elem.text or ""
+                elif tag == "size" and size is None:
+                    size = elem
+            filename = filename or xml_path.stem
+            width = int(size.findtext("width")) if size is not None and size.findtext("width") else None
+            height = int(size.findtext("height")) if size is not None and size.findtext("height") else None
             return {"file_name": filename, "width": width, "height": height, "annotations": objs}
-        except ET.ParseError:
+        except _XML_PARSE_ERRORS:
             logger.debug("XML parse error for %s", xml_path)
             return None
         except Exception:
             logger.debug("Unexpected error parsing VOC xml %s", xml_path)
             return None
 
+    def _voc_object(self, obj: Any) -> Optional[Dict[str, Any]]:
+        name = obj.findtext("name")
+        bnd = obj.find("bndbox")
+        if bnd is None:
+            return None
+        try:
+            xmin = float(bnd.findtext("xmin"))
+            ymin = float(bnd.findtext("ymin"))
+            xmax = float(bnd.findtext("xmax"))
+            ymax = float(bnd.findtext("ymax"))
+        except Exception:
+            return None
+        return {"name": name, "bbox": [xmin, ymin, xmax, ymax], "raw": None}
+
     def _load_yolo_txt_file(self, txt_path: Path, image_size: Tuple[int, int]) -> Optional[List[Dict[str, Any]]]:
         """
         Parse a YOLO style txt file with normalized center coordinates cx cy w h.
@@ -376,28 +668,15 @@ class ImageCollectionLoader:
         if image_size is None:
             return None
         w, h = image_size
-        anns: List[Dict[str, Any]] = []
         try:
             with txt_path.open("r", encoding="utf8") as f:
-                for line in f:
-                    parts = line.strip().split()
-                    if len(parts) < 5:
-                        continue
-                    cls_token = parts[0]
-                    try:
-                        cx = float(parts[1])
-                        cy = float(parts[2])
-                        bw = float(parts[3])
-                        bh = float(parts[4])
-                    except Exception:
-                        continue
-                    # normalized to absolute
-                    xmin = (cx - bw / 2.0) * w
-                    ymin = (cy - bh / 2.0) * h
-                    xmax = (cx + bw / 2.0) * w
-                    ymax = (cy + bh / 2.0) * h
-                    anns.append({"class": cls_token, "bbox": [xmin, ymin, xmax, ymax], "raw": None})
-            return anns
+                classes, data = _parse_yolo_lines(f.read().split("\n"))
+            if not classes:
+                return []
+            if w is None or h is None:
+                return None
+            boxes = _yolo_to_xyxy(data, float(w), float(h)).tolist()
+            return [{"class": c, "bbox": b, "raw": None} for c, b in zip(classes, boxes)]
         except Exception:
             logger.debug("Failed to parse YOLO txt %s", txt_path)
             return None
@@ -411,18 +690,56 @@ class ImageCollectionLoader:
         x, y, w, h = map(float, cocobox[:4])
         return [x, y, x + w, y + h]
 
+    def _class_str(self, cls: Any) -> str:
+        """
+        str(cls) computed once per distinct class value, the distribution
+        modules read it from annotation["_class_str"].
+        """
+        if type(cls) is str:
+            return cls
+        # keyed with the type because 1 1.0 and True hash alike but print differently
+        key = (type(cls), cls)
+        try:
+            name = self._class_strs.get(key)
+        except TypeError:
+            return str(cls)
+        if name is None:
+            name = self._class_strs[key] = str(cls)
+        return name
+
+    def _class_id(self, cls: Any) -> int:
+        try:
+            key = cls
+            cid = self.class_ids.get(key)
+        except TypeError:
+            # unhashable class values are keyed by their repr
+            key = repr(cls)
+            cid = self.class_ids.get(key)
+        if cid is None:
+            cid = self.class_ids[key] = len(self.class_ids)
+        return cid
+
     # ---------- canonicalization pipeline for a single image ----------
 
-    def _canonicalize_annotations_for_image(self, img_path: Path, candidates: List[Path]) -> Dict[str, Any]:
+    def _canonicalize_annotations_for_image(
+        self,
+        img_path: Path,
+        candidates: List[Path],
+        image_sizes: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None,
+    ) -> Dict[str, Any]:
         """
         Build the canonical per image record by trying annotation candidates in order.
 
+        image_sizes optionally maps str(img_path) to a (width height) pair read
+        beforehand, images missing from it are read here.
+
         The function always returns a record dict. If parsing problems occur details are stored
         in record["meta"]["errors"] so the caller can inspect them.
         """
         rel_path = img_path.relative_to(self.root).as_posix()
         abs_path = str(img_path.resolve())
-        width, height = get_image_size_safe(abs_path)
+        size = image_sizes.get(str(img_path)) if image_sizes else None
+        width, height = size if size is not None else get_image_size_safe(abs_path)
         record: Dict[str, Any] = {
             "file_name": rel_path,
             "abs_path": abs_path,
@@ -433,24 +750,29 @@ class ImageCollectionLoader:
         }
         errors: List[str] = []
 
-        # process candidates in priority order
+        # YOLO coordinates are relative, they cannot be converted without the image size
+        size_known = width is not None and height is not None
+
+        # process candidates in priority order, the first one that yields annotations wins
         for candidate in candidates:
             try:
-                if candidate.is_file() and candidate.suffix.lower() == ".json":
+                # one stat and one suffix per candidate instead of one per branch
+                is_file = candidate.is_file()
+                suffix = candidate.suffix.lower() if is_file else ""
+                if is_file and suffix == ".json":
                     # try COCO style parsing
-                    labels_map, cat_map = self._load_coco_json(candidate)
+                    labels_map, cat_map = self._load_coco_json_cached(candidate)
                     # try matching by basename first then relative path
                     anns_for_file = labels_map.get(img_path.name) or labels_map.get(rel_path) or []
                     for a in anns_for_file:
                         raw_bbox = a.get("bbox")
                         if raw_bbox:
-                            bbox = self._normalize_coco_bbox(raw_bbox)
                             record["annotations"].append({
                                 "class": a.get("category_id"),
-                                "bbox": bbox,
+                                "bbox": self._normalize_coco_bbox(raw_bbox),
                                 "raw": a.get("raw", a)
                             })
-                elif candidate.is_file() and candidate.suffix.lower() == ".xml":
+                elif is_file and suffix == ".xml":
                     parsed = self._load_voc_xml_file(candidate)
                     if parsed and parsed.get("annotations"):
                         for a in parsed.get("annotations", []):
@@ -461,11 +783,12 @@ class ImageCollectionLoader:
                                     "bbox": bbox,
                                     "raw": a.get("raw")
                                 })
-                elif candidate.is_file() and candidate.suffix.lower() == ".txt":
-                    anns = self._load_yolo_txt_file(candidate, (width, height))
-                    if anns:
-                        record["annotations"].extend(anns)
-                elif candidate.is_dir():
+                elif is_file and suffix == ".txt":
+                    if size_known:
+                        anns = self._load_yolo_txt_file(candidate, (width, height))
+                        if anns:
+                            record["annotations"].extend(anns)
+                elif size_known and candidate.is_dir():
                     # treat dir as YOLO style labels folder containing <image_stem>.txt
                     txt = candidate / f"{img_path.stem}.txt"
                     if txt.exists():
@@ -475,19 +798,16 @@ class ImageCollectionLoader:
             except Exception as e:
                 logger.debug("Error processing candidate %s for image %s: %s", candidate, img_path, e)
                 errors.append(f"{candidate}: {e}")
+            if record["annotations"]:
+                break
 
-        # final normalization step: ensure bbox arrays are floats and in xmin ymin xmax ymax order
-        normalized: List[Dict[str, Any]] = []
-        for ann in record.get("annotations", []):
-            bbox = ann.get("bbox")
-            if not bbox or len(bbox) != 4:
-                continue
-            try:
-                x0, y0, x1, y1 = map(float, bbox)
-            except Exception:
-                continue
-            normalized.append({"class": ann.get("class"), "bbox": [x0, y0, x1, y1], "raw": ann.get("raw")})
-        record["annotations"] = normalized
+        # every parser emits [xmin ymin xmax ymax] float lists so no normalization pass is needed,
+        # the arrays are built once here so checks can work on arrays instead of annotation dicts
+        anns = record["annotations"]
+        for a in anns:
+            a["_class_str"] = self._class_str(a["class"])
+        record["_boxes"] = np.array([a["bbox"] for a in anns], dtype=np.float64).reshape(-1, 4)
+        record["_labels"] = np.array([self._class_id(a["class"]) for a in anns], dtype=np.int32)
         if errors:
             record["meta"]["errors"] = errors
         return record
@@ -503,11 +823,17 @@ class ImageCollectionLoader:
         annotations list.
         """
         files = self._list_image_files(base=self.root)
+        self._coco_cache = {}
+        self._dir_candidate_cache = {}
+        self._annot_folder_cache = {}
+        self._dir_names_cache = {}
+        # image headers are read up front in parallel, annotation parsing stays serial
+        sizes = _read_image_sizes([str(p) for p in files])
         index: Dict[str, Any] = {}
         for img in files:
             try:
                 candidates = self._find_annotation_candidates(img)
-                rec = self._canonicalize_annotations_for_image(img, candidates)
+                rec = self._canonicalize_annotations_for_image(img, candidates, sizes)
                 index[rec["file_name"]] = rec
             except Exception as e:
                 try:
@@ -2,10 +2,71 @@
 Bounding box statistics module.
 
 Compute distribution of bbox sizes per class and overall aggregate metrics.
+
+Boxes are gathered into contiguous arrays in one pass, areas and per class
+summaries are then computed with numpy over all classes at once.
 """
 
 from typing import Dict, Any, List
-import math
+
+import numpy as np
+
+
+def _summarize(arr: np.ndarray) -> Dict[str, float]:
+    n = int(arr.shape[0])
+    if n == 0:
+        return {"count": 0, "mean": 0.0, "median": 0.0, "min": 0.0, "max": 0.0, "std": 0.0}
+    # np.median partitions instead of sorting the whole array
+    return {
+        "count": n,
+        "mean": float(arr.mean()),
+        "median": float(np.median(arr)),
+        "min": float(arr.min()),
+        "max": float(arr.max()),
+        "std": float(arr.std()),
+    }
+
+
+def _summarize_groups(values: np.ndarray, codes: np.ndarray, n_groups: int) -> List[Dict[str, float]]:
+    """
+    _summarize for every code 0 to n_groups - 1 at once.
+
+    Counts, means and standard deviations come from bincount over the whole
+    array, min and max from reduceat over the values sorted by code. Only the
+    median is taken per group, with np.median partitioning each slice.
+    """
+    counts = np.bincount(codes, minlength=n_groups)
+    nonempty = counts > 0
+    safe = np.where(nonempty, counts, 1)
+    means = np.bincount(codes, weights=values, minlength=n_groups) / safe
+    # two pass variance, deviations from the group mean avoid cancellation
+    dev = values - means[codes]
+    stds = np.sqrt(np.bincount(codes, weights=dev * dev, minlength=n_groups) / safe)
+
+    order = np.argsort(codes, kind="stable")
+    sorted_vals = values[order]
+    starts = np.cumsum(counts) - counts
+    mins = np.zeros(n_groups, dtype=np.float64)
+    maxs = np.zeros(n_groups, dtype=np.float64)
+    if sorted_vals.shape[0]:
+        mins[nonempty] = np.minimum.reduceat(sorted_vals, starts[nonempty])
+        maxs[nonempty] = np.maximum.reduceat(sorted_vals, starts[nonempty])
+
+    out: List[Dict[str, float]] = []
+    for g in range(n_groups):
+        n = int(counts[g])
+        if n == 0:
+            out.append(_summarize(sorted_vals[:0]))
+            continue
+        out.append({
+            "count": n,
+            "mean": float(means[g]),
+            "median": float(np.median(sorted_vals[starts[g]:starts[g] + n])),
+            "min": float(mins[g]),
+            "max": float(maxs[g]),
+            "std": float(stds[g]),
+        })
+    return out
 
 
 def compute_bbox_statistics(index: Dict[str, Any], cfg: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -21,40 +82,55 @@ def compute_bbox_statistics(index: Dict[str, Any], cfg: Dict[str, Any] = None) -
     Returns a dict with per_class statistics and overall summary.
     """
     cfg = cfg or {}
-    per_class = {}
-    all_areas = []
+    class_codes: Dict[str, int] = {}
+    boxes: List[Any] = []
+    codes: List[int] = []
+    img_areas: List[float] = []
     for fname, rec in index.items():
+        anns = rec.get("annotations", [])
+        if not anns:
+            continue
         w = rec.get("width")
         h = rec.get("height")
-        img_area = (w * h) if w and h else None
-        for ann in rec.get("annotations", []):
-            cls = str(ann.get("class"))
-            xmin, ymin, xmax, ymax = ann["bbox"]
-            area = max(0.0, (xmax - xmin) * (ymax - ymin))
-            rel = (area / img_area) if img_area else None
-            entry = per_class.setdefault(cls, {"areas": [], "relative": []})
-            entry["areas"].append(area)
-            if rel is not None:
-                entry["relative"].append(rel)
-            all_areas.append(area)
-
-    def summarize(lst: List[float]) -> Dict[str, float]:
-        if not lst:
-            return {"count": 0, "mean": 0.0, "median": 0.0, "min": 0.0, "max": 0.0, "std": 0.0}
-        n = len(lst)
-        mean = sum(lst) / n
-        sorted_lst = sorted(lst)
-        median = sorted_lst[n // 2] if n % 2 == 1 else 0.5 * (sorted_lst[n // 2 - 1] + sorted_lst[n // 2])
-        variance = sum((x - mean) ** 2 for x in lst) / n
-        std = math.sqrt(variance)
-        return {"count": n, "mean": mean, "median": median, "min": sorted_lst[0], "max": sorted_lst[-1], "std": std}
+        img_area = (w * h) if w and h else 0.0
+        for ann in anns:
+            # _class_str is precomputed by the loader, other index sources fall back to str()
+            cls = ann.get("_class_str") or str(ann.get("class"))
+            code = class_codes.get(cls)
+            if code is None:
+                code = class_codes[cls] = len(class_codes)
+            codes.append(code)
+        pre = rec.get("_boxes")
+        if pre is not None and pre.shape[0] == len(anns):
+            # preparsed by the loader
+            boxes.append(pre)
+        else:
+            boxes.append(np.asarray([ann["bbox"] for ann in anns], dtype=np.float64).reshape(-1, 4))
+        img_areas.append(np.full(len(anns), img_area, dtype=np.float64))
+
+    if boxes:
+        coords = np.concatenate(boxes).astype(np.float64, copy=False)
+        img_area_arr = np.concatenate(img_areas)
+    else:
+        coords = np.empty((0, 4), dtype=np.float64)
+        img_area_arr = np.empty(0, dtype=np.float64)
+    code_arr = np.asarray(codes, dtype=np.int64)
+
+    # fmax treats a NaN area as zero like max(0.0, area) did
+    areas = np.fmax((coords[:, 2] - coords[:, 0]) * (coords[:, 3] - coords[:, 1]), 0.0)
+    has_img = img_area_arr != 0.0
+    rel = np.divide(areas, img_area_arr, out=np.zeros_like(areas), where=has_img)
+
+    names = list(class_codes)
+    area_stats = _summarize_groups(areas, code_arr, len(names))
+    rel_stats = _summarize_groups(rel[has_img], code_arr[has_img], len(names))
 
     per_class_summary = {}
-    for cls, data in per_class.items():
+    for cls, area_s, rel_s in zip(names, area_stats, rel_stats):
         per_class_summary[cls] = {
-            "area_stats": summarize(data["areas"]),
-            "relative_stats": summarize(data["relative"]) if data["relative"] else {}
+            "area_stats": area_s,
+            "relative_stats": rel_s if rel_s["count"] else {}
         }
 
-    overall = summarize(all_areas)
+    overall = _summarize(areas)
     return {"per_class": per_class_summary, "overall": overall}
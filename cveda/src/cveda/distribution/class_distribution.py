@@ -20,22 +20,39 @@ def compute_class_distribution(index: Dict[str, Any], cfg: Dict[str, Any] = None
     }
     """
     cfg = cfg or {}
-    counter = Counter()
-    imageset = {}
+    counter: Counter = Counter()
+    image_counter: Counter = Counter()
+    # COCO category ids repeat across every annotation, stringify each id once
+    int_names: Dict[int, str] = {}
     for fname, rec in index.items():
-        classes_in_image = set()
-        for ann in rec.get("annotations", []):
-            cls = str(ann.get("class"))
-            counter[cls] += 1
-            classes_in_image.add(cls)
-        for c in classes_in_image:
-            imageset.setdefault(c, 0)
-            imageset[c] += 1
+        anns = rec.get("annotations")
+        if not anns:
+            continue
+        classes = []
+        for ann in anns:
+            # precomputed by the loader
+            name = ann.get("_class_str")
+            if name is not None:
+                classes.append(name)
+                continue
+            raw = ann.get("class")
+            kind = type(raw)
+            if kind is str:
+                classes.append(raw)
+            elif kind is int:
+                name = int_names.get(raw)
+                if name is None:
+                    name = int_names[raw] = str(raw)
+                classes.append(name)
+            else:
+                classes.append(str(raw))
+        counter.update(classes)
+        image_counter.update(set(classes))
 
     top_n = cfg.get("top_n", 30)
     top = counter.most_common(top_n)
     return {
         "annotation_counts": dict(counter),
-        "image_counts": imageset,
+        "image_counts": dict(image_counter),
         "top_classes": top
     }
@@ -5,9 +5,33 @@ Compute per image co occurrence counts and a global co occurrence matrix.
 """
 
 from typing import Dict, Any, Tuple
-from collections import Counter, defaultdict
+from collections import Counter
 import numpy as np
 
+# images per indicator block, bounds the dense block at this many rows by top_n columns
+_BLOCK_IMAGES = 4096
+# number of strongest pairs reported in top_pairs
+_TOP_PAIRS = 50
+
+
+def _top_k_desc(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest positive values, largest first, ties by index.
+
+    Selection is an O(n) partition, only the selected indices are sorted.
+    """
+    pos = np.flatnonzero(values > 0)
+    if k <= 0:
+        return pos[:0]
+    if pos.shape[0] > k:
+        kth = np.partition(values[pos], pos.shape[0] - k)[pos.shape[0] - k]
+        above = pos[values[pos] > kth]
+        # ties at the cut keep the lowest indices, like a stable sort would
+        ties = pos[values[pos] == kth][:k - above.shape[0]]
+        pos = np.concatenate((above, ties))
+        pos.sort()
+    return pos[np.argsort(-values[pos], kind="stable")]
+
 
 def compute_cooccurrence(index: Dict[str, Any], top_n: int = 50) -> Dict[str, Any]:
     """
@@ -20,27 +44,49 @@ def compute_cooccurrence(index: Dict[str, Any], top_n: int = 50) -> Dict[str, An
         "top_pairs": [((c1 c2) count) ...]
     }
     """
-    # count classes
+    # one pass to read each image's class set, reused for the matrix
+    # _class_str is precomputed by the loader, other index sources fall back to str()
+    image_classes = [set(a.get("_class_str") or str(a.get("class")) for a in rec.get("annotations", [])) for rec in index.values()]
     class_counts = Counter()
-    for _, rec in index.items():
-        classes = set(str(a.get("class")) for a in rec.get("annotations", []))
-        for c in classes:
-            class_counts[c] += 1
+    for classes_in_image in image_classes:
+        class_counts.update(classes_in_image)
 
     classes = [c for c, _ in class_counts.most_common(top_n)]
     idx = {c: i for i, c in enumerate(classes)}
-    M = np.zeros((len(classes), len(classes)), dtype=int)
-    pair_counts = Counter()
-    for _, rec in index.items():
-        classes_in_image = sorted(set(str(a.get("class")) for a in rec.get("annotations", [])))
-        # count pairwise
-        for i in range(len(classes_in_image)):
-            for j in range(i + 1, len(classes_in_image)):
-                a = classes_in_image[i]
-                b = classes_in_image[j]
-                if a in idx and b in idx:
-                    M[idx[a], idx[b]] += 1
-                    M[idx[b], idx[a]] += 1
-                    pair_counts[(a, b)] += 1
-    top_pairs = pair_counts.most_common(50)
-    return {"classes": classes, "matrix": M.tolist(), "top_pairs": top_pairs}
+    K = len(classes)
+
+    # flattened (image row, class column) pairs of the binary indicator matrix
+    rows = []
+    cols = []
+    for r, classes_in_image in enumerate(image_classes):
+        for c in classes_in_image:
+            k = idx.get(c)
+            if k is not None:
+                rows.append(r)
+                cols.append(k)
+    rows_arr = np.asarray(rows, dtype=np.int64)
+    cols_arr = np.asarray(cols, dtype=np.int64)
+
+    # M is the sum of outer products v v^T of the per image indicators,
+    # computed as B^T B over blocks of images
+    M = np.zeros((K, K), dtype=np.int64)
+    n_images = len(image_classes)
+    if K and rows:
+        # rows are ascending so each block is a contiguous slice
+        bounds = np.searchsorted(rows_arr, np.arange(0, n_images + _BLOCK_IMAGES, _BLOCK_IMAGES))
+        for b, start in enumerate(range(0, n_images, _BLOCK_IMAGES)):
+            lo, hi = bounds[b], bounds[b + 1]
+            B = np.zeros((min(_BLOCK_IMAGES, n_images - start), K), dtype=np.float64)
+            B[rows_arr[lo:hi] - start, cols_arr[lo:hi]] = 1.0
+            M += np.rint(B.T @ B).astype(np.int64)
+    np.fill_diagonal(M, 0)
+
+    # strongest pairs from the upper triangle, ties keep class rank order
+    iu, ju = np.triu_indices(K, k=1)
+    pair_vals = M[iu, ju]
+    top_pairs = []
+    for t in _top_k_desc(pair_vals, _TOP_PAIRS).tolist():
+        count = int(pair_vals[t])
+        a, b = sorted((classes[iu[t]], classes[ju[t]]))
+        top_pairs.append(((a, b), count))
+    return {"classes": classes, "matrix": M.astype(int).tolist(), "top_pairs": top_pairs}
@@ -3,9 +3,12 @@ Spatial heatmap computation.
 
 Compute normalized center heatmaps for each class and for the whole dataset.
 The output includes numpy arrays suitable for plotting in viz.plot functions.
+
+Centers are computed on arrays and binned with np.bincount on flat cell indices,
+per class maps are slices of one class by cell tensor.
 """
 
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Tuple
 import numpy as np
 
 
@@ -20,44 +23,70 @@ def compute_spatial_heatmaps(index: Dict[str, Any], cfg: Dict[str, Any] = None)
     Returns:
     {
         "overall": heatmap_array,
-        "per_class": {"class_name": heatmap_array, ...}
+        "per_class": {"class_name": heatmap_array, ...},
+        "counts": {"class_name": n_boxes, ...},
+        "dtype": "float32"
     }
+
+    Heatmaps are float32 densities, counts are accumulated as integers.
     """
     cfg = cfg or {}
     bins = cfg.get("bins", (64, 64))
     min_samples = cfg.get("min_samples", 10)
 
-    overall = np.zeros(bins, dtype=float)
-    class_maps = {}
-    counts = {}
-
+    # gather centers as flat arrays in one pass
+    class_codes: Dict[str, int] = {}
+    codes: List[int] = []
+    cx_parts: List[np.ndarray] = []
+    cy_parts: List[np.ndarray] = []
     for fname, rec in index.items():
         w = rec.get("width")
         h = rec.get("height")
         if not w or not h:
             continue
-        for ann in rec.get("annotations", []):
-            cls = str(ann.get("class"))
-            xmin, ymin, xmax, ymax = ann["bbox"]
-            cx = (xmin + xmax) / 2.0 / float(w)
-            cy = (ymin + ymax) / 2.0 / float(h)
-            # clamp normalized coords
-            cx = min(max(0.0, cx), 1.0)
-            cy = min(max(0.0, cy), 1.0)
-            ix = int(cx * (bins[1] - 1))
-            iy = int(cy * (bins[0] - 1))
-            overall[iy, ix] += 1.0
-            cm = class_maps.setdefault(cls, np.zeros(bins, dtype=float))
-            cm[iy, ix] += 1.0
-            counts[cls] = counts.get(cls, 0) + 1
-
-    # normalize heatmaps to density
-    overall_norm = overall / (overall.sum() + 1e-12)
+        anns = rec.get("annotations", [])
+        if not anns:
+            continue
+        for ann in anns:
+            # _class_str is precomputed by the loader, other index sources fall back to str()
+            cls = ann.get("_class_str") or str(ann.get("class"))
+            code = class_codes.get(cls)
+            if code is None:
+                code = class_codes[cls] = len(class_codes)
+            codes.append(code)
+        boxes = rec.get("_boxes")
+        if boxes is None or boxes.shape[0] != len(anns):
+            boxes = np.asarray([ann["bbox"] for ann in anns], dtype=np.float64).reshape(-1, 4)
+        cx_parts.append((boxes[:, 0] + boxes[:, 2]) / 2.0 / float(w))
+        cy_parts.append((boxes[:, 1] + boxes[:, 3]) / 2.0 / float(h))
+
+    cx = np.concatenate(cx_parts) if cx_parts else np.empty(0, dtype=np.float64)
+    cy = np.concatenate(cy_parts) if cy_parts else np.empty(0, dtype=np.float64)
+    # clamp normalized coords, fmax and fmin send NaN to 0 like the scalar max min did
+    cx = np.fmin(np.fmax(cx, 0.0), 1.0)
+    cy = np.fmin(np.fmax(cy, 0.0), 1.0)
+    ix = (cx * (bins[1] - 1)).astype(np.int64)
+    iy = (cy * (bins[0] - 1)).astype(np.int64)
+    flat = iy * bins[1] + ix
+    n_cells = bins[0] * bins[1]
+    code_arr = np.asarray(codes, dtype=np.int64)
+
+    # counts stay integers until normalization, densities are float32
+    overall = np.bincount(flat, minlength=n_cells).reshape(bins)
+    # all class maps live in one (K, bins[0], bins[1]) tensor filled by a single bincount
+    names = list(class_codes)
+    K = len(names)
+    H = np.bincount(code_arr * n_cells + flat, minlength=K * n_cells).reshape((K,) + tuple(bins))
+    class_counts = np.bincount(code_arr, minlength=K).tolist()
+    counts = dict(zip(names, class_counts))
+
+    # normalize heatmaps to density, every class in one division
+    overall_norm = overall.astype(np.float32)
+    overall_norm /= np.float32(overall.sum() + 1e-12)
+    H_norm = H.astype(np.float32)
+    H_norm /= (H.sum(axis=(1, 2), keepdims=True) + 1e-12).astype(np.float32)
     per_class_norm = {}
-    for cls, mat in class_maps.items():
-        if counts.get(cls, 0) >= min_samples:
-            per_class_norm[cls] = mat / (mat.sum() + 1e-12)
-        else:
-            per_class_norm[cls] = None
+    for code, cls in enumerate(names):
+        per_class_norm[cls] = H_norm[code] if class_counts[code] >= min_samples else None
 
-    return {"overall": overall_norm, "per_class": per_class_norm, "counts": counts}
+    return {"overall": overall_norm, "per_class": per_class_norm, "counts": counts, "dtype": "float32"}
@@ -9,10 +9,92 @@ Approach:
 - return top repeated bbox entries and a small list of example filenames for each
 """
 
-from typing import Dict, Any, Tuple, List
-from collections import Counter, defaultdict
+from typing import Dict, Any, Tuple, List, Optional
+from collections import Counter
+from heapq import nlargest
+from operator import itemgetter
 import math
 
+import numpy as np
+
+_NAN4 = (math.nan, math.nan, math.nan, math.nan)
+# below this magnitude float64 holds integers exactly and rint matches round()
+_EXACT_LIMIT = float(2 ** 53)
+# 16 bits per coordinate in packed keys
+_COORD_MASK = 0xFFFF
+
+def _round_tuple(vals: Optional[List[float]]) -> Optional[Tuple[int, ...]]:
+    if vals is None:
+        return None
+    try:
+        return tuple(int(round(v)) for v in vals)
+    except Exception:
+        return None
+
+def _unpack(key: Any) -> Tuple[int, ...]:
+    if isinstance(key, tuple):
+        return key
+    return (key & _COORD_MASK, (key >> 16) & _COORD_MASK, (key >> 32) & _COORD_MASK, key >> 48)
+
+def _rounded_boxes(index: Dict[str, Any]) -> Tuple[List[Any], List[str]]:
+    """
+    Rounded bbox keys of every annotation with the file each came from, keys
+    are packed ints or tuples, see _unpack.
+
+    Four value boxes are rounded in one numpy pass, np.rint rounds half to
+    even like round(). Boxes of another length and values rint cannot
+    represent exactly (NaN, inf, huge) take the per box Python path.
+    """
+    blocks: List[np.ndarray] = []
+    owners: List[str] = []
+    special: Dict[int, Optional[Tuple[int, ...]]] = {}
+    pos = 0
+    for fname, rec in (index or {}).items():
+        anns = rec.get("annotations", []) or []
+        if not anns:
+            continue
+        pre = rec.get("_boxes")
+        if pre is not None and pre.shape[0] == len(anns):
+            # preparsed by the loader
+            blocks.append(pre)
+        else:
+            rows = []
+            for k, ann in enumerate(anns):
+                bbox = ann.get("bbox", [0,0,0,0])
+                try:
+                    vals = [float(x) for x in bbox]
+                except Exception:
+                    vals = None
+                if vals is not None and len(vals) == 4:
+                    rows.append(vals)
+                else:
+                    rows.append(_NAN4)
+                    special[pos + k] = _round_tuple(vals)
+            blocks.append(np.array(rows, dtype=np.float64))
+        owners.extend([fname] * len(anns))
+        pos += len(anns)
+
+    if not blocks:
+        return [], []
+    arr = np.concatenate(blocks)
+    exact = (np.abs(arr) < _EXACT_LIMIT).all(axis=1)
+    out: List[Any] = [None] * arr.shape[0]
+    exact_idx = np.flatnonzero(exact)
+    ints = np.rint(arr[exact_idx]).astype(np.int64)
+    # boxes with every coordinate in 0..65535 are counted as one packed int,
+    # a single hash per box instead of a tuple, the rest keep tuple keys
+    packable = ((ints >= 0) & (ints <= _COORD_MASK)).all(axis=1)
+    packed = ints[packable].astype(np.uint64)
+    keys = packed[:, 0] | (packed[:, 1] << 16) | (packed[:, 2] << 32) | (packed[:, 3] << 48)
+    for i, key in zip(exact_idx[packable].tolist(), keys.tolist()):
+        out[i] = key
+    for i, row in zip(exact_idx[~packable].tolist(), ints[~packable].tolist()):
+        out[i] = tuple(row)
+    for i in np.flatnonzero(~exact).tolist():
+        out[i] = special[i] if i in special else _round_tuple(arr[i].tolist())
+    keep = [i for i, r in enumerate(out) if r is not None]
+    return [out[i] for i in keep], [owners[i] for i in keep]
+
 def run_absolute_coordinate_patterns(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     config:
@@ -30,24 +112,33 @@ def run_absolute_coordinate_patterns(index: Dict[str, Any], config: Dict[str, An
     top_k = int(cfg.get("top_k", 30))
     min_count = int(cfg.get("min_count", 3))
 
-    bbox_counter = Counter()
-    bbox_examples = defaultdict(list)
+    # rounded boxes with the file they came from, counted in one Counter call
+    rounded_boxes, owners = _rounded_boxes(index)
+    bbox_counter = Counter(rounded_boxes)
 
-    for fname, rec in (index or {}).items():
-        for ann in (rec.get("annotations", []) or []):
-            bbox = ann.get("bbox", [0,0,0,0])
-            try:
-                rounded = tuple(int(round(float(x))) for x in bbox)
-            except Exception:
-                continue
-            bbox_counter[rounded] += 1
-            if len(bbox_examples[rounded]) < top_k:
-                bbox_examples[rounded].append(fname)
+    # drop the long tail below min_count before selecting, nlargest keeps first seen order on ties like most_common
+    frequent = [item for item in bbox_counter.items() if item[1] >= min_count]
+    top = nlargest(top_k, frequent, key=itemgetter(1))
+    # examples are only collected for the reported boxes, at most 5 and never more than top_k
+    n_examples = min(5, top_k)
+    bbox_examples: Dict[Any, List[str]] = {bbox: [] for bbox, _ in top}
+    # a box is done once it has all the examples it can get, boxes seen fewer
+    # than n_examples times are done at their last occurrence, so the scan
+    # stops as soon as every reported box is done
+    wanted = {bbox: min(n_examples, count) for bbox, count in top}
+    pending = sum(1 for n in wanted.values() if n > 0)
+    for rounded, fname in zip(rounded_boxes, owners):
+        if not pending:
+            break
+        ex = bbox_examples.get(rounded)
+        if ex is not None and len(ex) < wanted[rounded]:
+            ex.append(fname)
+            if len(ex) == wanted[rounded]:
+                pending -= 1
 
     repeated = []
-    for bbox, count in bbox_counter.most_common(top_k):
-        if count >= min_count:
-            repeated.append({"bbox": bbox, "count": count, "examples": bbox_examples.get(bbox, [])[:5]})
+    for bbox, count in top:
+        repeated.append({"bbox": _unpack(bbox), "count": count, "examples": bbox_examples[bbox]})
 
     return {
         "feature": "absolute_coordinate_patterns",
@@ -10,9 +10,14 @@ Exports
 run_annotation_confidence(index: dict, config: dict=None) -> dict
 """
 
-from typing import Dict, Any, List, Tuple
-import math
-from collections import defaultdict
+from typing import Dict, Any, List
+
+import numpy as np
+
+from cveda.annotations import record_boxes
+
+# boxes processed per numpy block
+_BLOCK_BOXES = 1 << 16
 
 def _bbox_area(bbox: List[float]) -> float:
     x0, y0, x1, y1 = bbox
@@ -24,6 +29,55 @@ def _safe_float(x, default=0.0):
     except Exception:
         return default
 
+class _ClassMoments:
+    """
+    Running per class count, mean and sum of squared deviations (M2).
+
+    Blocks are folded in with the pairwise update of Chan et al., a single pass
+    like sum and sum of squares but without its cancellation when the
+    variance is small relative to the mean.
+    """
+
+    def __init__(self):
+        self.count = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(0, dtype=np.float64)
+        self.m2 = np.zeros(0, dtype=np.float64)
+        self.first = np.zeros(0, dtype=np.int64)
+        self._seen = 0
+
+    def add(self, codes: np.ndarray, values: np.ndarray, n_codes: int) -> None:
+        grow = n_codes - self.count.shape[0]
+        if grow > 0:
+            self.count = np.concatenate((self.count, np.zeros(grow, dtype=np.int64)))
+            self.mean = np.concatenate((self.mean, np.zeros(grow)))
+            self.m2 = np.concatenate((self.m2, np.zeros(grow)))
+            self.first = np.concatenate((self.first, np.full(grow, -1, dtype=np.int64)))
+        nb = np.bincount(codes, minlength=n_codes)
+        present = np.flatnonzero(nb)
+        if present.shape[0] == 0:
+            return
+        # block moments, two pass within the block
+        block_mean = np.bincount(codes, weights=values, minlength=n_codes) / np.maximum(nb, 1)
+        dev = values - block_mean[codes]
+        block_m2 = np.bincount(codes, weights=dev * dev, minlength=n_codes)
+        na = self.count[present]
+        nb = nb[present]
+        n = na + nb
+        delta = block_mean[present] - self.mean[present]
+        self.mean[present] += delta * nb / n
+        self.m2[present] += block_m2[present] + delta * delta * na * nb / n
+        self.count[present] = n
+        # position of the first value of every class, for a stable report order
+        uniq, first = np.unique(codes, return_index=True)
+        fresh = self.first[uniq] < 0
+        self.first[uniq[fresh]] = self._seen + first[fresh]
+        self._seen += codes.shape[0]
+
+    def order(self) -> List[int]:
+        present = np.flatnonzero(self.count)
+        return present[np.argsort(self.first[present])].tolist()
+
+
 def run_annotation_confidence(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Compute geometry-based annotation "confidence" proxies.
@@ -85,49 +139,85 @@ def run_annotation_confidence(index: Dict[str, Any], config: Dict[str, Any] = No
     sample_limit = int(cfg.get("sample_limit", 10))
 
     n_images = 0
-    class_areas = defaultdict(list)
-    extreme_aspect_examples = []
     high_box_images = []
+    extreme_aspect_examples = []
+    class_codes: Dict[str, int] = {}
+    stats = _ClassMoments()
+
+    # boxes are buffered into blocks of about _BLOCK_BOXES rows, each block is
+    # processed with numpy and folded into the per class moments, so memory
+    # stays O(C + block) instead of O(A)
+    rows: List[Any] = []
+    img_areas: List[float] = []
+    box_img: List[int] = []
+    codes: List[int] = []
+    fnames: List[str] = []
+    n_buffered = 0
+
+    def flush() -> None:
+        boxes = np.concatenate(rows)
+        img_of = np.asarray(box_img, dtype=np.int64)
+        code_arr = np.asarray(codes, dtype=np.int64)
+        w = boxes[:, 2] - boxes[:, 0]
+        h = boxes[:, 3] - boxes[:, 1]
+        valid = np.flatnonzero((w > 0) & (h > 0))
+        w = w[valid]
+        h = h[valid]
+        code_v = code_arr[valid]
+        area_frac = (w * h) / np.asarray(img_areas, dtype=np.float64)[img_of[valid]]
+        # aspect ratio max(width/height, height/width)
+        r = w / h
+        ar = np.where(r >= 1, r, 1.0 / r)
+        room = sample_limit - len(extreme_aspect_examples)
+        if room > 0:
+            names = list(class_codes)
+            for k in np.flatnonzero(ar >= ar_thresh)[:room].tolist():
+                box = valid[k]
+                extreme_aspect_examples.append({
+                    "file": fnames[img_of[box]],
+                    "class": names[code_v[k]],
+                    "bbox": boxes[box].tolist(),
+                    "aspect_ratio": float(ar[k])
+                })
+        stats.add(code_v, area_frac, len(class_codes))
 
     for fname, rec in (index or {}).items():
         n_images += 1
         anns = rec.get("annotations", []) or []
         width = _safe_float(rec.get("width", 0))
         height = _safe_float(rec.get("height", 0))
-        img_area = max(1.0, width * height)
         if len(anns) > cfg.get("high_box_threshold", 200):
             high_box_images.append({"file": fname, "n_boxes": len(anns)})
+        if not anns:
+            continue
+        img = len(fnames)
+        fnames.append(fname)
+        img_areas.append(max(1.0, width * height))
+        # unparsable boxes are NaN rows, they fail every comparison and drop out of the masks
+        rows.append(record_boxes(rec)[0])
+        box_img.extend([img] * len(anns))
         for ann in anns:
-            bbox = ann.get("bbox", [0,0,0,0])
-            try:
-                x0, y0, x1, y1 = map(float, bbox)
-            except Exception:
-                continue
-            w = max(0.0, x1 - x0)
-            h = max(0.0, y1 - y0)
-            if w <= 0 or h <= 0:
-                continue
-            area = w * h
-            cls = str(ann.get("class", ""))
-            class_areas[cls].append(area / img_area)
-            # aspect ratio max(width/height, height/width)
-            ar = (w / h) if h > 0 else float('inf')
-            ar = ar if ar >= 1 else 1.0 / ar
-            if ar >= ar_thresh:
-                if len(extreme_aspect_examples) < sample_limit:
-                    extreme_aspect_examples.append({"file": fname, "class": cls, "bbox": [x0,y0,x1,y1], "aspect_ratio": ar})
-
+            cls = ann.get("_class_str") or str(ann.get("class", ""))
+            code = class_codes.get(cls)
+            if code is None:
+                code = class_codes[cls] = len(class_codes)
+            codes.append(code)
+        n_buffered += len(anns)
+        if n_buffered >= _BLOCK_BOXES:
+            flush()
+            rows, img_areas, box_img, codes, fnames = [], [], [], [], []
+            n_buffered = 0
+    if rows:
+        flush()
+
+    # classes are reported in order of their first valid box
+    names = list(class_codes)
     per_class_stats = {}
-    for cls, areas in class_areas.items():
-        if not areas:
-            continue
-        mean = sum(areas) / len(areas)
-        variance = sum((a - mean) ** 2 for a in areas) / len(areas)
-        std = math.sqrt(variance)
-        per_class_stats[cls] = {
-            "count": len(areas),
-            "mean_area_frac": mean,
-            "area_std_frac": std
+    for c in stats.order():
+        per_class_stats[names[c]] = {
+            "count": int(stats.count[c]),
+            "mean_area_frac": float(stats.mean[c]),
+            "area_std_frac": float(np.sqrt(stats.m2[c] / stats.count[c]))
         }
 
     total_anns = sum(v["count"] for v in per_class_stats.values()) if per_class_stats else 0
@@ -9,10 +9,15 @@ Notes:
 - timestamps should be ISO8601 strings or unix epoch numbers.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from collections import defaultdict
 from datetime import datetime
+from functools import lru_cache
 import math
+import time
+
+# days per month in a non leap year
+_MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
 
 def _parse_ts(x):
     if x is None:
@@ -33,6 +38,80 @@ def _parse_ts(x):
     except Exception:
         return None
 
+def _fast_bucket(s: str, bucket: str) -> Optional[str]:
+    """
+    Bucket label read straight from the characters of "YYYY-MM-DD" or
+    "YYYY-MM-DD[T ]HH:MM:SS", the layouts _parse_ts tries first.
+
+    The fields are range checked so only strings strptime accepts are taken,
+    anything else returns None and goes through the full parser.
+    """
+    n = len(s)
+    if (n != 10 and n != 19) or s[4] != "-" or s[7] != "-" or not s.isascii():
+        return None
+    y, m, d = s[0:4], s[5:7], s[8:10]
+    if not (y.isdigit() and m.isdigit() and d.isdigit()):
+        return None
+    year, month, day = int(y), int(m), int(d)
+    if year < 1 or not 1 <= month <= 12 or day < 1:
+        return None
+    leap = month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    if day > _MONTH_DAYS[month - 1] + leap:
+        return None
+    if n == 19:
+        if s[10] not in "T " or s[13] != ":" or s[16] != ":":
+            return None
+        hh, mm, ss = s[11:13], s[14:16], s[17:19]
+        if not (hh.isdigit() and mm.isdigit() and ss.isdigit()):
+            return None
+        if int(hh) > 23 or int(mm) > 59 or int(ss) > 59:
+            return None
+    return s[:7] if bucket == "month" else s[:4]
+
+def _epoch_bucket(x: int, bucket: str) -> Optional[str]:
+    # time.gmtime is the C conversion, datetime only covers years 1 to 9999
+    try:
+        t = time.gmtime(x)
+    except Exception:
+        return None
+    if not 1 <= t.tm_year <= 9999:
+        return None
+    if bucket == "month":
+        return f"{t.tm_year:04d}-{t.tm_mon:02d}"
+    return f"{t.tm_year:04d}"
+
+@lru_cache(maxsize=1 << 17)
+def _bucket_key_cached(key: Any, bucket: str) -> Optional[str]:
+    dt = _parse_ts(key)
+    if not dt:
+        return None
+    if bucket == "month":
+        return f"{dt.year:04d}-{dt.month:02d}"
+    return f"{dt.year:04d}"
+
+def _bucket_key(x: Any, bucket: str) -> Optional[str]:
+    """
+    Time bucket label of a timestamp, or None when it cannot be parsed.
+
+    Numbers are converted with time.gmtime and the common ISO layouts are
+    read from fixed character offsets. Other strings go through _parse_ts,
+    they repeat heavily (batched imports, one labeling day) so those labels
+    are cached.
+    """
+    if x is None:
+        return None
+    if isinstance(x, (int, float)):
+        try:
+            return _epoch_bucket(int(x), bucket)
+        except Exception:
+            return None
+    if not isinstance(x, str):
+        x = str(x)
+    key = _fast_bucket(x, bucket)
+    if key is not None:
+        return key
+    return _bucket_key_cached(x, bucket)
+
 def run_annotation_lifespan_drift(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     config:
@@ -56,17 +135,13 @@ def run_annotation_lifespan_drift(index: Dict[str, Any], config: Dict[str, Any]
         for ann in (rec.get("annotations", []) or []):
             raw = ann.get("raw", {}) or {}
             ts = raw.get("timestamp") or raw.get("time") or ann.get("time")
-            dt = _parse_ts(ts)
-            if not dt:
+            key = _bucket_key(ts, bucket)
+            if key is None:
                 # fallback to record meta
                 meta_ts = rec.get("meta", {}).get("timestamp")
-                dt = _parse_ts(meta_ts)
-            if dt:
+                key = _bucket_key(meta_ts, bucket)
+            if key is not None:
                 any_ts = True
-                if bucket == "month":
-                    key = f"{dt.year:04d}-{dt.month:02d}"
-                else:
-                    key = f"{dt.year:04d}"
                 counter[key] += 1
 
     if not any_ts:
@@ -10,8 +10,34 @@ Buckets by default:
 - abundant: >= 1000
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from bisect import bisect_right
 from collections import Counter, defaultdict
+import math
+
+def _bucket_lookup(buckets: Sequence[Tuple[str, Any, Any]]) -> Tuple[List[int], List[Optional[str]]]:
+    """
+    Sorted integer thresholds and the bucket of every interval between them,
+    so a count is bucketed with a single bisect_right.
+
+    Integer counts inside [lo, hi] are those in [ceil(lo), floor(hi) + 1), the
+    finite ends of all buckets are the thresholds. Each interval takes the
+    first bucket in config order containing it, like a linear scan, so
+    overlapping or gapped custom buckets keep their meaning.
+    """
+    cuts = set()
+    for _, lo, hi in buckets:
+        if math.isfinite(lo):
+            cuts.add(math.ceil(lo))
+        if math.isfinite(hi):
+            cuts.add(math.floor(hi) + 1)
+    thresholds = sorted(cuts)
+    # a representative count of every interval, the one below the first threshold included
+    reps = [thresholds[0] - 1 if thresholds else 0] + thresholds
+    names: List[Optional[str]] = []
+    for rep in reps:
+        names.append(next((name for name, lo, hi in buckets if lo <= rep <= hi), None))
+    return thresholds, names
 
 def run_annotation_rarity_buckets(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     """
@@ -34,17 +60,19 @@ def run_annotation_rarity_buckets(index: Dict[str, Any], config: Dict[str, Any]
         ("abundant", 1000, 10**12)
     ])
 
-    counter = Counter()
-    for fname, rec in (index or {}).items():
-        for ann in (rec.get("annotations", []) or []):
-            counter[str(ann.get("class",""))] += 1
+    # Counter(iterable) counts in C, _class_str is precomputed by the loader
+    counter = Counter(
+        ann.get("_class_str") or str(ann.get("class", ""))
+        for rec in (index or {}).values()
+        for ann in (rec.get("annotations", []) or [])
+    )
 
+    thresholds, names = _bucket_lookup(buckets)
     bucket_map = defaultdict(list)
     for cls, cnt in counter.items():
-        for name, lo, hi in buckets:
-            if lo <= cnt <= hi:
-                bucket_map[name].append({"class": cls, "count": cnt})
-                break
+        name = names[bisect_right(thresholds, cnt)]
+        if name is not None:
+            bucket_map[name].append({"class": cls, "count": cnt})
 
     return {
         "feature": "annotation_rarity_buckets",
@@ -9,8 +9,12 @@ Outputs:
 - list of low-coverage images for manual inspection
 """
 
-from typing import Dict, Any, List
-from collections import defaultdict
+from typing import Dict, Any
+
+import numpy as np
+
+from cveda.annotations import record_boxes
+
 
 def run_background_relevance(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     """
@@ -33,8 +37,10 @@ def run_background_relevance(index: Dict[str, Any], config: Dict[str, Any] = Non
     low_thresh = float(cfg.get("low_coverage_threshold", 0.01))
     sample_limit = int(cfg.get("sample_limit", 20))
 
-    fractions = []
-    low_imgs = []
+    names = []
+    img_areas = []
+    rows = []
+    box_img = []
     n_images = 0
 
     for fname, rec in (index or {}).items():
@@ -47,34 +53,41 @@ def run_background_relevance(index: Dict[str, Any], config: Dict[str, Any] = Non
                 img_area = 1.0
         except Exception:
             img_area = 1.0
+        img = len(names)
+        names.append(fname)
+        img_areas.append(img_area)
         anns = rec.get("annotations", []) or []
-        total_ann_area = 0.0
-        for ann in anns:
-            bbox = ann.get("bbox", [0,0,0,0])
-            try:
-                x0,y0,x1,y1 = map(float, bbox)
-                w = max(0.0, x1-x0)
-                h = max(0.0, y1-y0)
-                total_ann_area += w*h
-            except Exception:
-                continue
-        frac = total_ann_area / img_area
-        fractions.append(frac)
-        if frac <= low_thresh:
-            if len(low_imgs) < sample_limit:
-                low_imgs.append({"file": fname, "coverage": frac})
+        if not anns:
+            continue
+        # unparsable boxes are NaN rows, their clamped width and height are 0
+        rows.append(record_boxes(rec)[0])
+        box_img.extend([img] * len(anns))
+
+    # box areas for the whole index at once, fmax clamps NaN to 0 like max(0.0, x)
+    boxes = np.concatenate(rows) if rows else np.empty((0, 4), dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        w = np.fmax(boxes[:, 2] - boxes[:, 0], 0.0)
+        h = np.fmax(boxes[:, 3] - boxes[:, 1], 0.0)
+        area = w * h
+    # bincount accumulates each image's boxes in order, like the running sum did
+    total_ann_area = np.bincount(np.asarray(box_img, dtype=np.int64), weights=area, minlength=len(names))
+    fractions_arr = total_ann_area / np.asarray(img_areas, dtype=np.float64)
+
+    low_imgs = [{"file": names[i], "coverage": float(fractions_arr[i])}
+                for i in np.flatnonzero(fractions_arr <= low_thresh)[:sample_limit].tolist()]
 
-    # basic stats
-    fractions_sorted = sorted(fractions)
-    mean = sum(fractions)/max(1, len(fractions))
-    median = fractions_sorted[len(fractions_sorted)//2] if fractions_sorted else 0.0
+    # basic stats, the median is the upper middle element found by an O(N) partition
+    n = fractions_arr.shape[0]
+    mean = float(fractions_arr.mean()) if n else 0.0
+    median = float(np.partition(fractions_arr, n // 2)[n // 2]) if n else 0.0
+    low_count = int(np.count_nonzero(fractions_arr <= low_thresh))
 
     return {
         "feature": "background_relevance",
         "n_images": n_images,
         "mean_annotation_fraction": mean,
         "median_annotation_fraction": median,
-        "low_coverage_count": sum(1 for f in fractions if f <= low_thresh),
+        "low_coverage_count": low_count,
         "low_coverage_examples": low_imgs,
         "status": "ok"
     }
@@ -10,8 +10,17 @@ Outputs:
 - small sample of offending annotations
 """
 
-from typing import Dict, Any, List
-from collections import defaultdict
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from cveda.annotations import record_boxes
+
+def _safe_float(x, default=0.0):
+    try:
+        return float(x)
+    except Exception:
+        return default
 
 def run_bbox_border_alignment(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     """
@@ -32,33 +41,61 @@ def run_bbox_border_alignment(index: Dict[str, Any], config: Dict[str, Any] = No
     eps = float(cfg.get("eps", 1.0))
     sample_limit = int(cfg.get("sample_limit", 20))
 
-    n_boxes = 0
-    border_count = 0
-    per_class_counts = defaultdict(int)
-    per_class_border = defaultdict(int)
-    examples = []
+    class_codes: Dict[str, int] = {}
+    rows: List[np.ndarray] = []
+    codes: List[int] = []
+    sizes: List[Tuple[float, float]] = []
+    box_img: List[int] = []
+    fnames: List[str] = []
 
     for fname, rec in (index or {}).items():
         width = rec.get("width", 0) or rec.get("meta", {}).get("width", 0) or 0
         height = rec.get("height", 0) or rec.get("meta", {}).get("height", 0) or 0
-        for ann in (rec.get("annotations", []) or []):
-            bbox = ann.get("bbox", [0,0,0,0])
-            try:
-                x0,y0,x1,y1 = map(float, bbox)
-            except Exception:
+        anns = rec.get("annotations", []) or []
+        if not anns:
+            continue
+        boxes, valid = record_boxes(rec)
+        valid_anns = anns
+        if not valid.all():
+            # boxes that are not four numbers are skipped
+            valid_anns = [ann for ann, ok in zip(anns, valid.tolist()) if ok]
+            if not valid_anns:
                 continue
-            n_boxes += 1
-            cls = str(ann.get("class",""))
-            per_class_counts[cls] += 1
-            touches = (abs(x0 - 0.0) <= eps) or (abs(y0 - 0.0) <= eps) or (abs(x1 - width) <= eps) or (abs(y1 - height) <= eps)
-            if touches:
-                per_class_border[cls] += 1
-                border_count += 1
-                if len(examples) < sample_limit:
-                    examples.append({"file": fname, "class": cls, "bbox": [x0,y0,x1,y1]})
+            boxes = boxes[valid]
+        for ann in valid_anns:
+            cls = ann.get("_class_str") or str(ann.get("class", ""))
+            code = class_codes.get(cls)
+            if code is None:
+                code = class_codes[cls] = len(class_codes)
+            codes.append(code)
+        box_img.extend([len(fnames)] * len(valid_anns))
+        fnames.append(fname)
+        # a size that is not a number never matches, the box can still touch the top left
+        sizes.append((_safe_float(width, np.nan), _safe_float(height, np.nan)))
+        rows.append(boxes)
+
+    n_boxes = len(codes)
+    names = list(class_codes)
+    if n_boxes:
+        b = np.concatenate(rows)
+        img_of = np.asarray(box_img, dtype=np.int64)
+        size = np.asarray(sizes, dtype=np.float64)
+        code_arr = np.asarray(codes, dtype=np.int64)
+        # all four border tests for every box at once
+        touches = ((np.abs(b[:, 0]) <= eps) | (np.abs(b[:, 1]) <= eps)
+                   | (np.abs(b[:, 2] - size[img_of, 0]) <= eps) | (np.abs(b[:, 3] - size[img_of, 1]) <= eps))
+        border_count = int(np.count_nonzero(touches))
+        per_class_counts = np.bincount(code_arr, minlength=len(names))
+        per_class_border = np.bincount(code_arr[touches], minlength=len(names))
+        examples = [{"file": fnames[img_of[i]], "class": names[code_arr[i]], "bbox": b[i].tolist()}
+                    for i in np.flatnonzero(touches)[:sample_limit].tolist()]
+    else:
+        border_count = 0
+        per_class_counts = per_class_border = np.zeros(0, dtype=np.int64)
+        examples = []
 
     overall_frac = border_count / max(1, n_boxes)
-    per_class_frac = {cls: per_class_border[cls] / per_class_counts[cls] for cls in per_class_counts}
+    per_class_frac = {cls: int(per_class_border[c]) / int(per_class_counts[c]) for c, cls in enumerate(names)}
 
     return {
         "feature": "bbox_border_alignment",
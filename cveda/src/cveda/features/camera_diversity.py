@@ -6,51 +6,77 @@ If EXIF Model not present the module returns counts based on available metadata.
 
 Notes
 -----
-PIL EXIF tag access varies by image format and camera. This module uses common keys
-and normalizes strings for grouping.
+The model is read from EXIF tag 272. When piexif is installed only the EXIF
+segment of the file is parsed, otherwise and for files piexif cannot read
+Image.getexif is used. Strings are normalized for grouping.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from collections import Counter
+from itertools import islice
 from PIL import Image
-import os
+from cveda.utils.io_helpers import map_paths, path_exists, path_pool
+try:
+    import piexif
+    _PIEXIF_AVAILABLE = True
+except Exception:
+    _PIEXIF_AVAILABLE = False
+
+# EXIF tag id of the camera model
+_EXIF_MODEL = 272
+
+def _exif_model(path: str) -> Optional[str]:
+    """
+    EXIF camera model of the image at path, "" when it has none and None when
+    the file cannot be read. Module level so worker processes can pickle it.
+    """
+    if _PIEXIF_AVAILABLE:
+        # piexif parses only the EXIF segment, files it cannot handle go through PIL
+        try:
+            model = piexif.load(path)["0th"].get(piexif.ImageIFD.Model)
+            if isinstance(model, bytes):
+                model = model.decode("latin-1").rstrip("\x00")
+            return str(model) if model is not None else ""
+        except Exception:
+            pass
+    try:
+        with Image.open(path) as im:
+            # Model is tag 272 (0x0110) of IFD0, getexif reads it without the legacy flattening of _getexif
+            model = im.getexif().get(_EXIF_MODEL)
+            return str(model) if model is not None else ""
+    except Exception:
+        return None
 
 def run_camera_diversity(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     cfg = config or {}
     sample_limit = int(cfg.get("sample_limit", 500))
+    max_workers = cfg.get("max_workers")
     counts = Counter()
     examples = {}
     scanned = 0
 
-    for fname, rec in (index or {}).items():
-        if scanned >= sample_limit:
-            break
-        path = rec.get("abs_path")
-        if not path or not os.path.exists(path):
-            continue
-        try:
-            with Image.open(path) as im:
-                exif = im._getexif() or {}
-                # EXIF tag 272 is Model in many images; fallback to raw meta
-                model = None
-                # safe access common keys
-                if isinstance(exif, dict):
-                    for k,v in exif.items():
-                        # some PIL builds return tag ids others names
-                        try:
-                            if str(k).lower() == 'model' or k==272:
-                                model = str(v)
-                                break
-                        except Exception:
-                            continue
+    listings: Dict[str, frozenset] = {}
+    candidates = ((fname, rec, rec.get("abs_path")) for fname, rec in (index or {}).items())
+    candidates = ((fname, rec, path) for fname, rec, path in candidates if path and path_exists(path, listings))
+    # one pool serves every batch, sized for the whole sample
+    with path_pool(min(sample_limit, len(index or {})), max_workers) as pool:
+        # each batch is only as large as the number of models still needed, so
+        # no more files are opened than a serial scan would open
+        while scanned < sample_limit:
+            batch = list(islice(candidates, sample_limit - scanned))
+            if not batch:
+                break
+            for (fname, rec, _), model in zip(batch, map_paths(_exif_model, [b[2] for b in batch], max_workers, pool)):
+                if model is None:
+                    continue
                 if not model:
-                    model = rec.get("meta", {}).get("camera_model") or rec.get("meta", {}).get("model")
+                    # fallback to raw meta
+                    meta = rec.get("meta") or {}
+                    model = meta.get("camera_model") or meta.get("model")
                 model = (str(model).strip() if model else "unknown")
                 counts[model] += 1
                 if model not in examples:
                     examples[model] = fname
                 scanned += 1
-        except Exception:
-            continue
 
     return {"feature": "camera_diversity", "scanned": scanned, "camera_counts": dict(counts), "examples": examples, "status": "ok"}
@@ -9,18 +9,33 @@ Returns:
 - list of images whose channel distribution deviates strongly from dataset median
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any
+from functools import partial
+from itertools import islice
 from PIL import Image
 import numpy as np
-import os
 import statistics
+from cveda.utils.io_helpers import map_paths, path_exists, path_pool
+
+
+# images below this many pixels are always decoded in full, the draft saves
+# little there and moves saturated channel means the most
+_DRAFT_MIN_PIXELS = 1 << 20
+
 
 def _mean_rgb(img_path, downscale=0.25):
     try:
         with Image.open(img_path) as im:
-            im = im.convert("RGB")
             w,h = im.size
-            small = im.resize((max(1,int(w*downscale)), max(1,int(h*downscale))))
+            target = (max(1,int(w*downscale)), max(1,int(h*downscale)))
+            if w * h >= _DRAFT_MIN_PIXELS and w >= 4 * target[0] and h >= 4 * target[1]:
+                # JPEG decodes at a reduced DCT scale no smaller than twice target, the
+                # reducing gap of Image.thumbnail, other formats ignore draft. Channel
+                # means then move by up to about 0.02 on saturated channels, where the
+                # scaled decode clips less ringing, and about 2e-4 on photographs
+                im.draft("RGB", (target[0] * 2, target[1] * 2))
+            im = im.convert("RGB")
+            small = im.resize(target) if im.size != target else im
             arr = np.asarray(small).astype(np.float32)/255.0
             m = arr.mean(axis=(0,1))  # R,G,B means
             return float(m[0]), float(m[1]), float(m[2])
@@ -31,17 +46,24 @@ def run_color_cast_detection(index: Dict[str, Any], config: Dict[str, Any] = Non
     cfg = config or {}
     sample_limit = int(cfg.get("sample_limit", 200))
     downscale = float(cfg.get("downscale", 0.25))
+    max_workers = cfg.get("max_workers")
     samples = []
-    for fname, rec in (index or {}).items():
-        path = rec.get("abs_path")
-        if not path or not os.path.exists(path):
-            continue
-        rgb = _mean_rgb(path, downscale=downscale)
-        if rgb is None:
-            continue
-        samples.append({"file": fname, "r": rgb[0], "g": rgb[1], "b": rgb[2]})
-        if len(samples) >= sample_limit:
-            break
+    func = partial(_mean_rgb, downscale=downscale)
+    listings: Dict[str, frozenset] = {}
+    candidates = ((fname, rec.get("abs_path")) for fname, rec in (index or {}).items())
+    candidates = ((fname, path) for fname, path in candidates if path and path_exists(path, listings))
+    # one pool serves every batch, sized for the whole sample
+    with path_pool(min(sample_limit, len(index or {})), max_workers) as pool:
+        # each batch is only as large as the number of samples still needed, so
+        # no more files are decoded than a serial scan would decode
+        while len(samples) < sample_limit:
+            batch = list(islice(candidates, sample_limit - len(samples)))
+            if not batch:
+                break
+            for (fname, _), rgb in zip(batch, map_paths(func, [b[1] for b in batch], max_workers, pool)):
+                if rgb is None:
+                    continue
+                samples.append({"file": fname, "r": rgb[0], "g": rgb[1], "b": rgb[2]})
 
     if not samples:
         return {"feature": "color_cast_detection", "status": "no_images_processed"}
@@ -6,13 +6,14 @@ Detect images likely suffering from heavy JPEG compression or visible blockiness
 Heuristic
 ---------
 - For JPEG files, attempt to read file size and image dimensions and compute bytes per pixel
-- compute simple blockiness score via downsample and upsample residual variance
+- compute a simple blockiness score as the intensity variance of a downsampled grayscale copy
 - return top candidates with highest blockiness
 
 Config
 ------
 - sample_limit default 200 for scanning
 - blockiness_threshold optional float
+- max_workers optional int process count for decoding, 1 keeps it serial
 
 Return
 ------
@@ -24,27 +25,34 @@ Return
 }
 """
 
-from typing import Dict, Any, List
-import os
+from typing import Dict, Any
+from functools import partial
 from PIL import Image
 import numpy as np
+from cveda.utils.io_helpers import map_paths, path_exists
+
+
+# images below this many pixels are always decoded in full, the draft saves
+# little there and moves the score the most
+_DRAFT_MIN_PIXELS = 1 << 20
+
 
 def _blockiness_score(img_path, downscale=0.5):
     try:
         with Image.open(img_path) as im:
-            im = im.convert("L")
             w,h = im.size
-            small = im.resize((max(1,int(w*downscale)), max(1,int(h*downscale))))
+            target = (max(1,int(w*downscale)), max(1,int(h*downscale)))
+            if w * h >= _DRAFT_MIN_PIXELS and w >= 4 * target[0] and h >= 4 * target[1]:
+                # JPEG decodes luma only, at a DCT scale no smaller than twice target so the
+                # resize still low pass filters like a full decode would (the reducing_gap of
+                # Image.thumbnail), other formats ignore draft. The score then moves by up
+                # to about 1.5% on noise like content, below 0.1% on photographs
+                im.draft("L", (target[0] * 2, target[1] * 2))
+            im = im.convert("L")
+            small = im.resize(target) if im.size != target else im
             arr = np.asarray(small, dtype=float)
-            # upsample back and compute residual to estimate blocking artifacts
-            up = Image.fromarray(arr.astype(np.uint8)).resize((w,h))
-            up_arr = np.asarray(up, dtype=float)
-            # align sizes
-            if up_arr.shape != (h,w):
-                up_arr = np.resize(up_arr, (h,w))
-            residual = arr - np.mean(arr)
-            # use variance of residual as proxy, normalized
-            return float(np.var(residual))
+            # intensity variance of the downscaled image as the proxy
+            return float(arr.var())
     except Exception:
         return None
 
@@ -53,16 +61,22 @@ def run_compression_anomaly(index: Dict[str, Any], config: Dict[str, Any] = None
     sample_limit = int(cfg.get("sample_limit", 200))
     downscale = float(cfg.get("downscale", 0.5))
 
-    candidates = []
-    scanned = 0
+    max_workers = cfg.get("max_workers")
+
+    # every existing file up to sample_limit is scanned, so the sample is known up front
+    sampled = []
+    listings: Dict[str, frozenset] = {}
     for fname, rec in (index or {}).items():
-        if scanned >= sample_limit:
+        if len(sampled) >= sample_limit:
             break
         path = rec.get("abs_path")
-        if not path or not os.path.exists(path):
+        if not path or not path_exists(path, listings):
             continue
-        scanned += 1
-        block = _blockiness_score(path, downscale=downscale)
+        sampled.append((fname, path))
+    scanned = len(sampled)
+
+    candidates = []
+    for (fname, _), block in zip(sampled, map_paths(partial(_blockiness_score, downscale=downscale), [p for _, p in sampled], max_workers)):
         if block is None:
             continue
         candidates.append({"file": fname, "blockiness": block})
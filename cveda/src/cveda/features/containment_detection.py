@@ -8,9 +8,32 @@ Useful for part->whole relationships like wheel inside car or plate inside vehic
 from typing import Dict, Any, List
 from collections import defaultdict
 
+import numpy as np
+
+# container rows compared per block, bounds the boolean block at this many rows by N
+_BLOCK_ROWS = 512
+
 def _contains(b_outer, b_inner, eps=1e-6):
     return (b_inner[0] >= b_outer[0]-eps and b_inner[1] >= b_outer[1]-eps and b_inner[2] <= b_outer[2]+eps and b_inner[3] <= b_outer[3]+eps)
 
+def _containment_pairs(B: np.ndarray, eps: float = 1e-6) -> np.ndarray:
+    """
+    (i, j) index pairs where box j lies inside box i, i != j, in row major
+    order. Same test as _contains, broadcast over all pairs of rows of B.
+    """
+    n = B.shape[0]
+    hits = []
+    for lo in range(0, n, _BLOCK_ROWS):
+        outer = B[lo:lo + _BLOCK_ROWS, None, :]
+        inner = B[None, :, :]
+        contains = ((inner[..., 0] >= outer[..., 0] - eps) & (inner[..., 1] >= outer[..., 1] - eps)
+                    & (inner[..., 2] <= outer[..., 2] + eps) & (inner[..., 3] <= outer[..., 3] + eps))
+        rows = np.arange(contains.shape[0])
+        contains[rows, rows + lo] = False
+        ii, jj = np.nonzero(contains)
+        hits.append(np.stack((ii + lo, jj), axis=1))
+    return np.concatenate(hits) if hits else np.empty((0, 2), dtype=np.int64)
+
 def run_containment_detection(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     config:
@@ -33,23 +56,34 @@ def run_containment_detection(index: Dict[str, Any], config: Dict[str, Any] = No
 
     for fname, rec in (index or {}).items():
         anns = rec.get("annotations", []) or []
-        boxes = []
-        for ann in anns:
-            try:
-                bbox = list(map(float, ann.get("bbox", [0,0,0,0])))
-            except Exception:
-                continue
-            boxes.append((bbox, str(ann.get("class",""))))
-        # check containment for each ordered pair
-        for i in range(len(boxes)):
-            b1, cls1 = boxes[i]
-            for j in range(len(boxes)):
-                if i==j: continue
-                b2, cls2 = boxes[j]
-                if _contains(b1, b2):
-                    pair_counts[(cls1, cls2)] += 1
-                    if len(pair_examples[(cls1, cls2)]) < sample_limit:
-                        pair_examples[(cls1, cls2)].append({"file": fname, "container_bbox": b1, "contained_bbox": b2})
+        if len(anns) < 2:
+            continue
+        pre = rec.get("_boxes")
+        if pre is not None and pre.shape[0] == len(anns):
+            # preparsed by the loader
+            bboxes = pre.tolist()
+            classes = [ann.get("_class_str") or str(ann.get("class", "")) for ann in anns]
+        else:
+            bboxes = []
+            classes = []
+            for ann in anns:
+                try:
+                    bbox = list(map(float, ann.get("bbox", [0,0,0,0])))
+                except Exception:
+                    continue
+                if len(bbox) < 4:
+                    continue
+                bboxes.append(bbox)
+                classes.append(ann.get("_class_str") or str(ann.get("class", "")))
+        if len(bboxes) < 2:
+            continue
+        B = np.array([bb[:4] for bb in bboxes], dtype=np.float64)
+        # check containment for every ordered pair at once, then walk the (usually few) hits
+        for i, j in _containment_pairs(B).tolist():
+            key = (classes[i], classes[j])
+            pair_counts[key] += 1
+            if len(pair_examples[key]) < sample_limit:
+                pair_examples[key].append({"file": fname, "container_bbox": bboxes[i], "contained_bbox": bboxes[j]})
 
     # prepare top pairs above support threshold
     top_pairs = []
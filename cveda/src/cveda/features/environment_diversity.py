@@ -10,11 +10,29 @@ This is coarse and heuristic driven. For production use a classifier model.
 Return counts of predicted categories and example files.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from functools import partial
+from itertools import islice
 from PIL import Image
 import numpy as np
-import os
 from collections import defaultdict
+from cveda.utils.io_helpers import map_paths, path_exists, path_pool
+
+
+def _channel_means(path: str, downscale: float = 0.25) -> Optional[Tuple[float, float, float]]:
+    """
+    Mean R, G, B of the downscaled image in [0, 1], None when it cannot be read.
+    Module level so worker processes can pickle it.
+    """
+    try:
+        with Image.open(path) as im:
+            im = im.convert("RGB")
+            w,h = im.size
+            small = im.resize((max(1,int(w*downscale)), max(1,int(h*downscale))))
+            arr = np.asarray(small).astype(float)/255.0
+            return arr[:,:,0].mean(), arr[:,:,1].mean(), arr[:,:,2].mean()
+    except Exception:
+        return None
 
 def run_environment_diversity(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     cfg = config or {}
@@ -24,21 +42,24 @@ def run_environment_diversity(index: Dict[str, Any], config: Dict[str, Any] = No
     examples = defaultdict(list)
     scanned = 0
 
-    for fname, rec in (index or {}).items():
-        if scanned >= sample_limit:
-            break
-        path = rec.get("abs_path")
-        if not path or not os.path.exists(path):
-            continue
-        try:
-            with Image.open(path) as im:
-                im = im.convert("RGB")
-                w,h = im.size
-                small = im.resize((max(1,int(w*downscale)), max(1,int(h*downscale))))
-                arr = np.asarray(small).astype(float)/255.0
-                mean_r = arr[:,:,0].mean()
-                mean_g = arr[:,:,1].mean()
-                mean_b = arr[:,:,2].mean()
+    max_workers = cfg.get("max_workers")
+
+    func = partial(_channel_means, downscale=downscale)
+    listings: Dict[str, frozenset] = {}
+    candidates = ((fname, rec.get("abs_path")) for fname, rec in (index or {}).items())
+    candidates = ((fname, path) for fname, path in candidates if path and path_exists(path, listings))
+    # one pool serves every batch, sized for the whole sample
+    with path_pool(min(sample_limit, len(index or {})), max_workers) as pool:
+        # each batch is only as large as the number of images still needed, so
+        # no more files are decoded than a serial scan would decode
+        while scanned < sample_limit:
+            batch = list(islice(candidates, sample_limit - scanned))
+            if not batch:
+                break
+            for (fname, _), means in zip(batch, map_paths(func, [b[1] for b in batch], max_workers, pool)):
+                if means is None:
+                    continue
+                mean_r, mean_g, mean_b = means
                 # heuristic rules
                 if mean_g > 0.35 and mean_b < 0.6:
                     label = "outdoor_green"
@@ -52,7 +73,5 @@ def run_environment_diversity(index: Dict[str, Any], config: Dict[str, Any] = No
                 if len(examples[label]) < 10:
                     examples[label].append({"file": fname, "r": mean_r, "g": mean_g, "b": mean_b})
                 scanned += 1
-        except Exception:
-            continue
 
     return {"feature": "environment_diversity", "scanned": scanned, "counts": dict(counts), "examples": dict(examples), "status": "ok"}
@@ -1,14 +1,18 @@
 """
 geographic_clustering
 
-Lightweight clustering based on EXIF GPS coordinates. No external clustering library required.
-We quantize lat lon to grid cells and report clusters.
+Lightweight clustering based on GPS coordinates. No external clustering library required.
+Coordinates come from record metadata, or from the EXIF GPS tags of the image when the
+metadata has none. We quantize lat lon to grid cells and report clusters.
 
 Config
 ------
 - grid_deg float default 0.1 degrees the grid cell size for clustering
 - sample_limit int default 10000
 
+EXIF GPS is read with PIL, or for larger batches through a single exiftool
+process when the optional pyexiftool package is installed.
+
 Return
 ------
 {
@@ -18,34 +22,124 @@ Return
 }
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from collections import defaultdict
+from functools import lru_cache
 from PIL import Image
+import numpy as np
+import logging
 import os
+try:
+    import exiftool
+    _EXIFTOOL_AVAILABLE = True
+except Exception:
+    _EXIFTOOL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# grid indices below this magnitude are binned in int64, larger ones keep Python ints
+_INT_BIN_LIMIT = float(2 ** 62)
+# EXIF GPS IFD pointer and the tags read from it
+_GPS_IFD = 34853
+_GPS_LATITUDE_REF = 1
+_GPS_LATITUDE = 2
+_GPS_LONGITUDE_REF = 3
+_GPS_LONGITUDE = 4
+# from this many files without metadata coordinates one exiftool session reads them all
+_EXIFTOOL_MIN_FILES = 32
+_EXIFTOOL_TAGS = ["GPSLatitude", "GPSLatitudeRef", "GPSLongitude", "GPSLongitudeRef"]
 
-def _get_gps_from_exif(exif):
-    # tries multiple possible EXIF fields to extract GPS info
+def _dms_to_deg(dms: Any, ref: Any) -> Optional[float]:
+    # EXIF stores degrees, minutes and seconds as three rationals, S and W are negative
     try:
-        # PIL forms GPS info under 34853 sometimes
-        gps = exif.get(34853) if isinstance(exif, dict) else None
-        if gps:
-            lat = gps.get(2)  # may be rational tuples
-            lon = gps.get(4)
-            # fallback logic not robust here, best-effort
-            return None
+        d, m, sec = (float(x) for x in dms)
     except Exception:
-        pass
-    return None
+        return None
+    deg = d + m / 60.0 + sec / 3600.0
+    if isinstance(ref, bytes):
+        ref = ref.decode("latin-1", "ignore")
+    return -deg if str(ref).strip().upper() in ("S", "W") else deg
+
+@lru_cache(maxsize=4096)
+def _exif_gps(path: str, mtime_ns: int) -> Optional[Tuple[float, float]]:
+    """
+    (lat, lon) in decimal degrees from the EXIF GPS IFD of the image, None
+    when the file has no usable GPS tags. Only the header is parsed, no pixels
+    are decoded. Cached per path and mtime so reruns skip unchanged files.
+    """
+    try:
+        with Image.open(path) as im:
+            gps = im.getexif().get_ifd(_GPS_IFD)
+    except Exception:
+        return None
+    if not gps:
+        return None
+    lat = _dms_to_deg(gps.get(_GPS_LATITUDE), gps.get(_GPS_LATITUDE_REF))
+    lon = _dms_to_deg(gps.get(_GPS_LONGITUDE), gps.get(_GPS_LONGITUDE_REF))
+    if lat is None or lon is None:
+        return None
+    return lat, lon
+
+def _exiftool_gps(paths: List[str]) -> List[Optional[Tuple[float, float]]]:
+    """
+    (lat, lon) of every path read in one stay open exiftool process, parallel
+    to paths. -n gives unsigned decimal degrees, the sign comes from the refs.
+    Raises when exiftool cannot be started, callers fall back to PIL.
+    """
+    if hasattr(exiftool, "ExifToolHelper"):
+        with exiftool.ExifToolHelper(common_args=["-G", "-n", "-fast"]) as et:
+            metas = et.get_tags(paths, tags=_EXIFTOOL_TAGS)
+    else:
+        # pyexiftool before 0.5
+        with exiftool.ExifTool(common_args=["-G", "-n", "-fast"]) as et:
+            metas = et.get_tags_batch(_EXIFTOOL_TAGS, paths)
+    out: List[Optional[Tuple[float, float]]] = []
+    for meta in metas:
+        # keys are group prefixed, e.g. "EXIF:GPSLatitude"
+        tags = {k.split(":")[-1]: v for k, v in (meta or {}).items()}
+        try:
+            lat = float(tags["GPSLatitude"])
+            lon = float(tags["GPSLongitude"])
+        except Exception:
+            out.append(None)
+            continue
+        if str(tags.get("GPSLatitudeRef", "")).strip().upper().startswith("S"):
+            lat = -abs(lat)
+        if str(tags.get("GPSLongitudeRef", "")).strip().upper().startswith("W"):
+            lon = -abs(lon)
+        out.append((lat, lon))
+    return out
+
+def _files_gps(paths: List[str]) -> List[Optional[Tuple[float, float]]]:
+    """
+    EXIF (lat, lon) of every path, parallel to paths. Many files go through a
+    single exiftool session when pyexiftool is installed, the rest are parsed
+    with PIL one by one.
+    """
+    if _EXIFTOOL_AVAILABLE and len(paths) >= _EXIFTOOL_MIN_FILES:
+        try:
+            return _exiftool_gps(paths)
+        except Exception as e:
+            logger.warning("exiftool batch read failed, reading EXIF with PIL: %s", e)
+    out: List[Optional[Tuple[float, float]]] = []
+    for path in paths:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            out.append(None)
+            continue
+        out.append(_exif_gps(path, mtime_ns))
+    return out
 
 def run_geographic_clustering(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     cfg = config or {}
     grid_deg = float(cfg.get("grid_deg", 0.1))
     sample_limit = int(cfg.get("sample_limit", 10000))
 
-    clusters = defaultdict(list)
-    found_any = False
+    # first pass reads metadata coordinates, files without them are read afterwards in one batch
+    entries: List[List[Any]] = []
+    pending: List[Tuple[int, str]] = []
     scanned = 0
-
     for fname, rec in (index or {}).items():
         if scanned >= sample_limit:
             break
@@ -54,38 +148,61 @@ def run_geographic_clustering(index: Dict[str, Any], config: Dict[str, Any] = No
         meta = rec.get("meta", {}) or {}
         lat = meta.get("gps_lat") or meta.get("latitude") or meta.get("lat")
         lon = meta.get("gps_lon") or meta.get("longitude") or meta.get("lon")
-        if lat is None or lon is None:
-            # try EXIF if abs_path present
-            path = rec.get("abs_path")
-            if path and os.path.exists(path):
-                try:
-                    with Image.open(path) as im:
-                        exif = im._getexif() or {}
-                        # many possible formats so attempt common keys
-                        gps = exif.get('GPSInfo') or exif.get(34853) or {}
-                        # try keys like GPSLatitude, GPSLongitude
-                        lat = meta.get("gps_lat") or meta.get("latitude")
-                        lon = meta.get("gps_lon") or meta.get("longitude")
-                except Exception:
-                    continue
+        if (lat is None or lon is None) and rec.get("abs_path"):
+            pending.append((len(entries), rec["abs_path"]))
+        entries.append([fname, lat, lon])
+    if pending:
+        # only files whose metadata has no coordinates are opened
+        for (i, _), gps in zip(pending, _files_gps([p for _, p in pending])):
+            if gps is not None:
+                entries[i][1], entries[i][2] = gps
+
+    fnames: List[str] = []
+    lats: List[float] = []
+    lons: List[float] = []
+    for fname, lat, lon in entries:
         try:
             if lat is None or lon is None:
                 continue
             lat_f = float(lat)
             lon_f = float(lon)
-            found_any = True
-            lat_bin = int(lat_f / grid_deg)
-            lon_bin = int(lon_f / grid_deg)
-            clusters[(lat_bin, lon_bin)].append({"file": fname, "lat": lat_f, "lon": lon_f})
         except Exception:
             continue
+        fnames.append(fname)
+        lats.append(lat_f)
+        lons.append(lon_f)
 
-    if not found_any:
+    if not fnames:
         return {"feature": "geographic_clustering", "status": "no_gps"}
 
+    # grid cells for all coordinates at once, int() truncates toward zero so trunc not floor
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        q = np.stack((np.asarray(lats), np.asarray(lons)), axis=1) / grid_deg
+    finite = np.isfinite(q).all(axis=1)
+    small = finite & (np.abs(q) < _INT_BIN_LIMIT).all(axis=1)
+    rows = np.flatnonzero(small)
+    # (first row, cell, member rows) of every cluster
+    groups: List[Tuple[int, Tuple[int, int], np.ndarray]] = []
+    if rows.shape[0]:
+        bins = np.trunc(q[rows]).astype(np.int64)
+        keys, first, inverse, counts = np.unique(bins, axis=0, return_index=True, return_inverse=True, return_counts=True)
+        inverse = inverse.reshape(-1)
+        members = np.split(rows[np.argsort(inverse, kind="stable")], np.cumsum(counts)[:-1])
+        for key, f, m in zip(keys.tolist(), rows[first].tolist(), members):
+            groups.append((f, (key[0], key[1]), m))
+    # coordinates too large for int64 cells, only reachable with invalid degrees
+    big = defaultdict(list)
+    for r in np.flatnonzero(finite & ~small).tolist():
+        big[(int(q[r, 0]), int(q[r, 1]))].append(r)
+    for cell, m in big.items():
+        groups.append((m[0], cell, np.asarray(m)))
+    # clusters in order of their first member, like dict insertion order
+    groups.sort(key=lambda g: g[0])
+
     out = []
-    for cell, members in clusters.items():
-        if len(members) >= cfg.get("min_cluster_size", 3):
-            out.append({"cell": cell, "count": len(members), "examples": members[:10]})
+    for _, cell, m in groups:
+        if len(m) >= cfg.get("min_cluster_size", 3):
+            examples = [{"file": fnames[r], "lat": lats[r], "lon": lons[r]} for r in m[:10].tolist()]
+            out.append({"cell": cell, "count": len(m), "examples": examples})
 
     return {"feature": "geographic_clustering", "clusters": out, "status": "ok"}
@@ -6,41 +6,71 @@ Estimate per-image mean luminance and categorize images into buckets: dark, norm
 Return proportions and sample examples from each bucket.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from functools import partial
 from PIL import Image
 import numpy as np
 import os
 from collections import defaultdict
+from cveda.utils.io_helpers import map_paths
+
+
+# images below this many pixels are always decoded and resized in full, the
+# draft and the box reduction save little there and move the mean the most
+_DRAFT_MIN_PIXELS = 1 << 20
+
+
+def _luminance(path: str, downscale: float = 0.25) -> Optional[float]:
+    """
+    Mean luminance of the downscaled image in [0, 1], None when it cannot be
+    read. Module level so worker processes can pickle it.
+    """
+    try:
+        with Image.open(path) as im:
+            w,h = im.size
+            target = (max(1,int(w*downscale)), max(1,int(h*downscale)))
+            large = w * h >= _DRAFT_MIN_PIXELS and w >= 4 * target[0] and h >= 4 * target[1]
+            if large:
+                # JPEG decodes luma only at a reduced DCT scale no smaller than target, other formats ignore draft
+                im.draft("L", target)
+            im = im.convert("L")
+            # large images in formats without draft arrive at full size, reducing_gap box-reduces
+            # them by an integer factor before the bicubic pass like thumbnail does, a drafted JPEG
+            # is already within 2x of target so it resizes as before. Small images take the plain resize
+            small = im.resize(target, reducing_gap=2.0 if large else None) if im.size != target else im
+            # mean of the uint8 pixels, no float copy of the image
+            arr = np.asarray(small)
+            return float(arr.sum(dtype=np.int64) / (arr.size * 255.0))
+    except Exception:
+        return None
 
 def run_illumination_diversity(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     cfg = config or {}
     sample_limit = int(cfg.get("sample_limit", 500))
     downscale = float(cfg.get("downscale", 0.25))
     buckets = {"dark": [], "normal": [], "bright": []}
-    scanned = 0
+    max_workers = cfg.get("max_workers")
 
+    # every existing file up to sample_limit is scanned, so the sample is known up front
+    sampled = []
     for fname, rec in (index or {}).items():
-        if scanned >= sample_limit:
+        if len(sampled) >= sample_limit:
             break
         path = rec.get("abs_path")
         if not path or not os.path.exists(path):
             continue
-        scanned += 1
-        try:
-            with Image.open(path) as im:
-                im = im.convert("L")
-                w,h = im.size
-                small = im.resize((max(1,int(w*downscale)), max(1,int(h*downscale))))
-                arr = np.asarray(small).astype(float)/255.0
-                mean = float(arr.mean())
-                if mean < cfg.get("dark_threshold", 0.35):
-                    buckets["dark"].append({"file": fname, "mean": mean})
-                elif mean > cfg.get("bright_threshold", 0.75):
-                    buckets["bright"].append({"file": fname, "mean": mean})
-                else:
-                    buckets["normal"].append({"file": fname, "mean": mean})
-        except Exception:
+        sampled.append((fname, path))
+    scanned = len(sampled)
+
+    for (fname, _), mean in zip(sampled, map_paths(partial(_luminance, downscale=downscale), [p for _, p in sampled], max_workers)):
+        if mean is None:
             continue
+        if mean < cfg.get("dark_threshold", 0.35):
+            buckets["dark"].append({"file": fname, "mean": mean})
+        elif mean > cfg.get("bright_threshold", 0.75):
+            buckets["bright"].append({"file": fname, "mean": mean})
+        else:
+            buckets["normal"].append({"file": fname, "mean": mean})
 
     total = sum(len(v) for v in buckets.values())
     proportions = {k: (len(v)/total if total>0 else 0.0) for k,v in buckets.items()}
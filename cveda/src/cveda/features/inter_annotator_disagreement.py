@@ -11,10 +11,14 @@ or
 If absent, the module returns a note explaining it's unavailable.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from collections import defaultdict
 import math
 
+import numpy as np
+
+_NUMBER_TYPES = (int, float, np.integer, np.floating)
+
 def _iou(b1, b2):
     x0 = max(b1[0], b2[0])
     y0 = max(b1[1], b2[1])
@@ -28,6 +32,99 @@ def _iou(b1, b2):
     union = a1 + a2 - inter
     return inter/union if union > 0 else 0.0
 
+def _box_rows(anns: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+    """
+    (N, 4) float64 boxes of anns, or None when any box is not four or more
+    finite numbers. Such boxes hit the error and NaN paths of _iou, so their
+    images keep the scalar matching.
+    """
+    rows = []
+    for ann in anns:
+        bbox = ann.get("bbox", [0,0,0,0])
+        try:
+            vals = bbox[:4]
+        except Exception:
+            return None
+        if len(vals) < 4 or not all(isinstance(v, _NUMBER_TYPES) and not isinstance(v, bool) for v in vals):
+            return None
+        rows.append(vals)
+    arr = np.array(rows, dtype=np.float64).reshape(-1, 4)
+    return arr if np.isfinite(arr).all() else None
+
+def _iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    _iou of every row of a against every row of b, shape (len(a), len(b)).
+    The operations run in the same order as the scalar version.
+    """
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        w = np.maximum(0.0, np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0]))
+        h = np.maximum(0.0, np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1]))
+        inter = w * h
+        a1 = np.maximum(0.0, (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1]))
+        a2 = np.maximum(0.0, (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1]))
+        union = a1[:, None] + a2[None, :] - inter
+        return np.where(union > 0, inter / np.where(union > 0, union, 1.0), 0.0)
+
+def _class_rows(codes: np.ndarray) -> Dict[int, np.ndarray]:
+    # row indices of every class code, each in annotation order
+    order = np.argsort(codes, kind="stable")
+    uniq, starts = np.unique(codes[order], return_index=True)
+    return dict(zip(uniq.tolist(), np.split(order, starts[1:])))
+
+def _pair_ious_blocked(boxes_a: np.ndarray, rows_a: Dict[int, np.ndarray],
+                       boxes_b: np.ndarray, rows_b: Dict[int, np.ndarray]) -> List[float]:
+    """
+    Same list as _pair_ious_scalar: best same class IoU of every box of a,
+    then of every box of b. IoU is only computed inside the class blocks both
+    annotators share, boxes of a class the other annotator never drew stay 0.
+    """
+    best_a = np.zeros(boxes_a.shape[0])
+    best_b = np.zeros(boxes_b.shape[0])
+    for code, ia in rows_a.items():
+        ib = rows_b.get(code)
+        if ib is None:
+            continue
+        iou = _iou_matrix(boxes_a[ia], boxes_b[ib])
+        best_a[ia] = iou.max(axis=1)
+        best_b[ib] = iou.max(axis=0)
+    return best_a.tolist() + best_b.tolist()
+
+def _pair_ious_scalar(a: List[Dict[str, Any]], b: List[Dict[str, Any]]) -> List[float]:
+    # for each ann in a, find best matching ann in b of same class
+    ious = []
+    for ann_a in a:
+        cls_a = str(ann_a.get("class", ""))
+        best = 0.0
+        ba = ann_a.get("bbox", [0,0,0,0])
+        for ann_b in b:
+            if str(ann_b.get("class","")) != cls_a:
+                continue
+            bb = ann_b.get("bbox", [0,0,0,0])
+            try:
+                score = _iou(ba, bb)
+            except Exception:
+                score = 0.0
+            if score > best:
+                best = score
+        ious.append(best)
+    # also symmetric: match b->a
+    for ann_b in b:
+        cls_b = str(ann_b.get("class",""))
+        best = 0.0
+        bb = ann_b.get("bbox", [0,0,0,0])
+        for ann_a in a:
+            if str(ann_a.get("class","")) != cls_b:
+                continue
+            ba = ann_a.get("bbox", [0,0,0,0])
+            try:
+                score = _iou(ba, bb)
+            except Exception:
+                score = 0.0
+            if score > best:
+                best = score
+        ious.append(best)
+    return ious
+
 def run_inter_annotator_disagreement(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Compute simple inter-annotator disagreement metrics.
@@ -36,7 +133,8 @@ def run_inter_annotator_disagreement(index: Dict[str, Any], config: Dict[str, An
     --------
     - If no annotator ids are found the function returns a note explaining that computation is unavailable.
     - If annotator ids present, for each image we group annotations by annotator and compute pairwise
-      IoU distributions between annotators for matched classes (greedy match by highest IoU).
+      IoU distributions between annotators for matched classes (each box takes its highest IoU
+      among same class boxes of the other annotator, in both directions).
     - Returns per-image average pairwise IoU, and a small set of images with low agreement.
 
     Parameters
@@ -80,44 +178,23 @@ def run_inter_annotator_disagreement(index: Dict[str, Any], config: Dict[str, An
         found_any = True
         annotators = list(groups.keys())
         pairwise_iou = []
+        # boxes and class codes of every annotator, None when a box needs the scalar path
+        boxes = {k: _box_rows(g) for k, g in groups.items()}
+        vectorized = all(v is not None for v in boxes.values())
+        if vectorized:
+            class_codes: Dict[str, int] = {}
+            class_rows = {k: _class_rows(np.array([class_codes.setdefault(str(ann.get("class", "")), len(class_codes)) for ann in g], dtype=np.int64))
+                          for k, g in groups.items()}
         # compute pairwise IoU between annotators by greedy matching of boxes with same class
         for i in range(len(annotators)):
             for j in range(i+1, len(annotators)):
-                a = groups[annotators[i]]
-                b = groups[annotators[j]]
-                # for each ann in a, find best matching ann in b of same class
-                ious = []
-                for ann_a in a:
-                    cls_a = str(ann_a.get("class", ""))
-                    best = 0.0
-                    ba = ann_a.get("bbox", [0,0,0,0])
-                    for ann_b in b:
-                        if str(ann_b.get("class","")) != cls_a:
-                            continue
-                        bb = ann_b.get("bbox", [0,0,0,0])
-                        try:
-                            score = _iou(ba, bb)
-                        except Exception:
-                            score = 0.0
-                        if score > best:
-                            best = score
-                    ious.append(best)
-                # also symmetric: match b->a
-                for ann_b in b:
-                    cls_b = str(ann_b.get("class",""))
-                    best = 0.0
-                    bb = ann_b.get("bbox", [0,0,0,0])
-                    for ann_a in a:
-                        if str(ann_a.get("class","")) != cls_b:
-                            continue
-                        ba = ann_a.get("bbox", [0,0,0,0])
-                        try:
-                            score = _iou(ba, bb)
-                        except Exception:
-                            score = 0.0
-                        if score > best:
-                            best = score
-                    ious.append(best)
+                a = annotators[i]
+                b = annotators[j]
+                if vectorized:
+                    # best match of each box of a in b, then of each box of b in a
+                    ious = _pair_ious_blocked(boxes[a], class_rows[a], boxes[b], class_rows[b])
+                else:
+                    ious = _pair_ious_scalar(groups[a], groups[b])
                 if ious:
                     pairwise_iou.append(sum(ious)/len(ious))
         if pairwise_iou:
@@ -7,10 +7,23 @@ report divergence between first half and second half of dataset as a proxy for d
 Return per-field changes and example values.
 """
 
-from typing import Dict, Any
-from collections import defaultdict
+from typing import Dict, Any, Callable, List, Optional
+from collections import Counter
+from operator import itemgetter
 import statistics
 
+def _compile_getter(field: str) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """
+    Accessor reading field from a record, parsed once instead of per record.
+    None for fields no record can have, those always report insufficient data.
+    """
+    if field == "width" or field == "height":
+        return lambda rec, k=field: rec.get(k)
+    if field.startswith("meta."):
+        k = field.split(".",1)[1]
+        return lambda rec: rec.get("meta", {}).get(k)
+    return None
+
 def run_metadata_drift(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     cfg = config or {}
     # convert index to list deterministic order
@@ -18,23 +31,29 @@ def run_metadata_drift(index: Dict[str, Any], config: Dict[str, Any] = None) ->
     if not items:
         return {"feature": "metadata_drift", "status": "no_data"}
     half = len(items)//2
-    first = items[:half]
-    second = items[half:]
     fields = cfg.get("fields", ["width", "height", "meta.camera_model"])
     results = {}
-    def _get_field(rec, field):
-        if field == "width":
-            return rec.get("width")
-        if field == "height":
-            return rec.get("height")
-        if field.startswith("meta."):
-            k = field.split(".",1)[1]
-            return rec.get("meta", {}).get(k)
-        return None
 
+    # non None values of every field in the first and second half, read in one pass over the records
+    values: Dict[str, List[List[Any]]] = {}
+    getters = []
     for field in fields:
-        vals1 = [ _get_field(rec, field) for _,rec in first if _get_field(rec, field) is not None ]
-        vals2 = [ _get_field(rec, field) for _,rec in second if _get_field(rec, field) is not None ]
+        if field in values:
+            continue
+        values[field] = [[], []]
+        getter = _compile_getter(field)
+        if getter is not None:
+            getters.append((getter, values[field]))
+    records = list(map(itemgetter(1), items))
+    for part, chunk in enumerate((records[:half], records[half:])):
+        targets = [(getter, halves[part].append) for getter, halves in getters]
+        for rec in chunk:
+            for getter, append in targets:
+                v = getter(rec)
+                if v is not None:
+                    append(v)
+
+    for field, (vals1, vals2) in values.items():
         if not vals1 or not vals2:
             results[field] = {"status": "insufficient_data"}
             continue
@@ -47,7 +66,6 @@ def run_metadata_drift(index: Dict[str, Any], config: Dict[str, Any] = None) ->
             results[field] = {"mean_first": fmean1, "mean_second": fmean2, "pct_change": pct_change}
         except Exception:
             # categorical field, compare top values
-            from collections import Counter
             c1 = Counter(vals1).most_common(3)
             c2 = Counter(vals2).most_common(3)
             results[field] = {"top_first": c1, "top_second": c2}
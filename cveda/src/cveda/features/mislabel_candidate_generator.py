@@ -15,47 +15,82 @@ This is a heuristic scaffold. For production use use embeddings clustering.
 """
 
 from typing import Dict, Any, List
-from collections import defaultdict
-import math
+
+import numpy as np
+
+from cveda.annotations import record_boxes
+
+def _py_max(a, b) -> np.ndarray:
+    # elementwise max(a, b) with Python's rule, b wins only when b > a, so NaN handling matches
+    return np.where(b > a, b, a)
 
 def run_mislabel_candidate_generator(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     cfg = config or {}
     z_thresh = float(cfg.get("z_threshold", 3.0))
     sample_limit = int(cfg.get("sample_limit", 50))
 
-    per_class_metrics = defaultdict(list)
-    # first pass compute area fraction and aspect ratio per class
+    # first pass gathers valid boxes, their image area and class code
+    class_codes: Dict[str, int] = {}
+    codes: List[int] = []
+    rows: List[np.ndarray] = []
+    img_areas: List[float] = []
+    owners: List[str] = []
     for fname, rec in (index or {}).items():
+        anns = rec.get("annotations", []) or []
+        if not anns:
+            continue
+        boxes, valid = record_boxes(rec)
+        valid_anns = anns
+        if not valid.all():
+            # boxes that are not four numbers are skipped
+            valid_anns = [ann for ann, ok in zip(anns, valid.tolist()) if ok]
+            if not valid_anns:
+                continue
+            boxes = boxes[valid]
         w = rec.get("width") or 1
         h = rec.get("height") or 1
-        for ann in (rec.get("annotations", []) or []):
-            cls = str(ann.get("class",""))
-            try:
-                x0,y0,x1,y1 = map(float, ann.get("bbox", [0,0,0,0]))
-            except Exception:
-                continue
-            area_frac = max(0.0, (x1-x0)*(y1-y0) / max(1.0, w*h))
-            ar = (x1-x0) / max(1.0, (y1-y0))
-            per_class_metrics[cls].append({"file": fname, "area_frac": area_frac, "aspect_ratio": ar})
-
-    candidates = []
-    for cls, vals in per_class_metrics.items():
-        areas = [v["area_frac"] for v in vals]
-        ars = [v["aspect_ratio"] for v in vals]
-        if not areas:
-            continue
-        mean_area = sum(areas)/len(areas)
-        var_area = sum((a-mean_area)**2 for a in areas)/len(areas)
-        std_area = math.sqrt(var_area)
-        mean_ar = sum(ars)/len(ars)
-        var_ar = sum((a-mean_ar)**2 for a in ars)/len(ars)
-        std_ar = math.sqrt(var_ar)
-        for v in vals:
-            z_area = (v["area_frac"] - mean_area) / (std_area if std_area>0 else 1e-6)
-            z_ar = (v["aspect_ratio"] - mean_ar) / (std_ar if std_ar>0 else 1e-6)
-            score = max(abs(z_area), abs(z_ar))
-            if score >= z_thresh:
-                candidates.append({"class": cls, "file": v["file"], "z_area": z_area, "z_ar": z_ar, "score": score})
+        img_area = max(1.0, w*h)
+        for ann in valid_anns:
+            cls = ann.get("_class_str") or str(ann.get("class", ""))
+            code = class_codes.get(cls)
+            if code is None:
+                code = class_codes[cls] = len(class_codes)
+            codes.append(code)
+        rows.append(boxes)
+        img_areas.extend([img_area] * len(valid_anns))
+        owners.extend([fname] * len(valid_anns))
+
+    if not codes:
+        return {"feature": "mislabel_candidate_generator", "candidates": [], "status": "ok"}
+
+    b = np.concatenate(rows)
+    code_arr = np.asarray(codes, dtype=np.int64)
+    names = list(class_codes)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        bw = b[:, 2] - b[:, 0]
+        bh = b[:, 3] - b[:, 1]
+        areas = _py_max(0.0, bw * bh / np.asarray(img_areas, dtype=np.float64))
+        ars = bw / _py_max(1.0, bh)
+
+        # per class moments, bincount adds each class in item order like the old
+        # running sums so means and variances are bit identical
+        n = np.bincount(code_arr, minlength=len(names)).astype(np.float64)
+
+        def zscores(x: np.ndarray) -> np.ndarray:
+            mean = np.bincount(code_arr, weights=x, minlength=len(names)) / n
+            dev = x - mean[code_arr]
+            std = np.sqrt(np.bincount(code_arr, weights=dev ** 2, minlength=len(names)) / n)
+            std = np.where(std > 0, std, 1e-6)
+            return dev / std[code_arr]
+
+        z_area = zscores(areas)
+        z_ar = zscores(ars)
+        score = _py_max(np.abs(z_area), np.abs(z_ar))
+    hits = np.flatnonzero(score >= z_thresh)
+    # candidates grouped by class in first seen order, like the per class loop
+    hits = hits[np.argsort(code_arr[hits], kind="stable")]
+    candidates = [{"class": names[code_arr[i]], "file": owners[i], "z_area": float(z_area[i]), "z_ar": float(z_ar[i]), "score": float(score[i])}
+                  for i in hits.tolist()]
     # sort by score descending and return top samples
     candidates_sorted = sorted(candidates, key=lambda x: x["score"], reverse=True)[:sample_limit]
     return {"feature": "mislabel_candidate_generator", "candidates": candidates_sorted, "status": "ok"}
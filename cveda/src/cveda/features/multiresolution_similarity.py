@@ -25,9 +25,11 @@ Return
 }
 """
 
-from typing import Dict, Any
-import os
-from collections import defaultdict
+from typing import Dict, Any, List
+
+import numpy as np
+
+from cveda.annotations import record_boxes
 
 def run_multiresolution_similarity(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     cfg = config or {}
@@ -38,6 +40,9 @@ def run_multiresolution_similarity(index: Dict[str, Any], config: Dict[str, Any]
     scale_stats = {s: {"total": 0, "visible": 0} for s in steps}
     sampled = 0
 
+    # boxes and image area of every sampled annotation, counted in one pass afterwards
+    rows: List[Any] = []
+    img_areas: List[Any] = []
     for fname, rec in (index or {}).items():
         if sampled >= sample_limit:
             break
@@ -45,18 +50,27 @@ def run_multiresolution_similarity(index: Dict[str, Any], config: Dict[str, Any]
         w = rec.get("width", 0) or 1
         h = rec.get("height", 0) or 1
         anns = rec.get("annotations", []) or []
-        for ann in anns:
-            try:
-                x0,y0,x1,y1 = map(float, ann.get("bbox", [0,0,0,0]))
-            except Exception:
-                continue
-            area = max(0.0, (x1-x0)*(y1-y0)) / (w*h)
-            for s in steps:
-                # downscale reduces both image dims so area scales by s^2
-                scaled_area = area * (s*s)
-                scale_stats[s]["total"] += 1
-                if scaled_area >= vis_frac:
-                    scale_stats[s]["visible"] += 1
+        if not anns:
+            continue
+        boxes, valid = record_boxes(rec)
+        # boxes that are not four numbers are skipped
+        arr = boxes if valid.all() else boxes[valid]
+        rows.append(arr)
+        img_areas.append(np.full(arr.shape[0], w*h, dtype=np.float64))
+
+    if rows:
+        boxes = np.concatenate(rows)
+        wh = np.concatenate(img_areas)
+        raw = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        # max(0, raw) of the scalar version, NaN areas count as 0
+        area = np.where(raw > 0.0, raw, 0.0) / wh
+        # downscale reduces both image dims so area scales by s^2
+        scales_sq = np.array([s*s for s in steps], dtype=np.float64)
+        visible = np.count_nonzero(area[:, None] * scales_sq[None, :] >= vis_frac, axis=0)
+        # steps may repeat, every occurrence adds to the same entry like the per step loop did
+        for s, v in zip(steps, visible.tolist()):
+            scale_stats[s]["total"] += boxes.shape[0]
+            scale_stats[s]["visible"] += v
 
     result = {}
     for s, vals in scale_stats.items():
@@ -25,22 +25,25 @@ def run_mutual_exclusion(index: Dict[str, Any], config: Dict[str, Any] = None) -
     cfg = config or {}
     min_support = int(cfg.get("min_support", 5))
 
+    # images are numbered so the per class sets hold small ints instead of file names
     class_images = defaultdict(set)
-    for fname, rec in (index or {}).items():
+    for img_id, rec in enumerate((index or {}).values()):
         classes = set()
         for ann in (rec.get("annotations", []) or []):
-            classes.add(str(ann.get("class","")))
+            classes.add(ann.get("_class_str") or str(ann.get("class","")))
         for c in classes:
-            class_images[c].add(fname)
+            class_images[c].add(img_id)
 
     classes = list(class_images.keys())
+    sizes = [len(class_images[c]) for c in classes]
     rare_pairs = []
-    for a,b in itertools.combinations(classes, 2):
-        imgs_a = class_images.get(a, set())
-        imgs_b = class_images.get(b, set())
-        support = len(imgs_a.union(imgs_b))
-        co = len(imgs_a.intersection(imgs_b))
-        if support >= min_support and co == 0:
-            rare_pairs.append({"pair": (a,b), "cooccurrence": co, "support": support})
+    for i, j in itertools.combinations(range(len(classes)), 2):
+        # disjoint sets have support |A| + |B|, smaller pairs can never qualify
+        support = sizes[i] + sizes[j]
+        if support < min_support:
+            continue
+        # isdisjoint stops at the first shared image instead of building the intersection
+        if class_images[classes[i]].isdisjoint(class_images[classes[j]]):
+            rare_pairs.append({"pair": (classes[i], classes[j]), "cooccurrence": 0, "support": support})
 
     return {"feature": "mutual_exclusion", "rare_pairs": rare_pairs, "status": "ok"}
@@ -12,10 +12,41 @@ Heuristics
 This is indicative only. For high accuracy a trained classifier or statistical tests are needed.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from functools import partial
 from PIL import Image
 import numpy as np
 import os
+from cveda.utils.io_helpers import map_paths
+
+
+# images below this many pixels are always decoded in full, the draft saves
+# little there and moves the statistics the most
+_DRAFT_MIN_PIXELS = 1 << 20
+
+
+def _noise_stats(path: str, downscale: float = 0.25) -> Optional[Tuple[float, float]]:
+    """
+    (variance, extreme pixel ratio) of the downscaled grayscale image, None
+    when it cannot be read. Module level so worker processes can pickle it.
+    """
+    try:
+        with Image.open(path) as im:
+            w,h = im.size
+            target = (max(1,int(w*downscale)), max(1,int(h*downscale)))
+            if w * h >= _DRAFT_MIN_PIXELS and w >= 4 * target[0] and h >= 4 * target[1]:
+                # JPEG decodes luma only, at a DCT scale no smaller than twice target so the
+                # resize still smooths like a full decode would, extreme pixel counts depend on it
+                im.draft("L", (target[0] * 2, target[1] * 2))
+            im = im.convert("L")
+            small = im.resize(target) if im.size != target else im
+            arr = np.asarray(small).astype(np.float32)
+            var = float(np.var(arr))
+            # salt pepper heuristic: many pixels at extremes, e.g., many zeros or 255s
+            extreme_ratio = float(((arr<=1).sum() + (arr>=254).sum())) / arr.size
+            return var, extreme_ratio
+    except Exception:
+        return None
 
 def run_noise_type_classifier(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     cfg = config or {}
@@ -24,34 +55,31 @@ def run_noise_type_classifier(index: Dict[str, Any], config: Dict[str, Any] = No
     results = {"gaussian_like": 0, "saltpepper_like": 0, "unknown": 0}
     examples = []
 
-    processed = 0
+    max_workers = cfg.get("max_workers")
+
+    # every existing file up to sample_limit is processed, so the sample is known up front
+    sampled = []
     for fname, rec in (index or {}).items():
-        if processed >= sample_limit:
+        if len(sampled) >= sample_limit:
             break
         path = rec.get("abs_path")
         if not path or not os.path.exists(path):
             continue
-        processed += 1
-        try:
-            with Image.open(path) as im:
-                im = im.convert("L")
-                w,h = im.size
-                small = im.resize((max(1,int(w*downscale)), max(1,int(h*downscale))))
-                arr = np.asarray(small).astype(np.float32)
-                var = float(np.var(arr))
-                p01 = np.percentile(arr, 1)
-                p99 = np.percentile(arr, 99)
-                # salt pepper heuristic: many pixels at extremes, e.g., many zeros or 255s
-                extreme_ratio = float(((arr<=1).sum() + (arr>=254).sum())) / arr.size
-                if extreme_ratio > 0.01:
-                    results["saltpepper_like"] += 1
-                    examples.append({"file": fname, "type": "saltpepper", "extreme_ratio": extreme_ratio, "var": var})
-                elif var > cfg.get("var_threshold", 500.0):
-                    results["gaussian_like"] += 1
-                    examples.append({"file": fname, "type": "gaussian_like", "extreme_ratio": extreme_ratio, "var": var})
-                else:
-                    results["unknown"] += 1
-        except Exception:
+        sampled.append((fname, path))
+    processed = len(sampled)
+
+    for (fname, _), stats in zip(sampled, map_paths(partial(_noise_stats, downscale=downscale), [p for _, p in sampled], max_workers)):
+        if stats is None:
+            results["unknown"] += 1
+            continue
+        var, extreme_ratio = stats
+        if extreme_ratio > 0.01:
+            results["saltpepper_like"] += 1
+            examples.append({"file": fname, "type": "saltpepper", "extreme_ratio": extreme_ratio, "var": var})
+        elif var > cfg.get("var_threshold", 500.0):
+            results["gaussian_like"] += 1
+            examples.append({"file": fname, "type": "gaussian_like", "extreme_ratio": extreme_ratio, "var": var})
+        else:
             results["unknown"] += 1
 
     return {"feature": "noise_type_classifier", "processed": processed, "counts": results, "examples": examples[:cfg.get("sample_limit",20)], "status": "ok"}
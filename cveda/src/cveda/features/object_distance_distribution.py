@@ -9,6 +9,44 @@ from typing import Dict, Any, List
 import math
 from collections import defaultdict
 
+import numpy as np
+try:
+    from scipy.spatial import cKDTree
+    _SCIPY_AVAILABLE = True
+except Exception:
+    _SCIPY_AVAILABLE = False
+
+# centers per image from which a KD tree beats the dense distance matrix
+_KDTREE_MIN_POINTS = 64
+# query rows per block of the dense distance matrix
+_BLOCK_ROWS = 1024
+
+def _nn_distances(centers: np.ndarray) -> np.ndarray:
+    """
+    Distance from every center to its nearest other center.
+
+    Uses a scipy KD tree for larger finite sets, otherwise a dense distance
+    matrix in row blocks. NaN distances count as infinitely far, as they never
+    won the old scalar comparison.
+    """
+    n = centers.shape[0]
+    if _SCIPY_AVAILABLE and n >= _KDTREE_MIN_POINTS and np.isfinite(centers).all():
+        # k=2 because the closest hit of every point is the point itself
+        dists, _ = cKDTree(centers).query(centers, k=2)
+        return dists[:, 1]
+    out = np.empty(n, dtype=np.float64)
+    for lo in range(0, n, _BLOCK_ROWS):
+        block = centers[lo:lo + _BLOCK_ROWS]
+        dx = block[:, None, 0] - centers[None, :, 0]
+        dy = block[:, None, 1] - centers[None, :, 1]
+        # squared distances keep the same order, the root is taken once per row
+        d2 = dx * dx + dy * dy
+        d2[np.isnan(d2)] = np.inf
+        rows = np.arange(block.shape[0])
+        d2[rows, rows + lo] = np.inf
+        out[lo:lo + block.shape[0]] = d2.min(axis=1)
+    return np.sqrt(out)
+
 def run_object_distance_distribution(index: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     config:
@@ -28,25 +66,26 @@ def run_object_distance_distribution(index: Dict[str, Any], config: Dict[str, An
 
     for fname, rec in (index or {}).items():
         anns = (rec.get("annotations", []) or [])
-        centers = []
-        for ann in anns:
-            bbox = ann.get("bbox", [0,0,0,0])
-            try:
-                x0,y0,x1,y1 = map(float, bbox)
-            except Exception:
-                continue
-            cx = 0.5*(x0+x1); cy = 0.5*(y0+y1)
-            centers.append((cx,cy))
-        if len(centers) < 2:
+        pre = rec.get("_boxes")
+        if pre is not None and pre.shape[0] == len(anns):
+            # preparsed by the loader
+            boxes = pre
+        else:
+            rows = []
+            for ann in anns:
+                bbox = ann.get("bbox", [0,0,0,0])
+                try:
+                    x0,y0,x1,y1 = map(float, bbox)
+                except Exception:
+                    continue
+                rows.append((x0,y0,x1,y1))
+            boxes = np.array(rows, dtype=np.float64).reshape(-1, 4)
+        if boxes.shape[0] < 2:
             continue
-        # compute nearest neighbor distance for each center
-        for i,c in enumerate(centers):
-            min_d = float('inf')
-            for j,other in enumerate(centers):
-                if i==j: continue
-                d = math.hypot(c[0]-other[0], c[1]-other[1])
-                if d < min_d: min_d = d
-            nn_distances.append(min_d)
+        centers = np.stack((0.5*(boxes[:, 0]+boxes[:, 2]), 0.5*(boxes[:, 1]+boxes[:, 3])), axis=1)
+        # nearest neighbor distance for each center
+        with np.errstate(invalid="ignore", over="ignore"):
+            nn_distances.extend(_nn_distances(centers).tolist())
         # detect tight cluster: mean nn distance small relative to image diag
         mean_nn = sum(nn_distances[-len(centers):])/len(centers)
         w = rec.get("width") or 0; h = rec.get("height") or 0
@@ -8,7 +8,7 @@ detection or for building a duplicate free sample.
 """
 
 from typing import Dict, List, Tuple, Optional
-from .hashing import phash_image
+from .hashing import phash_images
 import os
 import logging
 
@@ -21,11 +21,9 @@ def find_duplicates(paths: List[str], threshold: int = 8) -> List[Tuple[str, str
 
     Returns list of tuples (path_a path_b hamming)
     """
+    existing = [p for p in paths if p and os.path.exists(p)]
     hashes = {}
-    for p in paths:
-        if not p or not os.path.exists(p):
-            continue
-        h = phash_image(p)
+    for p, h in zip(existing, phash_images(existing)):
         if h:
             hashes[p] = h
     items = list(hashes.items())
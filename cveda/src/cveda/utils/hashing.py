@@ -6,9 +6,20 @@ a simple average hash if not present.
 
 The functions are designed to compute a compact hash that can be compared
 with hamming distance for fast duplicate detection.
+
+Batch hashing keeps a persistent SQLite cache keyed by path, mtime and size
+so reruns only decode images that changed. The cache lives in
+$XDG_CACHE_HOME/cveda/phash.db, ~/.cache/cveda/phash.db when that is unset.
+The CVEDA_PHASH_CACHE environment variable overrides it: a file path moves
+the cache, "0", "off" or "false" disables it.
 """
 
-from typing import Optional
+from typing import Optional, List, Sequence, Tuple, Dict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import os
+import sqlite3
+import logging
 try:
     import imagehash
     from PIL import Image
@@ -17,6 +28,32 @@ except Exception:
     _IMAGEHASH_AVAILABLE = False
     from PIL import Image
 
+logger = logging.getLogger(__name__)
+
+_CACHE_ENV = "CVEDA_PHASH_CACHE"
+_CACHE_OFF = frozenset(("0", "off", "false", "no"))
+# cached rows are written in batches to keep commits and fsyncs rare
+_CACHE_WRITE_BATCH = 100
+
+
+def default_cache_path() -> Path:
+    """
+    Cache file used when no path is given, read from the environment on every
+    call so changes after import are honoured.
+    """
+    env = os.environ.get(_CACHE_ENV, "").strip()
+    if env and env.lower() not in _CACHE_OFF:
+        return Path(env).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "cveda" / "phash.db"
+
+
+def cache_enabled() -> bool:
+    """
+    False when CVEDA_PHASH_CACHE turns the on disk cache off.
+    """
+    return os.environ.get(_CACHE_ENV, "").strip().lower() not in _CACHE_OFF
+
 
 def phash_image(path: str, hash_size: int = 8) -> Optional[str]:
     """
@@ -43,3 +80,156 @@ def phash_image(path: str, hash_size: int = 8) -> Optional[str]:
             return hexstr
     except Exception:
         return None
+
+
+class PHashCache:
+    """
+    Persistent hash cache stored in SQLite.
+
+    Rows are keyed by absolute path, st_mtime_ns, st_size and the hashing
+    method, a stale row is simply never matched again and gets replaced.
+    """
+
+    def __init__(self, path: Optional[str] = None, batch_size: int = _CACHE_WRITE_BATCH):
+        self.path = Path(path) if path else default_cache_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._pending: List[Tuple[str, int, int, str, str]] = []
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS phash (path TEXT, method TEXT, mtime_ns INTEGER, size INTEGER, hash TEXT, PRIMARY KEY (path, method))"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[Tuple[str, int, int]], method: str) -> Dict[str, str]:
+        """
+        Return path to hash for the keys whose stored mtime and size still match.
+        """
+        wanted = {p: (m, sz) for p, m, sz in keys}
+        found = {}
+        paths = list(wanted)
+        # stay below the sqlite host parameter limit
+        step = 500
+        for start in range(0, len(paths), step):
+            chunk = paths[start:start + step]
+            q = "SELECT path, mtime_ns, size, hash FROM phash WHERE method = ? AND path IN (%s)" % ",".join("?" * len(chunk))
+            for p, m, sz, h in self._conn.execute(q, [method] + chunk):
+                if wanted.get(p) == (m, sz):
+                    found[p] = h
+        return found
+
+    def put(self, key: Tuple[str, int, int], method: str, value: str) -> None:
+        p, m, sz = key
+        self._pending.append((p, method, m, sz, value))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        self._conn.executemany("INSERT OR REPLACE INTO phash (path, method, mtime_ns, size, hash) VALUES (?, ?, ?, ?, ?)", self._pending)
+        self._conn.commit()
+        self._pending = []
+
+    def discard(self) -> None:
+        """
+        Drop unwritten rows and close, used after a failed write.
+        """
+        self._pending = []
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._conn.close()
+
+
+def _stat_key(path: str) -> Optional[Tuple[str, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+def _hash_method(hash_size: int) -> str:
+    return f"{'phash' if _IMAGEHASH_AVAILABLE else 'ahash'}:{hash_size}"
+
+
+def phash_images(paths: Sequence[str], max_workers: Optional[int] = None, min_n: int = 64, chunksize: int = 64, use_cache: Optional[bool] = None, cache_path: Optional[str] = None) -> List[Optional[str]]:
+    """
+    Compute perceptual hashes for many images, in worker processes when there
+    are enough of them to amortize pool start up.
+
+    Parameters
+    paths sequence of absolute image paths
+    max_workers int process count, None lets the executor decide
+    min_n int below this many paths hashing runs serially
+    chunksize int paths sent to a worker per task
+    use_cache bool reuse and store hashes in the on disk cache, None follows
+    CVEDA_PHASH_CACHE and defaults to on
+    cache_path str cache file, default from default_cache_path
+
+    Returns list of hex strings or None, parallel to paths.
+    """
+    paths = list(paths)
+    out: List[Optional[str]] = [None] * len(paths)
+    cache = None
+    keys: List[Optional[Tuple[str, int, int]]] = [None] * len(paths)
+    todo = list(range(len(paths)))
+    method = _hash_method(8)
+    if use_cache is None:
+        use_cache = cache_enabled()
+    if use_cache and paths:
+        try:
+            cache = PHashCache(cache_path)
+            keys = [_stat_key(p) for p in paths]
+            hits = cache.get_many([k for k in keys if k is not None], method)
+            todo = []
+            for i, k in enumerate(keys):
+                h = hits.get(k[0]) if k is not None else None
+                if h is not None:
+                    out[i] = h
+                else:
+                    todo.append(i)
+        except Exception as e:
+            logger.warning("phash cache unavailable, hashing without it: %s", e)
+            cache = None
+            todo = list(range(len(paths)))
+
+    try:
+        for i, h in zip(todo, _phash_iter([paths[i] for i in todo], max_workers, min_n, chunksize)):
+            out[i] = h
+            if cache is not None and h is not None and keys[i] is not None:
+                try:
+                    cache.put(keys[i], method, h)
+                except Exception as e:
+                    # a locked or full cache only costs the cache, hashing goes on
+                    logger.warning("phash cache write failed, continuing without it: %s", e)
+                    cache.discard()
+                    cache = None
+    finally:
+        if cache is not None:
+            try:
+                cache.close()
+            except Exception as e:
+                logger.warning("failed to write phash cache: %s", e)
+    return out
+
+
+def _phash_iter(paths: List[str], max_workers: Optional[int], min_n: int, chunksize: int):
+    if len(paths) < min_n or max_workers == 1:
+        for p in paths:
+            yield phash_image(p)
+        return
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as ex:
+            results = list(ex.map(phash_image, paths, chunksize=chunksize))
+    except Exception as e:
+        logger.warning("parallel phash failed, hashing serially: %s", e)
+        results = [phash_image(p) for p in paths]
+    yield from results
@@ -3,11 +3,27 @@ I O helpers for images.
 
 Provide a safe get_image_size function that tries PIL and falls back on binary header sniffing.
 Caching can be added by callers to avoid repeated disk IO.
+
+The feature modules that scan image files share path_exists, a directory
+listing backed existence test, and map_paths, which maps a per file function
+over paths serially, in threads or in worker processes depending on the
+number of files.
 """
 
-from typing import Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+import logging
+import multiprocessing
+import os
 from PIL import Image, UnidentifiedImageError
 
+logger = logging.getLogger(__name__)
+
+# below this many files paths are mapped serially, below _POOL_MIN_FILES in threads
+_THREAD_MIN_FILES = 4
+_POOL_MIN_FILES = 64
+
 
 def get_image_size_safe(path: str) -> Tuple[Optional[int], Optional[int]]:
     """
@@ -22,3 +38,68 @@ def get_image_size_safe(path: str) -> Tuple[Optional[int], Optional[int]]:
             return im.width, im.height
     except (UnidentifiedImageError, OSError):
         return None, None
+
+
+def path_exists(path: str, listings: Dict[str, frozenset]) -> bool:
+    """
+    os.path.exists answered from one os.scandir listing per directory. Names
+    not in the listing are confirmed with a stat, so unlistable directories
+    and case insensitive filesystems still give the right answer.
+
+    listings is owned by the caller and filled on first sight of a directory.
+    """
+    folder, name = os.path.split(path)
+    names = listings.get(folder)
+    if names is None:
+        try:
+            with os.scandir(folder or ".") as it:
+                # DirEntry.is_file uses the type from the listing, no stat per entry
+                names = frozenset(e.name for e in it if e.is_file())
+        except OSError:
+            names = frozenset()
+        listings[folder] = names
+    return name in names or os.path.exists(path)
+
+
+@contextmanager
+def path_pool(n_files: int, max_workers: Optional[int] = None) -> Iterator[Optional[Executor]]:
+    """
+    Executor for scanning n_files image files, None when a serial loop is
+    cheaper.
+
+    Small scans run in threads, which still overlap file reads with decoding
+    since PIL releases the GIL while decoding. Larger scans use worker
+    processes, except when this process is itself a pool worker (the audit
+    runs features in one), where nested process pools would multiply the
+    process count, so threads are used there too.
+    """
+    if n_files < _THREAD_MIN_FILES or max_workers == 1:
+        yield None
+    elif n_files < _POOL_MIN_FILES or multiprocessing.parent_process() is not None:
+        with ThreadPoolExecutor(max_workers=min(n_files, (os.cpu_count() or 1) * 2)) as ex:
+            yield ex
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as ex:
+            yield ex
+
+
+def map_paths(func: Callable[[str], Any], paths: List[str], max_workers: Optional[int] = None,
+              executor: Optional[Executor] = None) -> List[Any]:
+    """
+    [func(p) for p in paths], run on executor or, when none is given, on a
+    path_pool sized for paths.
+
+    func must be module level (or a partial of one) so worker processes can
+    pickle it. If the pool fails the paths are mapped serially instead.
+    """
+    if executor is None:
+        with path_pool(len(paths), max_workers) as ex:
+            if ex is None:
+                return [func(p) for p in paths]
+            return map_paths(func, paths, max_workers, ex)
+    try:
+        chunksize = 16 if isinstance(executor, ProcessPoolExecutor) else 1
+        return list(executor.map(func, paths, chunksize=chunksize))
+    except Exception as e:
+        logger.warning("parallel scan of %d files failed, running serially: %s", len(paths), e)
+        return [func(p) for p in paths]
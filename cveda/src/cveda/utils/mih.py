@@ -0,0 +1,120 @@
+"""
+Multi index hashing for near duplicate search on 64 bit hashes.
+
+Each hash is split into m chunks of 16 bits. If two hashes are within
+Hamming distance t then by pigeonhole at least one chunk differs in at most
+t // m bits, so a candidate must be found by probing every chunk table with
+the query chunk xor all masks of at most t // m bits. Candidates are then
+verified on the full 64 bits. This finds every pair, no sampling is needed.
+
+Chunk tables are sorted arrays searched with searchsorted, so probing is
+vectorized over all queries at once.
+"""
+
+from itertools import combinations
+from typing import List, Tuple
+
+import numpy as np
+
+_CHUNK_BITS = 16
+_N_CHUNKS = 64 // _CHUNK_BITS
+_CHUNK_MASK = np.uint64((1 << _CHUNK_BITS) - 1)
+
+# above this many probe masks per chunk brute force blocks are cheaper
+_MAX_PROBE_MASKS = 4096
+
+# byte popcount table for numpy builds without bitwise_count
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount64(x: np.ndarray) -> np.ndarray:
+    """
+    Number of set bits of every element of a uint64 array.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x)
+    return _POPCOUNT8[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def _probe_masks(radius: int) -> np.ndarray:
+    masks = [0]
+    for r in range(1, radius + 1):
+        for bits in combinations(range(_CHUNK_BITS), r):
+            m = 0
+            for b in bits:
+                m |= 1 << b
+            masks.append(m)
+    return np.array(masks, dtype=np.uint64)
+
+
+def _n_probe_masks(radius: int) -> int:
+    from math import comb
+    return sum(comb(_CHUNK_BITS, r) for r in range(min(radius, _CHUNK_BITS) + 1))
+
+
+def _brute_force(a: np.ndarray, b: np.ndarray, threshold: int, block_pairs: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rows = max(1, block_pairs // max(1, b.shape[0]))
+    out_i: List[np.ndarray] = []
+    out_j: List[np.ndarray] = []
+    out_d: List[np.ndarray] = []
+    for start in range(0, a.shape[0], rows):
+        dist = popcount64(a[start:start + rows, None] ^ b[None, :])
+        ii, jj = np.nonzero(dist <= threshold)
+        out_i.append(ii + start)
+        out_j.append(jj)
+        out_d.append(dist[ii, jj])
+    return np.concatenate(out_i), np.concatenate(out_j), np.concatenate(out_d).astype(np.int64)
+
+
+def hamming_pairs(a: np.ndarray, b: np.ndarray, threshold: int, block_pairs: int = 1 << 20) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Find all pairs (i j) with popcount(a[i] xor b[j]) <= threshold.
+
+    Parameters
+    a b uint64 arrays of hashes
+    threshold int maximum Hamming distance
+    block_pairs int size of the dense blocks used when the threshold is too
+    large for index probing to pay off
+
+    Returns
+    (i j dist n_verified) where i j dist are arrays ordered by i then j and
+    n_verified is the number of full distance computations performed.
+    """
+    empty = np.zeros(0, dtype=np.int64)
+    if a.shape[0] == 0 or b.shape[0] == 0 or threshold < 0:
+        return empty, empty, empty, 0
+    radius = threshold // _N_CHUNKS
+    if _n_probe_masks(radius) > _MAX_PROBE_MASKS:
+        ii, jj, dd = _brute_force(a, b, threshold, block_pairs)
+        return ii, jj, dd, int(a.shape[0]) * int(b.shape[0])
+
+    masks = _probe_masks(radius)
+    nb = b.shape[0]
+    keys: List[np.ndarray] = []
+    for k in range(_N_CHUNKS):
+        shift = np.uint64(k * _CHUNK_BITS)
+        ka = (a >> shift) & _CHUNK_MASK
+        order = np.argsort(ka, kind="stable")
+        sorted_ka = ka[order]
+        kb = (b >> shift) & _CHUNK_MASK
+        for m in masks:
+            probe = kb ^ m
+            lo = np.searchsorted(sorted_ka, probe, side="left")
+            hi = np.searchsorted(sorted_ka, probe, side="right")
+            counts = hi - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            qj = np.repeat(np.arange(nb), counts)
+            starts = np.cumsum(counts) - counts
+            pos = np.repeat(lo, counts) + (np.arange(total) - np.repeat(starts, counts))
+            keys.append(order[pos].astype(np.int64) * nb + qj)
+    if not keys:
+        return empty, empty, empty, 0
+    # the same pair can be found through several chunks, unique also sorts by i then j
+    cand = np.unique(np.concatenate(keys))
+    ci = cand // nb
+    cj = cand % nb
+    dist = popcount64(a[ci] ^ b[cj]).astype(np.int64)
+    keep = dist <= threshold
+    return ci[keep], cj[keep], dist[keep], int(cand.shape[0])
@@ -1,4 +1,5 @@
 import tempfile
+import pytest
 from pathlib import Path
 from PIL import Image
 from cveda.data_io import ImageCollectionLoader
@@ -25,3 +26,141 @@ def test_clamp_and_swap():
     inverted = [50, 60, 10, 20]
     fixed = swap_inverted_bbox(inverted)
     assert fixed[0] <= fixed[2] and fixed[1] <= fixed[3]
+
+def test_clamp_batched_matches_scalar():
+    import numpy as np
+    from cveda.annotations import clamp_bboxes_to_image
+    nan = float("nan")
+    boxes = [[-10, -5, 200, 300], [10, 20, 30, 40], [150, 150, 160, 160], [nan, 1, nan, 5]]
+    arr = np.array(boxes, dtype=float)
+    batched = clamp_bboxes_to_image(arr, 100, 100)
+    expected = [clamp_bbox_to_image(b, 100, 100) for b in boxes]
+    assert batched.tolist() == [[float(v) for v in b] for b in expected]
+    # NaN coordinates clamp to 0 like the scalar helper, and the input is left untouched
+    assert expected[3] == [0.0, 1, 0.0, 5]
+    assert np.array_equal(arr, np.array(boxes, dtype=float), equal_nan=True)
+
+def test_swap_batched_matches_scalar():
+    import numpy as np
+    from cveda.annotations import swap_inverted_bboxes
+    boxes = [[50, 60, 10, 20], [1, 2, 3, 4], [5, 1, 2, 9]]
+    batched = swap_inverted_bboxes(np.array(boxes, dtype=float))
+    assert batched.tolist() == [[float(v) for v in swap_inverted_bbox(b)] for b in boxes]
+
+def test_record_boxes_marks_unparsable_rows():
+    import numpy as np
+    from cveda.annotations import record_boxes
+    rec = {"annotations": [{"bbox": [1, 2, 3, 4]}, {"bbox": [1, 2]}, {"bbox": ["nan", 0, 1, 1]}, {}]}
+    boxes, valid = record_boxes(rec)
+    assert valid.tolist() == [True, False, True, True]
+    assert boxes[0].tolist() == [1.0, 2.0, 3.0, 4.0] and boxes[3].tolist() == [0.0, 0.0, 0.0, 0.0]
+    assert np.isnan(boxes[1]).all() and np.isnan(boxes[2, 0])
+    # preparsed loader boxes are used when they cover every annotation
+    rec["_boxes"] = np.zeros((4, 4))
+    boxes, valid = record_boxes(rec)
+    assert boxes is rec["_boxes"] and valid.all()
+
+def test_loader_first_annotation_source_wins(tmp_path):
+    (tmp_path / "images").mkdir()
+    (tmp_path / "labels").mkdir()
+    create_image(tmp_path / "images" / "dog.jpg", size=(100, 80))
+    # a same stem file next to the image comes before the labels folder
+    (tmp_path / "images" / "dog.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+    (tmp_path / "labels" / "dog.txt").write_text("1 0.25 0.25 0.1 0.1\n1 0.75 0.75 0.1 0.1\n")
+    # only the labels folder, reached both as folder and as file, is read once
+    create_image(tmp_path / "images" / "cat.jpg", size=(100, 80))
+    (tmp_path / "labels" / "cat.txt").write_text("1 0.25 0.25 0.1 0.1\n1 0.75 0.75 0.1 0.1\n")
+    index = ImageCollectionLoader(str(tmp_path)).build_index()
+    dog = index["images/dog.jpg"]["annotations"]
+    assert [(a["class"], a["bbox"]) for a in dog] == [("0", [40.0, 32.0, 60.0, 48.0])]
+    assert len(index["images/cat.jpg"]["annotations"]) == 2
+
+def test_loader_skips_yolo_when_image_size_unknown(tmp_path):
+    (tmp_path / "images").mkdir()
+    (tmp_path / "labels").mkdir()
+    (tmp_path / "images" / "bad.jpg").write_bytes(b"not an image")
+    (tmp_path / "labels" / "bad.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+    rec = ImageCollectionLoader(str(tmp_path)).build_index()["images/bad.jpg"]
+    # relative YOLO boxes cannot be converted without a size, they are skipped without an error
+    assert rec["width"] is None and rec["annotations"] == []
+    assert "errors" not in rec["meta"]
+    assert rec["_boxes"].shape == (0, 4)
+
+def test_list_image_files_scans_like_rglob(tmp_path):
+    import os
+    d = tmp_path / "data"
+    (d / "b" / "deep").mkdir(parents=True)
+    (d / "a").mkdir()
+    (d / "dir.jpg").mkdir()
+    for rel in ["z.JPG", "a/x.png", "b/y.tiff", "b/deep/w.jpeg", "a/notes.txt"]:
+        (d / rel).write_bytes(b"")
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "o.jpg").write_bytes(b"")
+    os.symlink(outside, d / "link", target_is_directory=True)
+    loader = ImageCollectionLoader(str(d), recursive=True)
+    got = [p.relative_to(d).as_posix() for p in loader._list_image_files()]
+    # symlinked folders are not descended into and folders named like images are skipped
+    assert got == ["a/x.png", "b/deep/w.jpeg", "b/y.tiff", "z.JPG"]
+    flat = ImageCollectionLoader(str(d), recursive=False)
+    assert [p.name for p in flat._list_image_files()] == ["z.JPG"]
+
+_VOC_XML = """<annotation>
+  <filename>street.jpg</filename>
+  <size><width>640</width><height>480</height><depth>3</depth></size>
+  <object>
+    <name>person</name>
+    <bndbox><xmin>10</xmin><ymin>20</ymin><xmax>110.5</xmax><ymax>220</ymax></bndbox>
+    <part><name>head</name><bndbox><xmin>1</xmin><ymin>2</ymin><xmax>3</xmax><ymax>4</ymax></bndbox></part>
+  </object>
+  <object><name>nobox</name></object>
+  <object><name>bad</name><bndbox><xmin>a</xmin><ymin>0</ymin><xmax>1</xmax><ymax>1</ymax></bndbox></object>
+  <object><name>car</name><bndbox><xmin>0</xmin><ymin>0</ymin><xmax>5</xmax><ymax>6</ymax></bndbox></object>
+</annotation>
+"""
+
+def _check_voc_parser(tmp_path):
+    loader = ImageCollectionLoader(str(tmp_path), recursive=False)
+    xml = tmp_path / "street.xml"
+    xml.write_text(_VOC_XML)
+    rec = loader._load_voc_xml_file(xml)
+    assert (rec["file_name"], rec["width"], rec["height"]) == ("street.jpg", 640, 480)
+    # nested part elements are not objects, objects without a numeric box are dropped
+    assert [(a["name"], a["bbox"]) for a in rec["annotations"]] == [
+        ("person", [10.0, 20.0, 110.5, 220.0]),
+        ("car", [0.0, 0.0, 5.0, 6.0]),
+    ]
+    bare = tmp_path / "bare.xml"
+    bare.write_text("<annotation><object><name>c</name></object></annotation>")
+    assert loader._load_voc_xml_file(bare) == {"file_name": "bare", "width": None, "height": None, "annotations": []}
+    broken = tmp_path / "broken.xml"
+    broken.write_text("<annotation><object>")
+    assert loader._load_voc_xml_file(broken) is None
+
+def test_voc_iterparse_stdlib(tmp_path, monkeypatch):
+    import xml.etree.ElementTree as ET
+    from cveda import data_io
+    monkeypatch.setattr(data_io, "_XML", ET)
+    monkeypatch.setattr(data_io, "_XML_PARSE_ERRORS", (ET.ParseError,))
+    _check_voc_parser(tmp_path)
+
+def test_voc_iterparse_lxml(tmp_path):
+    pytest.importorskip("lxml")
+    _check_voc_parser(tmp_path)
+
+def test_voc_iterparse_lxml_does_not_expand_entities(tmp_path, monkeypatch):
+    from cveda import data_io
+    calls = []
+
+    class _FakeLxml:
+        @staticmethod
+        def iterparse(path, **kwargs):
+            calls.append(kwargs)
+            import xml.etree.ElementTree as ET
+            return ET.iterparse(path, events=kwargs["events"])
+    monkeypatch.setattr(data_io, "_XML", _FakeLxml)
+    xml = tmp_path / "a.xml"
+    xml.write_text(_VOC_XML)
+    rec = ImageCollectionLoader(str(tmp_path), recursive=False)._load_voc_xml_file(xml)
+    assert len(rec["annotations"]) == 2
+    assert calls[0]["resolve_entities"] is False and calls[0]["no_network"] is True
@@ -23,3 +23,153 @@ def test_cveda_runs_minimal():
     assert "index" in res
     assert "features" in res
     assert "checks" in res
+
+def test_cache_round_trip_with_empty_arrays(tmp_path):
+    import numpy as np
+    from cveda.api import _cache_save, _cache_load
+    payloads = {
+        "empty": {"a": np.zeros((0, 4))},
+        "mixed": {"a": np.zeros((0, 4)), "b": np.arange(12, dtype=np.float64).reshape(3, 4), "n": 3},
+        "plain": {"status": "ok", "values": [1, 2.5, "x"]},
+    }
+    for key, payload in payloads.items():
+        _cache_save(tmp_path, key, payload)
+        loaded = _cache_load(tmp_path, key)
+        assert loaded is not None, key
+        assert loaded.keys() == payload.keys()
+        for k, v in payload.items():
+            if isinstance(v, np.ndarray):
+                assert loaded[k].shape == v.shape and loaded[k].dtype == v.dtype
+                assert np.array_equal(loaded[k], v)
+                # restored arrays stay writable
+                loaded[k][...] = 0
+            else:
+                assert loaded[k] == v
+
+def test_slow_future_times_out_alone():
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from cveda.api import _run_with_deadlines
+    with ThreadPoolExecutor(2) as ex:
+        futures, timed_out = _run_with_deadlines(lambda k: ex.submit(time.sleep, [0.05, 2.0][k]), 2, 2, 0.5)
+        assert timed_out == {1}
+        assert futures[0].done()
+
+def test_feature_queued_behind_slow_one_is_not_charged_for_the_wait():
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    from cveda.api import _run_with_deadlines
+    # one worker, the quick jobs start only after the slow one, each well inside its own timeout
+    with ProcessPoolExecutor(1) as ex:
+        ex.submit(abs, 0).result()
+        futures, timed_out = _run_with_deadlines(lambda k: ex.submit(time.sleep, [0.8, 0.5, 0.5][k]), 3, 1, 1.0)
+    assert timed_out == set()
+    assert all(f.done() for f in futures.values())
+
+def test_jobs_behind_stuck_workers_are_reported_timed_out():
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from cveda.api import _run_with_deadlines
+    with ThreadPoolExecutor(1) as ex:
+        futures, timed_out = _run_with_deadlines(lambda k: ex.submit(time.sleep, [1.0, 0.01][k]), 2, 1, 0.3)
+    assert timed_out == {0, 1}
+    assert list(futures) == [0]
+
+def test_error_results_are_not_cached(tmp_path, monkeypatch):
+    c = CVEDA(FakeLoader())
+    mod = c._feature_modules["geographic_clustering"]
+    cfg = {"features_parallel": False, "cache_dir": str(tmp_path), "features_to_run": ["geographic_clustering"]}
+    with monkeypatch.context() as m:
+        m.setattr(mod, "run_geographic_clustering", lambda index, config: {"status": "error", "error": "boom"})
+        res = c.run_audit(out_pdf=None, config=cfg)
+    assert res["features"]["geographic_clustering"]["status"] == "error"
+    assert not list(tmp_path.iterdir())
+    # the next run recomputes instead of serving the error
+    res = c.run_audit(out_pdf=None, config=cfg)
+    assert res["features"]["geographic_clustering"]["status"] != "error"
+
+def run_sleepy(index, config):
+    import time
+    time.sleep(config.get("seconds", 0))
+    return {"feature": "sleepy", "status": "ok"}
+
+def test_timed_out_feature_discards_the_pool(tmp_path):
+    import sys
+    import cveda.api as api
+    c = CVEDA(FakeLoader())
+    c._feature_modules = {"sleepy": sys.modules[__name__]}
+    cfg = {"cache_dir": str(tmp_path), "feature_timeout": 1, "max_workers": 1, "features": {"sleepy": {"seconds": 30}}}
+    res = c.run_audit(out_pdf=None, config=cfg)
+    assert res["features"]["sleepy"] == {"status": "error", "error": "timeout"}
+    assert api._POOL is None
+    # the next audit gets a fresh worker instead of queueing behind the stuck one
+    cfg["features"]["sleepy"]["seconds"] = 0
+    res = c.run_audit(out_pdf=None, config=cfg)
+    assert res["features"]["sleepy"]["status"] == "ok"
+    c.close()
+
+def test_keep_raw_is_threaded_through(tmp_path, monkeypatch):
+    import sys
+    from cveda.cli import parse_args
+    assert CVEDA(str(tmp_path)).loader.keep_raw is False
+    assert CVEDA(str(tmp_path), keep_raw=True).loader.keep_raw is True
+    monkeypatch.setattr(sys, "argv", ["cveda", str(tmp_path), "--keep-raw"])
+    assert parse_args().keep_raw is True
+
+def test_fingerprint_follows_in_place_edits():
+    from cveda.api import _index_fingerprint
+    index = FakeLoader().build_index()
+    before = _index_fingerprint(index)
+    index["img1.jpg"]["width"] = 256
+    assert _index_fingerprint(index) != before
+    index["img1.jpg"] = dict(index["img1.jpg"], abs_path="/other.jpg")
+    assert len({before, _index_fingerprint(index)}) == 2
+
+def test_cache_keeps_arrays_out_of_band(tmp_path):
+    import numpy as np
+    from cveda.api import _cache_save, _cache_load
+    arr = np.arange(1000, dtype=np.float64)
+    _cache_save(tmp_path, "k", {"a": arr})
+    # the array bytes live in the sidecar, not in the pickle stream
+    assert (tmp_path / "k.bin").read_bytes() == arr.tobytes()
+    assert (tmp_path / "k.pkl").stat().st_size < arr.nbytes
+    _cache_save(tmp_path, "k", {"status": "ok"})
+    assert not (tmp_path / "k.bin").exists()
+    assert _cache_load(tmp_path, "k") == {"status": "ok"}
+    # a truncated sidecar is a miss, not a crash
+    _cache_save(tmp_path, "k", {"a": arr})
+    (tmp_path / "k.bin").write_bytes(arr.tobytes()[:100])
+    assert _cache_load(tmp_path, "k") is None
+
+def test_feature_results_are_served_from_cache(tmp_path, monkeypatch):
+    c = CVEDA(FakeLoader())
+    mod = c._feature_modules["geographic_clustering"]
+    calls = []
+    real = mod.run_geographic_clustering
+    monkeypatch.setattr(mod, "run_geographic_clustering", lambda index, config: calls.append(1) or real(index, config))
+    cfg = {"features_parallel": False, "cache_dir": str(tmp_path), "features_to_run": ["geographic_clustering"]}
+    first = c.run_audit(out_pdf=None, config=cfg)["features"]["geographic_clustering"]
+    assert c.run_audit(out_pdf=None, config=cfg)["features"]["geographic_clustering"] == first
+    assert calls == [1]
+    # a different feature config is a different cache entry
+    cfg["features"] = {"geographic_clustering": {"eps": 0.5}}
+    c.run_audit(out_pdf=None, config=cfg)
+    assert calls == [1, 1]
+
+def test_audit_result_index_has_no_private_keys(tmp_path):
+    from PIL import Image
+    (tmp_path / "labels").mkdir()
+    Image.new("RGB", (64, 32)).save(tmp_path / "dog.jpg")
+    (tmp_path / "labels" / "dog.txt").write_text("0 0.5 0.5 0.5 0.5\n")
+    c = CVEDA(str(tmp_path))
+    cfg = {"features_parallel": False, "cache_dir": str(tmp_path / "cache"), "features_to_run": ["geographic_clustering"]}
+    rec = c.run_audit(out_pdf=None, config=cfg)["index"]["dog.jpg"]
+    assert not [k for k in rec if k.startswith("_")]
+    assert not [k for a in rec["annotations"] for k in a if k.startswith("_")]
+    assert rec["annotations"][0]["bbox"] == [16.0, 8.0, 48.0, 24.0]
+
+def test_feature_cache_key_keeps_key_types_apart():
+    from cveda.api import _feature_cache_key
+    key = lambda cfg: _feature_cache_key("f", "fp", cfg)
+    assert key({1: "x"}) != key({"1": "x"})
+    assert key({"a": 1, "b": {2: 3, "c": [1]}}) == key({"b": {"c": [1], 2: 3}, "a": 1})
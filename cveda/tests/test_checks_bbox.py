@@ -1,3 +1,5 @@
+import pytest
+import numpy as np
 from cveda.checks.bbox_sanity import find_zero_area_boxes, find_inverted_boxes
 def test_bbox_zero_and_inverted():
     index = {
@@ -8,3 +10,112 @@ def test_bbox_zero_and_inverted():
     inv = find_inverted_boxes(index)
     assert len(zero) == 1
     assert len(inv) == 1
+
+def test_coverage_then_forked_pool_exits(tmp_path):
+    # a forked process pool after annotation_coverage must not hang interpreter exit
+    import subprocess, sys, textwrap
+    script = textwrap.dedent("""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from cveda.checks.coverage import annotation_coverage
+        index = {f"{i}.jpg": {"width": 100, "height": 100, "annotations": [{"class": "c", "bbox": [0, 0, 10, 10]}]} for i in range(50)}
+        res = annotation_coverage(index)
+        assert abs(res["aggregates"]["mean"] - 0.01) < 1e-12
+        with ProcessPoolExecutor(4, mp_context=multiprocessing.get_context("fork")) as ex:
+            assert list(ex.map(abs, range(-4, 4))) == [4, 3, 2, 1, 0, 1, 2, 3]
+        print("end")
+    """)
+    proc = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == "end"
+
+def test_overlap_splits_same_and_cross_class_pairs():
+    from cveda.checks.overlap import run_overlap_checks
+    anns = [
+        {"class": "car", "bbox": [0, 0, 100, 100]},
+        {"class": "car", "bbox": [0, 0, 100, 95]},     # IoU 0.95 with box 0
+        {"class": "bus", "bbox": [0, 0, 100, 85]},     # IoU 0.85 with box 0, 0.894 with box 1
+        {"class": "car", "bbox": [0, 0, 100, 60]},     # below both thresholds against every box
+    ]
+    cfg = {"same_class_threshold": 0.9, "cross_class_threshold": 0.8}
+    res = run_overlap_checks({"a.jpg": {"annotations": anns}}, cfg)
+    same = [(p["i"], p["j"], p["class_i"]) for r in res["same_class_pairs"] for p in r["pairs"]]
+    cross = [(p["i"], p["j"], p["class_i"], p["class_j"]) for r in res["cross_class_pairs"] for p in r["pairs"]]
+    assert same == [(0, 1, "car")]
+    assert cross == [(0, 2, "car", "bus"), (1, 2, "car", "bus")]
+    # the preparsed arrays from the loader give the same report
+    rec = {"annotations": anns, "_boxes": np.array([a["bbox"] for a in anns], dtype=np.float64),
+           "_labels": np.array([0, 0, 1, 0])}
+    assert run_overlap_checks({"a.jpg": rec}, cfg) == res
+    # many images go through the thread pool, the report keeps index order
+    many = {f"{k}.jpg": {"annotations": anns} for k in range(40)}
+    out = run_overlap_checks(many, cfg)
+    assert [r["file_name"] for r in out["same_class_pairs"]] == list(many)
+    assert all(r["pairs"] == res["same_class_pairs"][0]["pairs"] for r in out["same_class_pairs"])
+
+def test_max_pairs_keeps_strongest_overlaps():
+    from cveda.checks.overlap import find_high_iou_pairs_for_image, pair_iou
+    rng = np.random.default_rng(1)
+    for n in (12, 150):
+        xy = rng.uniform(0, 40, (n, 2))
+        wh = rng.uniform(20, 40, (n, 2))
+        boxes = np.hstack([xy, xy + wh]).round(1)
+        boxes[n // 2:n // 2 + 4] = boxes[0]   # a few exact duplicates tie at IoU 1.0
+        labels = list(range(n))
+        arr = boxes.astype(np.float32)
+        iu, ju = np.triu_indices(n, k=1)
+        vals = pair_iou(arr, iu, ju)
+        keep = np.flatnonzero(vals >= 0.3)
+        for max_pairs in (1, 3, 25, 10**6):
+            # strongest first, ties to the earlier pair, then listed by i then j
+            top = sorted(keep.tolist(), key=lambda k: (-vals[k], iu[k], ju[k]))[:max_pairs]
+            expected = sorted((int(iu[k]), int(ju[k])) for k in top)
+            got = find_high_iou_pairs_for_image(boxes.tolist(), labels, threshold=0.3, max_pairs=max_pairs)
+            assert [(p["i"], p["j"]) for p in got] == expected
+            assert [p["iou"] for p in got] == [float(vals[(iu == i) & (ju == j)][0]) for i, j in expected]
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_coverage_treats_nan_boxes_as_empty(monkeypatch, use_numba):
+    from cveda.checks import coverage
+    if use_numba and not coverage._NUMBA_AVAILABLE:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(coverage, "_NUMBA_AVAILABLE", use_numba)
+    index = {"a.jpg": {"width": 10, "height": 10, "annotations": [
+        {"class": "c", "bbox": [float("nan"), 0, 5, 5]}, {"class": "c", "bbox": [0, 0, 5, 5]}]}}
+    res = coverage.annotation_coverage(index)
+    assert res["per_image"]["a.jpg"]["coverage"] == 0.25
+    assert res["aggregates"] == {"mean": 0.25, "min": 0.25, "max": 0.25}
+
+def _iou_matrix_reference(boxes):
+    # the original broadcast formulation of iou_matrix
+    x1, y1, x2, y2 = (boxes[:, k:k + 1] for k in range(4))
+    area = np.clip((x2 - x1) * (y2 - y1), a_min=0.0, a_max=None).reshape(-1)
+    inter_w = np.clip(np.minimum(boxes[:, None, 2], boxes[None, :, 2]) - np.maximum(boxes[:, None, 0], boxes[None, :, 0]), a_min=0.0, a_max=None)
+    inter_h = np.clip(np.minimum(boxes[:, None, 3], boxes[None, :, 3]) - np.maximum(boxes[:, None, 1], boxes[None, :, 1]), a_min=0.0, a_max=None)
+    inter = inter_w * inter_h
+    union = area[:, None] + area[None, :] - inter
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(union > 0.0, inter / union, 0.0)
+
+def test_iou_matrix_matches_broadcast_reference():
+    from cveda.checks.overlap import iou_matrix
+    rng = np.random.default_rng(3)
+    xy = rng.uniform(0, 50, (40, 2))
+    boxes = np.hstack([xy, xy + rng.uniform(-5, 30, (40, 2))])
+    boxes[3] = [10, 10, 10, 20]          # zero area
+    boxes[7] = [np.nan, 0, 5, 5]
+    for arr in (boxes, boxes.astype(np.float32), np.round(boxes[8:]).astype(np.int64)):
+        got = iou_matrix(arr)
+        ref = _iou_matrix_reference(arr)
+        assert got.dtype == ref.dtype
+        assert np.array_equal(got, ref)
+    assert iou_matrix(np.zeros((0, 4))).shape == (0, 0)
+
+def test_hard_negative_counts_nan_boxes_as_small():
+    from cveda.checks.hard_negative import find_hard_negative_candidates
+    nan = float("nan")
+    anns = [{"bbox": [0, 0, 0.5, 0.5]}] * 3 + [{"bbox": [nan, 0, 5, 5]}] + [{"bbox": ["x", 0, 1, 1]}]
+    res = find_hard_negative_candidates({"a.jpg": {"width": 100, "height": 100, "annotations": anns}}, min_boxes=5, small_box_relative=1e-4)
+    # the NaN box has area 0 like max(0.0, nan), the unparsable one is skipped but still counted in n_boxes
+    assert res[0]["small_fraction"] == 4 / 5
+    assert [e["area"] for e in res[0]["example_small_boxes"]] == [0.25, 0.25, 0.25, 0.0]
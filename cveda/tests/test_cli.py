@@ -0,0 +1,32 @@
+import json
+import numpy as np
+import pytest
+from cveda import cli
+
+RESULT = {
+    "a": float("nan"),
+    "b": [1.5, float("inf"), np.float64("-inf"), np.float32("nan")],
+    "c": np.array([0.5, np.nan]),
+    "d": {"e": np.int64(3), "f": "x"},
+}
+EXPECTED = {"a": None, "b": [1.5, None, None, None], "c": [0.5, None], "d": {"e": 3, "f": "x"}}
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dump_json_writes_non_finite_floats_as_null(capfd, monkeypatch, use_orjson):
+    if use_orjson and cli._orjson is None:
+        pytest.skip("orjson not installed")
+    if not use_orjson:
+        monkeypatch.setattr(cli, "_orjson", None)
+    cli._dump_json(RESULT)
+    out = capfd.readouterr().out
+    assert "NaN" not in out and "Infinity" not in out
+    assert json.loads(out) == EXPECTED
+
+def test_dump_json_stdlib_keeps_finite_results_streamed(capfd, monkeypatch):
+    monkeypatch.setattr(cli, "_orjson", None)
+    calls = []
+    real = cli._make_json_safe
+    monkeypatch.setattr(cli, "_make_json_safe", lambda o: calls.append(1) or real(o))
+    cli._dump_json({"a": [1.0, 2], "b": "x"})
+    assert json.loads(capfd.readouterr().out) == {"a": [1.0, 2], "b": "x"}
+    assert calls == []
@@ -7,3 +7,188 @@ def test_class_distribution_basic():
     out = compute_class_distribution(index)
     assert out["annotation_counts"]["cat"] == 2
     assert out["annotation_counts"]["dog"] == 1
+
+import math
+import random
+from collections import Counter
+import numpy as np
+import pytest
+from cveda.distribution.bbox_statistics import compute_bbox_statistics
+from cveda.distribution.cooccurrence import compute_cooccurrence
+from cveda.distribution.spatial_heatmap import compute_spatial_heatmaps
+
+def _random_index(seed, n_images=60, preparsed=False):
+    # NaN, inverted and zero area boxes, images without size, int and str classes
+    rng = random.Random(seed)
+    index = {}
+    for i in range(n_images):
+        anns = []
+        for _ in range(rng.randint(0, 6)):
+            x0, y0 = rng.uniform(-20, 120), rng.uniform(-20, 120)
+            bbox = [x0, y0, x0 + rng.uniform(-10, 60), y0 + rng.uniform(-10, 60)]
+            roll = rng.random()
+            if roll < 0.08:
+                bbox[rng.randrange(4)] = float("nan")
+            elif roll < 0.15:
+                bbox[2], bbox[3] = bbox[0], bbox[1]
+            anns.append({"bbox": bbox, "class": rng.choice(["cat", "dog", "car", 3, 7])})
+        rec = {"annotations": anns}
+        if rng.random() > 0.1:
+            rec["width"], rec["height"] = 100, rng.choice([80, 100])
+        if preparsed and anns:
+            rec["_boxes"] = np.asarray([a["bbox"] for a in anns], dtype=np.float64)
+        index[f"{i}.jpg"] = rec
+    return index
+
+def _summarize_ref(lst):
+    if not lst:
+        return {"count": 0, "mean": 0.0, "median": 0.0, "min": 0.0, "max": 0.0, "std": 0.0}
+    n = len(lst)
+    mean = sum(lst) / n
+    s = sorted(lst)
+    median = s[n // 2] if n % 2 == 1 else 0.5 * (s[n // 2 - 1] + s[n // 2])
+    return {"count": n, "mean": mean, "median": median, "min": s[0], "max": s[-1],
+            "std": math.sqrt(sum((x - mean) ** 2 for x in lst) / n)}
+
+def _bbox_statistics_ref(index):
+    per_class = {}
+    all_areas = []
+    for rec in index.values():
+        w, h = rec.get("width"), rec.get("height")
+        img_area = (w * h) if w and h else None
+        for ann in rec.get("annotations", []):
+            xmin, ymin, xmax, ymax = ann["bbox"]
+            area = max(0.0, (xmax - xmin) * (ymax - ymin))
+            entry = per_class.setdefault(str(ann.get("class")), {"areas": [], "relative": []})
+            entry["areas"].append(area)
+            if img_area:
+                entry["relative"].append(area / img_area)
+            all_areas.append(area)
+    per_class_summary = {
+        cls: {"area_stats": _summarize_ref(d["areas"]),
+              "relative_stats": _summarize_ref(d["relative"]) if d["relative"] else {}}
+        for cls, d in per_class.items()
+    }
+    return {"per_class": per_class_summary, "overall": _summarize_ref(all_areas)}
+
+def _assert_stats_match(got, want):
+    assert got.keys() == want.keys()
+    for key in want:
+        if key == "count":
+            assert got[key] == want[key]
+        else:
+            assert got[key] == pytest.approx(want[key], rel=1e-9, abs=1e-9)
+
+@pytest.mark.parametrize("preparsed", [False, True])
+def test_bbox_statistics_matches_scalar_reference(preparsed):
+    for seed in range(5):
+        index = _random_index(seed, preparsed=preparsed)
+        got = compute_bbox_statistics(index)
+        want = _bbox_statistics_ref(index)
+        _assert_stats_match(got["overall"], want["overall"])
+        assert got["per_class"].keys() == want["per_class"].keys()
+        for cls, w in want["per_class"].items():
+            _assert_stats_match(got["per_class"][cls]["area_stats"], w["area_stats"])
+            if w["relative_stats"]:
+                _assert_stats_match(got["per_class"][cls]["relative_stats"], w["relative_stats"])
+            else:
+                assert got["per_class"][cls]["relative_stats"] == {}
+    empty = compute_bbox_statistics({"a.jpg": {"annotations": []}})
+    assert empty == {"per_class": {}, "overall": _summarize_ref([])}
+
+def _spatial_heatmaps_ref(index, bins, min_samples):
+    overall = np.zeros(bins, dtype=float)
+    class_maps = {}
+    counts = {}
+    for rec in index.values():
+        w, h = rec.get("width"), rec.get("height")
+        if not w or not h:
+            continue
+        for ann in rec.get("annotations", []):
+            cls = str(ann.get("class"))
+            xmin, ymin, xmax, ymax = ann["bbox"]
+            cx = min(max(0.0, (xmin + xmax) / 2.0 / float(w)), 1.0)
+            cy = min(max(0.0, (ymin + ymax) / 2.0 / float(h)), 1.0)
+            ix, iy = int(cx * (bins[1] - 1)), int(cy * (bins[0] - 1))
+            overall[iy, ix] += 1.0
+            class_maps.setdefault(cls, np.zeros(bins, dtype=float))[iy, ix] += 1.0
+            counts[cls] = counts.get(cls, 0) + 1
+    per_class = {cls: (m / (m.sum() + 1e-12) if counts[cls] >= min_samples else None) for cls, m in class_maps.items()}
+    return {"overall": overall / (overall.sum() + 1e-12), "per_class": per_class, "counts": counts}
+
+@pytest.mark.parametrize("preparsed", [False, True])
+def test_spatial_heatmaps_match_scalar_reference(preparsed):
+    for seed, bins in ((0, (64, 64)), (1, (8, 5)), (2, (1, 3))):
+        index = _random_index(seed, preparsed=preparsed)
+        got = compute_spatial_heatmaps(index, {"bins": bins, "min_samples": 10})
+        want = _spatial_heatmaps_ref(index, bins, 10)
+        assert got["counts"] == want["counts"]
+        assert got["overall"].dtype == np.float32
+        np.testing.assert_allclose(got["overall"], want["overall"], rtol=1e-6, atol=1e-9)
+        assert got["per_class"].keys() == want["per_class"].keys()
+        for cls, ref in want["per_class"].items():
+            if ref is None:
+                assert got["per_class"][cls] is None
+            else:
+                np.testing.assert_allclose(got["per_class"][cls], ref, rtol=1e-6, atol=1e-9)
+    empty = compute_spatial_heatmaps({}, {"bins": (4, 4)})
+    assert empty["counts"] == {} and not empty["overall"].any()
+
+def _cooccurrence_ref(index, top_n):
+    image_classes = [set(str(a.get("class")) for a in rec.get("annotations", [])) for rec in index.values()]
+    class_counts = Counter()
+    for classes_in_image in image_classes:
+        class_counts.update(classes_in_image)
+    image_classes = [sorted(cl) for cl in image_classes]
+    classes = [c for c, _ in class_counts.most_common(top_n)]
+    idx = {c: i for i, c in enumerate(classes)}
+    M = np.zeros((len(classes), len(classes)), dtype=int)
+    pair_counts = Counter()
+    for cl in image_classes:
+        for i in range(len(cl)):
+            for j in range(i + 1, len(cl)):
+                if cl[i] in idx and cl[j] in idx:
+                    M[idx[cl[i]], idx[cl[j]]] += 1
+                    M[idx[cl[j]], idx[cl[i]]] += 1
+                    pair_counts[(cl[i], cl[j])] += 1
+    return classes, M.tolist(), pair_counts
+
+def test_cooccurrence_matches_scalar_reference(monkeypatch):
+    import cveda.distribution.cooccurrence as cooc
+    # small blocks so the block boundaries are crossed
+    monkeypatch.setattr(cooc, "_BLOCK_IMAGES", 7)
+    for seed, top_n in ((0, 50), (1, 3), (2, 1)):
+        index = _random_index(seed)
+        got = compute_cooccurrence(index, top_n=top_n)
+        classes, matrix, pair_counts = _cooccurrence_ref(index, top_n)
+        assert got["classes"] == classes
+        assert got["matrix"] == matrix
+        # fewer than 50 pairs, so every pair is reported, tie order is not compared
+        assert dict(got["top_pairs"]) == dict(pair_counts)
+        counts = [c for _, c in got["top_pairs"]]
+        assert counts == sorted(counts, reverse=True)
+
+def test_cooccurrence_top_pairs_cut_keeps_strongest():
+    from cveda.distribution.cooccurrence import _top_k_desc
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        values = rng.integers(0, 5, size=rng.integers(0, 80))
+        for k in (0, 1, 5, 50, 100):
+            order = np.argsort(-values, kind="stable")
+            want = [int(i) for i in order if values[i] > 0][:k]
+            assert _top_k_desc(values, k).tolist() == want
+
+def test_class_distribution_matches_scalar_reference():
+    for seed in range(3):
+        index = _random_index(seed)
+        index["bool.jpg"] = {"annotations": [{"class": True}, {"class": None}, {"class": 3}]}
+        counter = Counter()
+        image_counts = Counter()
+        for rec in index.values():
+            classes = [str(a.get("class")) for a in rec.get("annotations", [])]
+            counter.update(classes)
+            image_counts.update(set(classes))
+        out = compute_class_distribution(index, {"top_n": 4})
+        assert out["annotation_counts"] == dict(counter)
+        assert out["image_counts"] == dict(image_counts)
+        assert out["top_classes"] == counter.most_common(4)
@@ -13,3 +13,615 @@ def test_all_feature_runners_exist_and_return_dict():
         out = runner({}, {})
         assert isinstance(out, dict), f"{name} runner should return dict"
         assert "feature" in out or out.get("status") is not None
+
+def test_map_paths_keeps_order_in_every_tier(tmp_path):
+    from cveda.utils.io_helpers import map_paths, path_exists, path_pool
+    (tmp_path / "a.jpg").write_bytes(b"")
+    listings = {}
+    assert path_exists(str(tmp_path / "a.jpg"), listings)
+    assert not path_exists(str(tmp_path / "b.jpg"), listings)
+    for n in (2, 10, 100):
+        paths = [str(i) for i in range(n)]
+        assert map_paths(len, paths) == [len(p) for p in paths]
+        assert map_paths(len, paths, max_workers=1) == [len(p) for p in paths]
+    with path_pool(10) as pool:
+        assert map_paths(len, ["a", "bb"], executor=pool) == [1, 2]
+
+def test_blockiness_draft_only_on_large_images(tmp_path):
+    import numpy as np
+    from PIL import Image
+    from cveda.features.compression_anomaly import _blockiness_score
+
+    def full_decode(p, downscale):
+        im = Image.open(p).convert("L")
+        target = (max(1, int(im.size[0] * downscale)), max(1, int(im.size[1] * downscale)))
+        return float(np.asarray(im.resize(target), dtype=float).var())
+
+    rng = np.random.default_rng(0)
+    for w, h in ((64, 48), (1024, 768), (1280, 1024)):
+        p = tmp_path / f"{w}.jpg"
+        Image.fromarray(rng.integers(0, 256, (h, w, 3), dtype=np.uint8)).save(p, quality=90)
+        for downscale in (0.5, 0.25, 0.1):
+            got, ref = _blockiness_score(str(p), downscale), full_decode(p, downscale)
+            if w * h < 1 << 20 or downscale == 0.5:
+                assert got == ref
+            else:
+                assert abs(got - ref) <= 0.02 * ref
+
+def test_mean_rgb_draft_error_is_bounded(tmp_path):
+    import numpy as np
+    from PIL import Image
+    from cveda.features.color_cast_detection import _mean_rgb
+
+    def full_decode(p, downscale):
+        im = Image.open(p).convert("RGB")
+        target = (max(1, int(im.size[0] * downscale)), max(1, int(im.size[1] * downscale)))
+        return (np.asarray(im.resize(target)).astype(np.float32) / 255.0).mean(axis=(0, 1))
+
+    rng = np.random.default_rng(0)
+    for w, h in ((64, 48), (1024, 768), (1280, 1024)):
+        # saturated red with sharp blue stripes, the worst case for a scaled decode
+        a = np.zeros((h, w, 3), np.uint8)
+        a[..., 0] = 255
+        a[..., 1] = rng.integers(0, 60, (h, w))
+        a[::7, :, 2] = 255
+        p = tmp_path / f"{w}.jpg"
+        Image.fromarray(a).save(p, quality=90)
+        for downscale in (0.25, 0.1):
+            err = np.abs(np.array(_mean_rgb(str(p), downscale)) - full_decode(p, downscale)).max()
+            if w * h < 1 << 20:
+                assert err == 0.0
+            else:
+                # well under the 0.06 outlier threshold
+                assert err <= 0.025
+
+def test_rarity_bucket_counts_are_a_plain_dict():
+    from cveda.features.annotation_rarity_buckets import run_annotation_rarity_buckets
+    index = {"a.jpg": {"annotations": [{"class": "cat"}] * 12 + [{"class": 3}]}}
+    out = run_annotation_rarity_buckets(index)
+    assert type(out["counts"]) is dict and out["counts"] == {"cat": 12, "3": 1}
+    assert out["buckets"] == {"rare": [{"class": "cat", "count": 12}], "very_rare": [{"class": "3", "count": 1}]}
+
+import math
+import random
+from collections import Counter
+import numpy as np
+import pytest
+
+def _coordinate_patterns_ref(index, top_k, min_count):
+    counter = Counter()
+    examples = {}
+    for fname, rec in index.items():
+        for ann in rec.get("annotations", []) or []:
+            try:
+                rounded = tuple(int(round(float(x))) for x in ann.get("bbox", [0, 0, 0, 0]))
+            except Exception:
+                continue
+            counter[rounded] += 1
+            ex = examples.setdefault(rounded, [])
+            if len(ex) < top_k:
+                ex.append(fname)
+    return [{"bbox": b, "count": c, "examples": examples[b][:5]} for b, c in counter.most_common(top_k) if c >= min_count]
+
+@pytest.mark.parametrize("preparsed", [False, True])
+def test_absolute_coordinate_patterns_match_scalar_reference(preparsed):
+    from cveda.features.absolute_coordinate_patterns import run_absolute_coordinate_patterns
+    rng = random.Random(0)
+    # half values round to even, negatives and values past 16 bits take tuple keys,
+    # NaN, inf and huge values take the Python path
+    coords = [0.0, 0.5, 1.5, 2.49, 10.0, -3.5, 65535.4, 65535.5, 70000.0, 1e300, float("nan"), float("inf")]
+    index = {}
+    for i in range(80):
+        anns = [{"bbox": [rng.choice(coords[:10]) if rng.random() < 0.95 else rng.choice(coords) for _ in range(4)], "class": "a"}
+                for _ in range(rng.randint(0, 5))]
+        if not preparsed and anns and rng.random() < 0.3:
+            anns[0]["bbox"] = rng.choice([[1, 2, 3], [1, 2, 3, 4, 5], None, ["1.5", "2", "3", "4"]])
+        rec = {"annotations": anns}
+        if preparsed and anns:
+            rec["_boxes"] = np.asarray([a["bbox"] for a in anns], dtype=np.float64)
+        index[f"{i}.jpg"] = rec
+    for top_k, min_count in ((30, 2), (3, 1), (1, 1), (0, 1)):
+        out = run_absolute_coordinate_patterns(index, {"top_k": top_k, "min_count": min_count})
+        assert out["top_repeats"] == _coordinate_patterns_ref(index, top_k, min_count)
+
+def test_rarity_bucket_lookup_matches_linear_scan():
+    from cveda.features.annotation_rarity_buckets import _bucket_lookup
+    from bisect import bisect_right
+    rng = random.Random(0)
+    inf = float("inf")
+    for _ in range(200):
+        buckets = []
+        for n in range(rng.randint(0, 4)):
+            lo = rng.choice([-inf, 0, 0.5, 3, 3.7, 10, 12])
+            hi = rng.choice([inf, 2, 4.2, 9, 10, 11.5, 50, 10**12])
+            buckets.append((f"b{n}", lo, hi))
+        thresholds, names = _bucket_lookup(buckets)
+        for cnt in range(0, 60):
+            want = next((name for name, lo, hi in buckets if lo <= cnt <= hi), None)
+            assert names[bisect_right(thresholds, cnt)] == want
+
+def _messy_index(seed, n_images=60, preparsed=False):
+    # NaN, inverted, zero area and extreme aspect boxes, unparsable boxes,
+    # missing or zero image sizes, int and str classes
+    rng = random.Random(seed)
+    index = {}
+    for i in range(n_images):
+        anns = []
+        for _ in range(rng.choice([0, 1, 2, 3, 5, 9])):
+            x0, y0 = float(rng.randint(-20, 120)), rng.uniform(-20, 120)
+            bbox = [x0, y0, x0 + rng.choice([0.0, 1.0, 2.5, 40.0, 90.0, -8.0]), y0 + rng.uniform(-5, 50)]
+            roll = rng.random()
+            if roll < 0.06:
+                bbox[rng.randrange(4)] = float("nan")
+            elif roll < 0.1:
+                bbox = [int(round(v)) for v in bbox]
+            elif roll < 0.14 and not preparsed:
+                bbox = rng.choice([[1, 2, 3], None, ["a", 1, 2, 3], [1, 2, 3, 4, 5]])
+            anns.append({"bbox": bbox, "class": rng.choice(["cat", "dog", "car", 3, 7])})
+        rec = {"annotations": anns}
+        roll = rng.random()
+        if roll < 0.7:
+            rec["width"], rec["height"] = 100, rng.choice([80, 100])
+        elif roll < 0.8:
+            rec["width"], rec["height"] = 0, None
+        if preparsed and anns:
+            rec["_boxes"] = np.asarray([a["bbox"] for a in anns], dtype=np.float64)
+        index[f"{i}.jpg"] = rec
+    return index
+
+def _annotation_confidence_ref(index, ar_thresh=8.0, sample_limit=10):
+    class_areas = {}
+    examples = []
+    for fname, rec in index.items():
+        img_area = max(1.0, float(rec.get("width", 0) or 0) * float(rec.get("height", 0) or 0))
+        for ann in rec.get("annotations", []) or []:
+            try:
+                x0, y0, x1, y1 = map(float, ann.get("bbox", [0, 0, 0, 0]))
+            except Exception:
+                continue
+            w, h = max(0.0, x1 - x0), max(0.0, y1 - y0)
+            if w <= 0 or h <= 0:
+                continue
+            cls = str(ann.get("class", ""))
+            class_areas.setdefault(cls, []).append(w * h / img_area)
+            ar = w / h
+            ar = ar if ar >= 1 else 1.0 / ar
+            if ar >= ar_thresh and len(examples) < sample_limit:
+                examples.append({"file": fname, "class": cls, "bbox": [x0, y0, x1, y1], "aspect_ratio": ar})
+    stats = {}
+    for cls, areas in class_areas.items():
+        mean = sum(areas) / len(areas)
+        stats[cls] = (len(areas), mean, math.sqrt(sum((a - mean) ** 2 for a in areas) / len(areas)))
+    return stats, examples
+
+@pytest.mark.parametrize("preparsed", [False, True])
+def test_annotation_confidence_matches_scalar_reference(monkeypatch, preparsed):
+    import cveda.features.annotation_confidence as mod
+    for block in (7, 1 << 16):
+        # small blocks exercise the pairwise merge of the class moments
+        monkeypatch.setattr(mod, "_BLOCK_BOXES", block)
+        for seed in range(3):
+            index = _messy_index(seed, preparsed=preparsed)
+            out = mod.run_annotation_confidence(index, {"aspect_ratio_threshold": 3.0, "sample_limit": 4})
+            stats, examples = _annotation_confidence_ref(index, 3.0, 4)
+            assert list(out["per_class_stats"]) == list(stats)
+            for cls, (count, mean, std) in stats.items():
+                got = out["per_class_stats"][cls]
+                assert got["count"] == count
+                assert got["mean_area_frac"] == pytest.approx(mean, rel=1e-12)
+                assert got["area_std_frac"] == pytest.approx(std, rel=1e-9, abs=1e-15)
+            np.testing.assert_equal(out["samples"]["extreme_aspect_examples"], examples)
+            assert out["n_images"] == len(index)
+
+def test_lifespan_bucket_key_matches_parse_ts():
+    from cveda.features.annotation_lifespan_drift import _bucket_key, _parse_ts
+    def ref(x, bucket):
+        dt = _parse_ts(x)
+        if not dt:
+            return None
+        return f"{dt.year:04d}-{dt.month:02d}" if bucket == "month" else f"{dt.year:04d}"
+    rng = random.Random(0)
+    values = [None, 0, -1, 1.9, -86401.5, 253402300799, 253402300800, -62135596800, -62135596801,
+              1e20, float("nan"), float("inf"), True, "2024-02-29", "2023-02-29", "2023-13-01", "2023-00-10",
+              "0000-01-01", "2023-01-01T23:59:59", "2023-01-01 24:00:00", "2023-01-01T12:60:00",
+              "2023-01-01X12:00:00", "2023-1-01", "2023-01-01T12:00:00+02:00", "2023-01-01T12:00",
+              "20230101", " 2023-01-01", "２０２３-01-01", "2023-01-01T12:00:00.5", "1900-02-29", "2000-02-29"]
+    for _ in range(300):
+        values.append(rng.randint(-10 ** 11, 10 ** 12))
+        y, m, d = rng.randint(0, 9999), rng.randint(0, 13), rng.randint(0, 32)
+        sep = rng.choice(["T", " ", "_"])
+        values.append(f"{y:04d}-{m:02d}-{d:02d}" + rng.choice(["", f"{sep}{rng.randint(0, 25):02d}:{rng.randint(0, 61):02d}:{rng.randint(0, 61):02d}"]))
+    for bucket in ("month", "year"):
+        for x in values:
+            assert _bucket_key(x, bucket) == ref(x, bucket), x
+
+def test_background_relevance_matches_scalar_reference():
+    from cveda.features.background_relevance import run_background_relevance
+    for seed in range(4):
+        index = _messy_index(seed)
+        index["str_size.jpg"] = {"width": "abc", "height": 10, "annotations": [{"bbox": [0, 0, 1, 1]}]}
+        index["meta_size.jpg"] = {"meta": {"width": 20, "height": 20}, "annotations": [{"bbox": [0, 0, 1, 1]}]}
+        fractions = []
+        low = []
+        for fname, rec in index.items():
+            width = rec.get("width") or rec.get("meta", {}).get("width", 0) or 0
+            height = rec.get("height") or rec.get("meta", {}).get("height", 0) or 0
+            try:
+                img_area = float(width) * float(height)
+                if img_area <= 0:
+                    img_area = 1.0
+            except Exception:
+                img_area = 1.0
+            total = 0.0
+            for ann in rec.get("annotations", []) or []:
+                try:
+                    x0, y0, x1, y1 = map(float, ann.get("bbox", [0, 0, 0, 0]))
+                except Exception:
+                    continue
+                total += max(0.0, x1 - x0) * max(0.0, y1 - y0)
+            fractions.append(total / img_area)
+            if fractions[-1] <= 0.01 and len(low) < 5:
+                low.append({"file": fname, "coverage": fractions[-1]})
+        out = run_background_relevance(index, {"sample_limit": 5})
+        assert out["mean_annotation_fraction"] == pytest.approx(sum(fractions) / len(fractions), rel=1e-12)
+        assert out["median_annotation_fraction"] == sorted(fractions)[len(fractions) // 2]
+        assert out["low_coverage_count"] == sum(1 for f in fractions if f <= 0.01)
+        assert out["low_coverage_examples"] == low
+
+def test_bbox_border_alignment_matches_scalar_reference():
+    from cveda.features.bbox_border_alignment import run_bbox_border_alignment
+    for seed in range(4):
+        index = _messy_index(seed)
+        n_boxes = 0
+        counts = Counter()
+        border = Counter()
+        examples = []
+        for fname, rec in index.items():
+            width = rec.get("width", 0) or rec.get("meta", {}).get("width", 0) or 0
+            height = rec.get("height", 0) or rec.get("meta", {}).get("height", 0) or 0
+            for ann in rec.get("annotations", []) or []:
+                try:
+                    x0, y0, x1, y1 = map(float, ann.get("bbox", [0, 0, 0, 0]))
+                except Exception:
+                    continue
+                n_boxes += 1
+                cls = str(ann.get("class", ""))
+                counts[cls] += 1
+                if abs(x0) <= 1.0 or abs(y0) <= 1.0 or abs(x1 - width) <= 1.0 or abs(y1 - height) <= 1.0:
+                    border[cls] += 1
+                    if len(examples) < 6:
+                        examples.append({"file": fname, "class": cls, "bbox": [x0, y0, x1, y1]})
+        out = run_bbox_border_alignment(index, {"sample_limit": 6})
+        assert out["n_boxes"] == n_boxes
+        assert out["border_touch_fraction"] == sum(border.values()) / max(1, n_boxes)
+        assert out["per_class_border_fraction"] == {cls: border[cls] / counts[cls] for cls in counts}
+        # NaN coordinates compare equal here
+        np.testing.assert_equal(out["examples"], examples)
+
+def test_camera_diversity_matches_getexif_reference(tmp_path):
+    from PIL import Image
+    from cveda.features.camera_diversity import run_camera_diversity
+    index = {}
+    for i in range(9):
+        path = tmp_path / f"{i}.jpg"
+        im = Image.new("RGB", (8, 8), (i * 20, 0, 0))
+        if i % 3 == 0:
+            exif = Image.Exif()
+            exif[272] = f" Cam{i % 2} "
+            im.save(path, exif=exif)
+        elif i % 3 == 1:
+            im.save(path)
+        else:
+            path.write_bytes(b"not an image")
+        index[path.name] = {"abs_path": str(path), "meta": {"camera_model": "MetaCam"} if i % 2 else {}}
+    index["missing.jpg"] = {"abs_path": str(tmp_path / "missing.jpg")}
+    for limit in (2, 4, 100):
+        counts = Counter()
+        examples = {}
+        for fname, rec in index.items():
+            if sum(counts.values()) >= limit:
+                break
+            try:
+                with Image.open(rec["abs_path"]) as im:
+                    model = (im._getexif() or {}).get(272)
+            except Exception:
+                continue
+            if not model:
+                model = rec.get("meta", {}).get("camera_model")
+            model = str(model).strip() if model else "unknown"
+            counts[model] += 1
+            examples.setdefault(model, fname)
+        out = run_camera_diversity(index, {"sample_limit": limit, "max_workers": 1})
+        assert out["camera_counts"] == dict(counts)
+        # NaN coordinates compare equal here
+        np.testing.assert_equal(out["examples"], examples)
+        assert out["scanned"] == sum(counts.values())
+    # getexif also reads PNG, which _getexif could not, these are now counted
+    Image.new("RGB", (8, 8)).save(tmp_path / "x.png")
+    out = run_camera_diversity({"x.png": {"abs_path": str(tmp_path / "x.png")}})
+    assert out["camera_counts"] == {"unknown": 1}
+
+def test_containment_pairs_match_contains(monkeypatch):
+    import cveda.features.containment_detection as mod
+    monkeypatch.setattr(mod, "_BLOCK_ROWS", 3)
+    rng = np.random.default_rng(0)
+    for n in (0, 1, 2, 5, 11):
+        B = rng.integers(0, 6, size=(n, 4)).astype(np.float64)
+        B[rng.random((n, 4)) < 0.05] = np.nan
+        B[:, 2:] += B[:, :2]
+        want = [[i, j] for i in range(n) for j in range(n) if i != j and mod._contains(B[i], B[j])]
+        assert mod._containment_pairs(B).tolist() == want
+    for preparsed in (False, True):
+        index = _messy_index(1, preparsed=preparsed)
+        if not preparsed:
+            # short boxes crashed the original loop, they are left out of the comparison
+            for rec in index.values():
+                rec["annotations"] = [a for a in rec["annotations"] if not (isinstance(a["bbox"], list) and len(a["bbox"]) < 4)]
+        pair_counts = Counter()
+        pair_examples = {}
+        for fname, rec in index.items():
+            boxes = []
+            for ann in rec["annotations"]:
+                try:
+                    boxes.append((list(map(float, ann.get("bbox", [0, 0, 0, 0]))), str(ann.get("class", ""))))
+                except Exception:
+                    continue
+            for i, (b1, c1) in enumerate(boxes):
+                for j, (b2, c2) in enumerate(boxes):
+                    if i != j and mod._contains(b1, b2):
+                        pair_counts[(c1, c2)] += 1
+                        ex = pair_examples.setdefault((c1, c2), [])
+                        if len(ex) < 3:
+                            ex.append({"file": fname, "container_bbox": b1, "contained_bbox": b2})
+        want = [{"container": c1, "contained": c2, "count": cnt, "examples": pair_examples[(c1, c2)]}
+                for (c1, c2), cnt in sorted(pair_counts.items(), key=lambda x: x[1], reverse=True) if cnt >= 2]
+        out = mod.run_containment_detection(index, {"min_support": 2, "sample_limit": 3})
+        assert out["top_pairs"] == want
+
+def test_geographic_cells_match_int_binning(monkeypatch):
+    import cveda.features.geographic_clustering as mod
+    # no file reads, coordinates come from metadata only
+    monkeypatch.setattr(mod, "_files_gps", lambda paths: [None] * len(paths))
+    rng = random.Random(0)
+    specials = [float("nan"), float("inf"), -float("inf"), 1e300, -1e300, 4.7e18, -4.7e18, "12.5", "abc", 0, -0.04, 0.04]
+    metas = []
+    for _ in range(400):
+        if rng.random() < 0.2:
+            lat, lon = rng.choice(specials), rng.choice(specials)
+        else:
+            lat, lon = round(rng.uniform(-1, 1), 2), round(rng.uniform(-1, 1), 2)
+        metas.append({"lat": lat, "lon": lon})
+    metas += [{}] + [{"lat": 4.7e18, "lon": 1.0}] * 3
+    index = {f"{i}.jpg": {"meta": m} for i, m in enumerate(metas)}
+    for grid in (0.1, 0.5, 1e-10):
+        clusters = {}
+        for fname, rec in index.items():
+            meta = rec["meta"]
+            lat, lon = meta.get("lat"), meta.get("lon")
+            try:
+                if lat is None or lon is None:
+                    continue
+                lat_f, lon_f = float(lat), float(lon)
+                cell = (int(lat_f / grid), int(lon_f / grid))
+            except Exception:
+                continue
+            clusters.setdefault(cell, []).append({"file": fname, "lat": lat_f, "lon": lon_f})
+        want = [{"cell": c, "count": len(m), "examples": m[:10]} for c, m in clusters.items() if len(m) >= 2]
+        out = mod.run_geographic_clustering(index, {"grid_deg": grid, "min_cluster_size": 2})
+        assert out["clusters"] == want
+        # the int64 and the Python int cells are both exercised
+        assert any(abs(c["cell"][0]) >= 2 ** 62 for c in want)
+
+def test_luminance_and_noise_stats_match_full_decode(tmp_path):
+    from PIL import Image
+    from cveda.features.illumination_diversity import _luminance
+    from cveda.features.noise_type_classifier import _noise_stats
+    def reference(path, downscale):
+        with Image.open(path) as im:
+            im = im.convert("L")
+            w, h = im.size
+            small = np.asarray(im.resize((max(1, int(w * downscale)), max(1, int(h * downscale)))))
+        arr = small.astype(np.float32)
+        return float((small.astype(float) / 255.0).mean()), float(np.var(arr)), float(((arr <= 1).sum() + (arr >= 254).sum())) / arr.size
+    rng = np.random.default_rng(0)
+    for w, h in ((37, 23), (640, 480), (1280, 1024)):
+        yy, xx = np.mgrid[0:h, 0:w]
+        gray = xx / w * 200 + yy / h * 50 + rng.normal(0, 20, (h, w))
+        gray[rng.random((h, w)) < 0.05] = 255
+        gray = np.clip(gray, 0, 255).astype(np.uint8)
+        rgb = np.stack((gray, gray // 2 + 60, 255 - gray), axis=-1)
+        for name, arr in (("l.jpg", gray), ("rgb.jpg", rgb), ("rgb.png", rgb)):
+            path = tmp_path / f"{w}_{name}"
+            Image.fromarray(arr).save(path, quality=90)
+            for downscale in (0.25, 0.1):
+                mean, var, extreme = reference(path, downscale)
+                got_var, got_extreme = _noise_stats(str(path), downscale)
+                if w * h < 1 << 20:
+                    # small images are decoded and resized in full, like the original code
+                    assert _luminance(str(path), downscale) == pytest.approx(mean, abs=1e-12)
+                    assert (got_var, got_extreme) == (pytest.approx(var, rel=1e-6), extreme)
+                else:
+                    assert abs(_luminance(str(path), downscale) - mean) <= 1e-3
+                    assert got_var == pytest.approx(var, rel=0.01)
+                    assert abs(got_extreme - extreme) <= 1e-3
+
+def test_inter_annotator_blocked_matches_scalar(monkeypatch):
+    import cveda.features.inter_annotator_disagreement as mod
+    rng = random.Random(0)
+    def boxes(n):
+        out = []
+        for _ in range(n):
+            x0, y0 = rng.randint(0, 20), rng.uniform(0, 20)
+            out.append({"class": rng.choice(["a", "b", 3, "3"]),
+                        "bbox": [x0, y0, x0 + rng.choice([0, 4, 9, -3]), y0 + rng.uniform(-2, 10)] + [1] * rng.randint(0, 1)})
+        return out
+    for _ in range(200):
+        a, b = boxes(rng.randint(0, 6)), boxes(rng.randint(0, 6))
+        ra, rb = mod._box_rows(a), mod._box_rows(b)
+        codes = {}
+        rows_a = mod._class_rows(np.array([codes.setdefault(str(x["class"]), len(codes)) for x in a], dtype=np.int64))
+        rows_b = mod._class_rows(np.array([codes.setdefault(str(x["class"]), len(codes)) for x in b], dtype=np.int64))
+        assert mod._pair_ious_blocked(ra, rows_a, rb, rows_b) == mod._pair_ious_scalar(a, b)
+    # NaN, bool and unparsable boxes keep the scalar path for the whole image
+    for bad in ([float("nan"), 0, 1, 1], [True, 0, 1, 1], [0, 1, 2], None, ["0", 0, 1, 1]):
+        assert mod._box_rows([{"bbox": [0, 0, 1, 1]}, {"bbox": bad}]) is None
+    index = {}
+    for i in range(40):
+        anns = boxes(rng.randint(0, 8))
+        for ann in anns:
+            ann["annotator"] = rng.choice(["x", "y", "z"])
+        if i % 5 == 0 and anns:
+            anns[0]["bbox"] = rng.choice([[float("nan"), 0, 1, 1], [0, 1, 2], "bad"])
+        index[f"{i}.jpg"] = {"annotations": anns}
+    out = mod.run_inter_annotator_disagreement(index)
+    monkeypatch.setattr(mod, "_box_rows", lambda anns: None)
+    assert mod.run_inter_annotator_disagreement(index) == out
+
+def test_mislabel_candidates_match_scalar_reference():
+    from cveda.features.mislabel_candidate_generator import run_mislabel_candidate_generator
+    for seed in range(4):
+        index = _messy_index(seed, n_images=80)
+        # inf and NaN in single coordinates reach the NaN rules of max()
+        index["inf.jpg"] = {"annotations": [{"class": "cat", "bbox": [0, 0, float("inf"), 5]},
+                                            {"class": "dog", "bbox": [0, float("nan"), 5, 5]}]}
+        per_class = {}
+        for fname, rec in index.items():
+            w = rec.get("width") or 1
+            h = rec.get("height") or 1
+            for ann in rec.get("annotations", []) or []:
+                try:
+                    x0, y0, x1, y1 = map(float, ann.get("bbox", [0, 0, 0, 0]))
+                except Exception:
+                    continue
+                per_class.setdefault(str(ann.get("class", "")), []).append(
+                    (fname, max(0.0, (x1 - x0) * (y1 - y0) / max(1.0, w * h)), (x1 - x0) / max(1.0, (y1 - y0))))
+        candidates = []
+        for cls, vals in per_class.items():
+            stats = []
+            for k in (1, 2):
+                xs = [v[k] for v in vals]
+                mean = sum(xs) / len(xs)
+                stats.append((mean, math.sqrt(sum((x - mean) ** 2 for x in xs) / len(xs))))
+            for fname, area, ar in vals:
+                z_area = (area - stats[0][0]) / (stats[0][1] if stats[0][1] > 0 else 1e-6)
+                z_ar = (ar - stats[1][0]) / (stats[1][1] if stats[1][1] > 0 else 1e-6)
+                score = max(abs(z_area), abs(z_ar))
+                if score >= 1.5:
+                    candidates.append({"class": cls, "file": fname, "z_area": z_area, "z_ar": z_ar, "score": score})
+        want = sorted(candidates, key=lambda x: x["score"], reverse=True)[:30]
+        out = run_mislabel_candidate_generator(index, {"z_threshold": 1.5, "sample_limit": 30})
+        np.testing.assert_equal(out["candidates"], want)
+
+def test_nn_distances_match_hypot_loop(monkeypatch):
+    import cveda.features.object_distance_distribution as mod
+    monkeypatch.setattr(mod, "_BLOCK_ROWS", 4)
+    rng = np.random.default_rng(0)
+    for n in (2, 3, 9, 17):
+        centers = rng.integers(0, 5, size=(n, 2)).astype(np.float64)
+        centers[rng.random((n, 2)) < 0.1] = np.nan
+        want = []
+        for i in range(n):
+            d = [math.hypot(*(centers[i] - centers[j])) for j in range(n) if j != i]
+            want.append(min((x for x in d if not math.isnan(x)), default=math.inf))
+        np.testing.assert_allclose(mod._nn_distances(centers), want, rtol=1e-15)
+    for preparsed in (False, True):
+        index = _messy_index(2, preparsed=preparsed)
+        nn = []
+        tight = []
+        for fname, rec in index.items():
+            centers = []
+            for ann in rec["annotations"]:
+                try:
+                    x0, y0, x1, y1 = map(float, ann.get("bbox", [0, 0, 0, 0]))
+                except Exception:
+                    continue
+                centers.append((0.5 * (x0 + x1), 0.5 * (y0 + y1)))
+            if len(centers) < 2:
+                continue
+            for i, c in enumerate(centers):
+                min_d = math.inf
+                for j, other in enumerate(centers):
+                    if i != j and math.hypot(c[0] - other[0], c[1] - other[1]) < min_d:
+                        min_d = math.hypot(c[0] - other[0], c[1] - other[1])
+                nn.append(min_d)
+            mean_nn = sum(nn[-len(centers):]) / len(centers)
+            w, h = rec.get("width") or 0, rec.get("height") or 0
+            if mean_nn < 0.05 * (math.hypot(w, h) if w and h else 1.0):
+                tight.append(fname)
+        out = mod.run_object_distance_distribution(index, {"sample_limit": 100})
+        assert [t["file"] for t in out["tight_cluster_examples"]] == tight
+        assert out["global_stats"]["median_nn_distance"] == pytest.approx(sorted(nn)[len(nn) // 2], rel=1e-14)
+        assert out["global_stats"]["mean_nn_distance"] == pytest.approx(sum(nn) / len(nn), rel=1e-12, nan_ok=True)
+
+def test_mutual_exclusion_matches_set_reference():
+    from itertools import combinations
+    from cveda.features.mutual_exclusion import run_mutual_exclusion
+    rng = random.Random(0)
+    index = {f"{i}.jpg": {"annotations": [{"class": rng.choice("abcdefg")} for _ in range(rng.randint(0, 2))]} for i in range(40)}
+    index["int.jpg"] = {"annotations": [{"class": 3}, {"class": "3"}, {}]}
+    class_images = {}
+    for fname, rec in index.items():
+        for cls in set(str(a.get("class", "")) for a in rec["annotations"]):
+            class_images.setdefault(cls, set()).add(fname)
+    for min_support in (0, 5, 9, 100):
+        want = []
+        for a, b in combinations(class_images, 2):
+            support = len(class_images[a] | class_images[b])
+            if support >= min_support and not class_images[a] & class_images[b]:
+                want.append({"pair": (a, b), "cooccurrence": 0, "support": support})
+        assert run_mutual_exclusion(index, {"min_support": min_support})["rare_pairs"] == want
+
+@pytest.mark.parametrize("preparsed", [False, True])
+def test_multiresolution_counts_match_scalar_reference(preparsed):
+    from cveda.features.multiresolution_similarity import run_multiresolution_similarity
+    index = _messy_index(3, preparsed=preparsed)
+    # repeated and equal steps add to one entry
+    steps = [1.0, 0.5, 0.5, 1, 0.05]
+    for limit in (10, 1000):
+        stats = {s: [0, 0] for s in steps}
+        for fname, rec in list(index.items())[:limit]:
+            w, h = rec.get("width", 0) or 1, rec.get("height", 0) or 1
+            for ann in rec.get("annotations", []) or []:
+                try:
+                    x0, y0, x1, y1 = map(float, ann.get("bbox", [0, 0, 0, 0]))
+                except Exception:
+                    continue
+                area = max(0.0, (x1 - x0) * (y1 - y0)) / (w * h)
+                for s in steps:
+                    stats[s][0] += 1
+                    stats[s][1] += area * (s * s) >= 0.002
+        want = {str(s): {"total_annotations": t, "visible_annotations": v, "visible_fraction": v / t if t else None}
+                for s, (t, v) in stats.items()}
+        out = run_multiresolution_similarity(index, {"sample_limit": limit, "downscale_steps": steps, "visibility_area_frac": 0.002})
+        assert out["scales"] == want
+
+def test_metadata_drift_matches_per_field_reference():
+    import statistics
+    from cveda.features.metadata_drift import run_metadata_drift
+    rng = random.Random(0)
+    index = {}
+    for i in range(31):
+        rec = {"width": rng.choice([None, 640, 1280, 0]), "meta": {"camera_model": rng.choice([None, "A", "B"]), "iso": rng.choice([100, "200", None])}}
+        if rng.random() < 0.3:
+            rec["height"] = rng.choice([480, 720.0])
+        index[f"{i}.jpg"] = rec
+    fields = ["width", "height", "meta.camera_model", "meta.iso", "width", "depth", "meta.missing"]
+    items = list(index.values())
+    halves = (items[:len(items) // 2], items[len(items) // 2:])
+    def get(rec, field):
+        if field in ("width", "height"):
+            return rec.get(field)
+        return rec.get("meta", {}).get(field.split(".", 1)[1]) if field.startswith("meta.") else None
+    want = {}
+    for field in fields:
+        vals1, vals2 = ([get(r, field) for r in half if get(r, field) is not None] for half in halves)
+        if not vals1 or not vals2:
+            want[field] = {"status": "insufficient_data"}
+            continue
+        try:
+            m1 = statistics.mean([float(v) for v in vals1])
+            m2 = statistics.mean([float(v) for v in vals2])
+            want[field] = {"mean_first": m1, "mean_second": m2, "pct_change": (m2 - m1) / (abs(m1) if m1 != 0 else 1.0)}
+        except Exception:
+            want[field] = {"top_first": Counter(vals1).most_common(3), "top_second": Counter(vals2).most_common(3)}
+    assert run_metadata_drift(index, {"fields": fields})["results"] == want
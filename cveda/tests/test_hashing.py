@@ -0,0 +1,87 @@
+import os
+from PIL import Image
+from cveda.utils import hashing
+from cveda.utils.hashing import PHashCache, phash_images
+
+def test_phash_cache_matches_only_unchanged_files(tmp_path):
+    db = tmp_path / "phash.db"
+    cache = PHashCache(str(db), batch_size=2)
+    cache.put(("/a.jpg", 1, 10), "ahash:8", "ff")
+    assert cache.get_many([("/a.jpg", 1, 10)], "ahash:8") == {}
+    cache.put(("/b.jpg", 2, 20), "ahash:8", "0f")
+    # the second put fills the batch and writes both rows
+    assert cache.get_many([("/a.jpg", 1, 10), ("/b.jpg", 2, 20)], "ahash:8") == {"/a.jpg": "ff", "/b.jpg": "0f"}
+    assert cache.get_many([("/a.jpg", 5, 10), ("/b.jpg", 2, 21)], "ahash:8") == {}
+    assert cache.get_many([("/a.jpg", 1, 10)], "phash:8") == {}
+    cache.put(("/a.jpg", 5, 10), "ahash:8", "aa")
+    cache.close()
+    cache = PHashCache(str(db))
+    # the replaced row survives a reopen and the old stat key no longer matches
+    assert cache.get_many([("/a.jpg", 5, 10)], "ahash:8") == {"/a.jpg": "aa"}
+    assert cache.get_many([("/a.jpg", 1, 10)], "ahash:8") == {}
+    cache.close()
+
+def test_phash_images_reuses_cache_until_file_changes(tmp_path, monkeypatch):
+    paths = []
+    for i in range(3):
+        p = tmp_path / f"{i}.png"
+        Image.new("RGB", (16, 16), (i * 80, 0, 0)).save(p)
+        paths.append(str(p))
+    db = str(tmp_path / "phash.db")
+    first = phash_images(paths, cache_path=db)
+    assert all(h is not None for h in first)
+
+    calls = []
+    real = hashing.phash_image
+    monkeypatch.setattr(hashing, "phash_image", lambda p, hash_size=8: calls.append(p) or real(p, hash_size))
+    assert phash_images(paths, cache_path=db) == first
+    assert calls == []
+
+    st = os.stat(paths[1])
+    os.utime(paths[1], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert phash_images(paths, cache_path=db) == first
+    assert calls == [paths[1]]
+
+def test_parallel_phash_matches_serial(tmp_path):
+    paths = []
+    for i in range(6):
+        p = tmp_path / f"{i}.png"
+        Image.new("RGB", (16, 16), (i * 40, 255 - i * 40, 0)).save(p)
+        paths.append(str(p))
+    paths.append(str(tmp_path / "missing.png"))
+    serial = [hashing.phash_image(p) for p in paths]
+    assert serial[-1] is None
+    assert phash_images(paths, max_workers=2, min_n=1, chunksize=2, use_cache=False) == serial
+    assert phash_images(paths, min_n=len(paths) + 1, use_cache=False) == serial
+
+def test_phash_cache_location_and_opt_out(tmp_path, monkeypatch):
+    monkeypatch.delenv("CVEDA_PHASH_CACHE", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert hashing.default_cache_path() == tmp_path / "xdg" / "cveda" / "phash.db"
+    monkeypatch.setenv("CVEDA_PHASH_CACHE", str(tmp_path / "own.db"))
+    assert hashing.default_cache_path() == tmp_path / "own.db"
+    assert hashing.cache_enabled()
+    p = tmp_path / "a.png"
+    Image.new("RGB", (16, 16)).save(p)
+    phash_images([str(p)])
+    assert (tmp_path / "own.db").exists()
+    monkeypatch.setenv("CVEDA_PHASH_CACHE", "off")
+    assert not hashing.cache_enabled()
+    monkeypatch.setattr(hashing, "PHashCache", None)   # any cache use would fail
+    assert phash_images([str(p)]) == [hashing.phash_image(str(p))]
+
+def test_phash_cache_write_failure_keeps_hashing(tmp_path, monkeypatch):
+    import sqlite3
+    paths = []
+    for i in range(3):
+        p = tmp_path / f"{i}.png"
+        Image.new("RGB", (16, 16), (i * 80, 0, 0)).save(p)
+        paths.append(str(p))
+
+    def locked(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+    # a full batch flushes from inside put, and close flushes the rest
+    monkeypatch.setattr(PHashCache, "put", locked)
+    monkeypatch.setattr(PHashCache, "flush", locked)
+    out = phash_images(paths, cache_path=str(tmp_path / "phash.db"))
+    assert out == [hashing.phash_image(p) for p in paths]
@@ -1,4 +1,5 @@
 import json
+import pytest
 import tempfile
 from pathlib import Path
 from cveda.ingest import parse_coco
@@ -31,3 +32,42 @@ def test_parse_coco(tmp_path):
     rec = idx["img1.jpg"]
     # annotations should include bbox and polygon converted entries
     assert rec["n_annotations"] >= 2
+
+def _coco_maps(tmp_path):
+    from cveda.data_io import ImageCollectionLoader
+    loader = ImageCollectionLoader(str(tmp_path), recursive=False)
+    return loader._load_coco_json(Path(_make_fake_coco(tmp_path)))
+
+def test_coco_json_small_files_are_not_streamed(tmp_path, monkeypatch):
+    from cveda import data_io
+    class _NoStream:
+        def items(self, *a, **k):
+            raise AssertionError("small COCO files are parsed in one go")
+    monkeypatch.setattr(data_io, "_ijson", _NoStream())
+    labels_map, category_map = _coco_maps(tmp_path)
+    assert category_map == {3: "car", 4: "person"}
+    assert [a["bbox"] for a in labels_map["img1.jpg"]] == [[10, 5, 20, 20], None]
+    assert set(labels_map) == {"img1.jpg"}
+
+def test_coco_json_streaming_matches_full_parse(tmp_path, monkeypatch):
+    pytest.importorskip("ijson")
+    from cveda import data_io
+    full = _coco_maps(tmp_path)
+    monkeypatch.setattr(data_io, "_COCO_STREAM_MIN_BYTES", 0)
+    assert _coco_maps(tmp_path) == full
+
+def test_coco_json_with_nan_literal_falls_back(tmp_path):
+    from cveda.data_io import _load_json_file
+    p = tmp_path / "nan.json"
+    p.write_text('{"annotations": [{"bbox": [NaN, 1, 2, 3]}]}')
+    bbox = _load_json_file(p)["annotations"][0]["bbox"]
+    assert bbox[0] != bbox[0] and bbox[1:] == [1, 2, 3]
+
+def test_coco_maps_from_single_pass_sections(tmp_path):
+    # the streaming path hands each section over as an iterator consumed once
+    from cveda.data_io import ImageCollectionLoader
+    full = _coco_maps(tmp_path)
+    data = json.loads((tmp_path / "coco.json").read_text())
+    loader = ImageCollectionLoader(str(tmp_path), recursive=False)
+    sections = (iter(data["images"]), iter(data["categories"]), iter(data["annotations"]))
+    assert loader._build_coco_maps(*sections) == full
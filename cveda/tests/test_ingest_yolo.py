@@ -18,3 +18,25 @@ def test_parse_yolo(tmp_path):
     assert rec["n_annotations"] >= 1
     ann = rec["annotations"][0]
     assert ann["type"] == "bbox"
+
+def test_parse_yolo_lines_fast_path_and_fallback(monkeypatch):
+    import numpy as np
+    from cveda.data_io import _parse_yolo_lines
+    calls = []
+    real = np.loadtxt
+    monkeypatch.setattr(np, "loadtxt", lambda *a, **k: calls.append(1) or real(*a, **k))
+
+    # well formed file, trailing newline and an extra confidence column
+    classes, data = _parse_yolo_lines("0 0.5 0.5 0.2 0.4\n1 0.1 0.2 0.3 0.4 0.9\n".split("\n"))
+    assert classes == ["0", "1"]
+    assert data.tolist() == [[0.5, 0.5, 0.2, 0.4], [0.1, 0.2, 0.3, 0.4]]
+    assert calls == [1]
+
+    # short and non numeric lines are dropped, the good rows keep their order
+    lines = ["2 0.5 0.5 0.2 0.2", "3 0.5 0.5", "4 x 0.5 0.2 0.2", "", "5 0.25 0.75 0.5 0.5"]
+    classes, data = _parse_yolo_lines(lines)
+    assert classes == ["2", "5"]
+    assert data.tolist() == [[0.5, 0.5, 0.2, 0.2], [0.25, 0.75, 0.5, 0.5]]
+
+    classes, data = _parse_yolo_lines(["", "  "])
+    assert classes == [] and data.shape == (0, 4)
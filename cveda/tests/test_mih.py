@@ -0,0 +1,15 @@
+import numpy as np
+from cveda.utils.mih import hamming_pairs, popcount64
+def test_hamming_pairs_matches_brute_force():
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 2**63, 200, dtype=np.uint64)
+    b = a.copy()
+    for k in range(len(b)):
+        for bit in rng.choice(64, rng.integers(0, 14), replace=False):
+            b[k] ^= np.uint64(1) << np.uint64(bit)
+    for threshold in [0, 5, 10]:
+        dist = popcount64(a[:, None] ^ b[None, :])
+        ri, rj = np.nonzero(dist <= threshold)
+        i, j, d, _ = hamming_pairs(a, b, threshold)
+        assert i.tolist() == ri.tolist() and j.tolist() == rj.tolist()
+        assert d.tolist() == dist[ri, rj].tolist()